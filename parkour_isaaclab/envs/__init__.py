@@ -3,4 +3,7 @@ from .parkour_manager_based_env_cfg import ManagerBasedEnvCfg
 from .parkour_manager_based_rl_env import ParkourManagerBasedRLEnv
 from .parkour_manager_based_env import ParkourManagerBasedEnv
 from .parkour_ui import ParkourManagerBasedRLEnvWindow
-from .mdp import *
\ No newline at end of file
+from .mdp import *
+from .parkour_step_cache import ParkourStepCache, RootOrientation
+from .parkour_privileged_params import ParkourPrivilegedParams, get_privileged_params
+from .parkour_profiler import ParkourProfiler
@@ -9,8 +9,10 @@ from isaaclab.assets import RigidObject,Articulation, AssetBase
 from isaaclab.managers import SceneEntityCfg, ManagerTermBase
 import isaaclab.utils.math as math_utils
 from isaaclab.envs.mdp.events import _randomize_prop_by_op
+from isaaclab.envs.mdp.events import randomize_rigid_body_mass as _randomize_rigid_body_mass
 from isaaclab.actuators import DCMotor
 from parkour_isaaclab.actuators import ParkourDCMotor
+from parkour_isaaclab.envs.parkour_privileged_params import get_privileged_params
 from isaaclab.sensors import RayCasterCamera
 from isaaclab.utils.math import quat_from_euler_xyz
 
@@ -60,88 +62,164 @@ def reset_root_state(
     asset.write_root_pose_to_sim(torch.cat([positions, root_states[:, 3:7]], dim=-1), env_ids=env_ids)
     asset.write_root_velocity_to_sim(root_states[:, 7:13] , env_ids=env_ids) ## it mush need for init vel
 
-def randomize_actuator_gains(
-    env: ManagerBasedEnv,
-    env_ids: torch.Tensor | None,
-    asset_cfg: SceneEntityCfg,
-    stiffness_distribution_params: tuple[float, float] | None = None,
-    damping_distribution_params: tuple[float, float] | None = None,
-    operation: Literal["add", "scale", "abs"] = "abs",
-    distribution: Literal["uniform", "log_uniform", "gaussian"] = "uniform",
-):
-    asset: Articulation = env.scene[asset_cfg.name]
-
-    if env_ids is None:
-        env_ids = torch.arange(env.scene.num_envs, device=asset.device)
+class randomize_actuator_gains(ManagerTermBase):
+    def __init__(self, cfg: EventTermCfg, env: ManagerBasedEnv):
+        """Initialize the term.
 
-    def randomize(data: torch.Tensor, params: tuple[float, float]) -> torch.Tensor:
-        return _randomize_prop_by_op(
-            data, params, dim_0_ids=None, dim_1_ids=actuator_indices, operation=operation, distribution=distribution
-        )
+        The joints of every actuator that have to be randomized and their default gains are resolved
+        once here, so a call only gathers the rows of the reset envs.
+        """
+        super().__init__(cfg, env)
+        self.asset_cfg: SceneEntityCfg = cfg.params["asset_cfg"]
+        self.asset: Articulation = env.scene[self.asset_cfg.name]
+        self._all_env_ids = torch.arange(env.scene.num_envs, device=self.asset.device)
 
-    for actuator in asset.actuators.values():
-        if isinstance(asset_cfg.joint_ids, slice):
-            actuator_indices = slice(None)
-            if isinstance(actuator.joint_indices, slice):
-                global_indices = slice(None)
+        # (actuator, indices in the actuator, default stiffness, default damping, write to sim)
+        self._actuators = []
+        for actuator in self.asset.actuators.values():
+            if isinstance(self.asset_cfg.joint_ids, slice):
+                actuator_indices = slice(None)
+                if isinstance(actuator.joint_indices, slice):
+                    global_indices = slice(None)
+                else:
+                    global_indices = torch.tensor(actuator.joint_indices, device=self.asset.device)
+            elif isinstance(actuator.joint_indices, slice):
+                global_indices = actuator_indices = torch.tensor(self.asset_cfg.joint_ids, device=self.asset.device)
             else:
-                global_indices = torch.tensor(actuator.joint_indices, device=asset.device)
-        elif isinstance(actuator.joint_indices, slice):
-            global_indices = actuator_indices = torch.tensor(asset_cfg.joint_ids, device=asset.device)
+                actuator_joint_indices = torch.tensor(actuator.joint_indices, device=self.asset.device)
+                asset_joint_ids = torch.tensor(self.asset_cfg.joint_ids, device=self.asset.device)
+                # the indices of the joints in the actuator that have to be randomized
+                actuator_indices = torch.nonzero(torch.isin(actuator_joint_indices, asset_joint_ids)).view(-1)
+                if len(actuator_indices) == 0:
+                    continue
+                global_indices = actuator_joint_indices[actuator_indices]
+            self._actuators.append((
+                actuator,
+                actuator_indices,
+                self.asset.data.default_joint_stiffness[:, global_indices].clone(),
+                self.asset.data.default_joint_damping[:, global_indices].clone(),
+                isinstance(actuator, DCMotor) or isinstance(actuator, ParkourDCMotor),
+            ))
+
+    def __call__(
+        self,
+        env: ManagerBasedEnv,
+        env_ids: torch.Tensor | None,
+        asset_cfg: SceneEntityCfg,
+        stiffness_distribution_params: tuple[float, float] | None = None,
+        damping_distribution_params: tuple[float, float] | None = None,
+        operation: Literal["add", "scale", "abs"] = "abs",
+        distribution: Literal["uniform", "log_uniform", "gaussian"] = "uniform",
+    ):
+        if env_ids is None:
+            env_ids = self._all_env_ids
+
+        for actuator, actuator_indices, default_stiffness, default_damping, write_to_sim in self._actuators:
+            if stiffness_distribution_params is not None:
+                stiffness = self._default_gains(actuator.stiffness, default_stiffness, env_ids, actuator_indices)
+                _randomize_prop_by_op(
+                    stiffness, stiffness_distribution_params, dim_0_ids=None, dim_1_ids=actuator_indices,
+                    operation=operation, distribution=distribution,
+                )
+                actuator.stiffness[env_ids] = stiffness
+                if write_to_sim:
+                    self.asset.write_joint_stiffness_to_sim(stiffness, joint_ids=actuator.joint_indices, env_ids=env_ids)
+            # Randomize damping
+            if damping_distribution_params is not None:
+                damping = self._default_gains(actuator.damping, default_damping, env_ids, actuator_indices)
+                _randomize_prop_by_op(
+                    damping, damping_distribution_params, dim_0_ids=None, dim_1_ids=actuator_indices,
+                    operation=operation, distribution=distribution,
+                )
+                actuator.damping[env_ids] = damping
+                if write_to_sim:
+                    self.asset.write_joint_damping_to_sim(damping, joint_ids=actuator.joint_indices, env_ids=env_ids)
+        # keep the privileged observations in sync with the new gains
+        get_privileged_params(env, self.asset_cfg.name).refresh_gains(env_ids)
+
+    @staticmethod
+    def _default_gains(
+        gains: torch.Tensor, default_gains: torch.Tensor, env_ids: torch.Tensor, actuator_indices: torch.Tensor | slice
+    ) -> torch.Tensor:
+        """Gains of ``env_ids`` with the randomized joints reset to their default values."""
+        if isinstance(actuator_indices, slice):
+            # all joints of the actuator are overwritten, gathering the defaults is enough
+            return default_gains[env_ids]
+        values = gains[env_ids]
+        values[:, actuator_indices] = default_gains[env_ids]
+        return values
+
+
+class randomize_rigid_body_com(ManagerTermBase):
+    def __init__(self, cfg: EventTermCfg, env: ManagerBasedEnv):
+        """Initialize the term.
+
+        The body indices, the sampling ranges and the CoM buffer of the simulation are resolved once
+        here, so a call only samples the offsets on the device and writes the touched rows.
+        """
+        super().__init__(cfg, env)
+        self.asset_cfg: SceneEntityCfg = cfg.params["asset_cfg"]
+        self.asset: Articulation = env.scene[self.asset_cfg.name]
+
+        # resolve body indices
+        if self.asset_cfg.body_ids == slice(None):
+            self.body_ids = torch.arange(self.asset.num_bodies, dtype=torch.long, device="cpu")
         else:
-            actuator_joint_indices = torch.tensor(actuator.joint_indices, device=asset.device)
-            asset_joint_ids = torch.tensor(asset_cfg.joint_ids, device=asset.device)
-            # the indices of the joints in the actuator that have to be randomized
-            actuator_indices = torch.nonzero(torch.isin(actuator_joint_indices, asset_joint_ids)).view(-1)
-            if len(actuator_indices) == 0:
-                continue
-            global_indices = actuator_joint_indices[actuator_indices]
-        if stiffness_distribution_params is not None:
-            stiffness = actuator.stiffness[env_ids].clone()
-            stiffness[:, actuator_indices] = asset.data.default_joint_stiffness[env_ids][:, global_indices].clone()
-            randomize(stiffness, stiffness_distribution_params)
-            actuator.stiffness[env_ids] = stiffness
-            if isinstance(actuator, DCMotor) or isinstance(actuator, ParkourDCMotor):
-                asset.write_joint_stiffness_to_sim(stiffness, joint_ids=actuator.joint_indices, env_ids=env_ids)
-        # Randomize damping
-        if damping_distribution_params is not None:
-            damping = actuator.damping[env_ids].clone()
-            damping[:, actuator_indices] = asset.data.default_joint_damping[env_ids][:, global_indices].clone()
-            randomize(damping, damping_distribution_params)
-            actuator.damping[env_ids] = damping
-            if isinstance(actuator, DCMotor) or isinstance(actuator, ParkourDCMotor):
-                asset.write_joint_damping_to_sim(damping, joint_ids=actuator.joint_indices, env_ids=env_ids)
-
-def randomize_rigid_body_com(
+            self.body_ids = torch.tensor(self.asset_cfg.body_ids, dtype=torch.long, device="cpu")
+        range_list = [cfg.params["com_range"].get(key, (0.0, 0.0)) for key in ["x", "y", "z"]]
+        self.ranges = torch.tensor(range_list, device=self.device)
+        # CPU copy of the coms of the simulation (num_assets, num_bodies, 7), only this term writes it
+        self.coms = self.asset.root_physx_view.get_coms().clone()
+
+    def __call__(
+        self,
+        env: ManagerBasedEnv,
+        env_ids: torch.Tensor | None,
+        com_range: dict[str, tuple[float, float]],
+        asset_cfg: SceneEntityCfg,
+    ):
+        # resolve environment ids
+        if env_ids is None:
+            env_ids = torch.arange(env.scene.num_envs, device="cpu")
+        else:
+            env_ids = env_ids.cpu()
+
+        # sample random CoM offsets on the device and copy them to the host once
+        rand_samples = math_utils.sample_uniform(
+            self.ranges[:, 0], self.ranges[:, 1], (len(env_ids), 3), device=self.device
+        ).cpu()
+        # randomize the com of the bodies of the given envs in range
+        self.coms[env_ids[:, None], self.body_ids[None, :], :3] += rand_samples[:, None, :]
+        # set the new coms
+        self.asset.root_physx_view.set_coms(self.coms, env_ids)
+        get_privileged_params(env, self.asset_cfg.name).refresh_coms(env_ids, self.coms)
+
+
+def randomize_rigid_body_mass(
     env: ManagerBasedEnv,
     env_ids: torch.Tensor | None,
-    com_range: dict[str, tuple[float, float]],
     asset_cfg: SceneEntityCfg,
+    mass_distribution_params: tuple[float, float],
+    operation: Literal["add", "scale", "abs"],
+    distribution: Literal["uniform", "log_uniform", "gaussian"] = "uniform",
+    recompute_inertia: bool = True,
 ):
-    asset: Articulation = env.scene[asset_cfg.name]
-    # resolve environment ids
-    if env_ids is None:
-        env_ids = torch.arange(env.scene.num_envs, device="cpu")
-    else:
-        env_ids = env_ids.cpu()
-
-    # resolve body indices
-    if asset_cfg.body_ids == slice(None):
-        body_ids = torch.arange(asset.num_bodies, dtype=torch.int, device="cpu")
-    else:
-        body_ids = torch.tensor(asset_cfg.body_ids, dtype=torch.int, device="cpu")
+    """Randomize the mass of the bodies like :func:`isaaclab.envs.mdp.events.randomize_rigid_body_mass`.
 
-    # sample random CoM values
-    range_list = [com_range.get(key, (0.0, 0.0)) for key in ["x", "y", "z"]]
-    ranges = torch.tensor(range_list, device="cpu")
-    rand_samples = math_utils.sample_uniform(ranges[:, 0], ranges[:, 1], (len(env_ids), 3), device="cpu").unsqueeze(1)
-
-    # get the current com of the bodies (num_assets, num_bodies)
-    coms = asset.root_physx_view.get_coms().clone()
-    # Randomize the com in range
-    coms[:, body_ids, :3] += rand_samples
-    # Set the new coms
-    asset.root_physx_view.set_coms(coms, env_ids)
+    The new masses are also written to the privileged parameters of the asset, which the privileged
+    observations read instead of querying the simulation.
+    """
+    _randomize_rigid_body_mass(
+        env,
+        env_ids,
+        asset_cfg,
+        mass_distribution_params,
+        operation,
+        distribution=distribution,
+        recompute_inertia=recompute_inertia,
+    )
+    if isinstance(env.scene[asset_cfg.name], Articulation):
+        get_privileged_params(env, asset_cfg.name).refresh_masses(env_ids)
 
 def push_by_setting_velocity(
     env: ManagerBasedEnv,
@@ -218,29 +296,38 @@ class randomize_rigid_body_material(ManagerTermBase):
                 f"Randomization term 'randomize_rigid_body_material' not supported for asset: '{self.asset_cfg.name}'"
                 f" with type: '{type(self.asset)}'."
             )
+        total_num_shapes = self.asset.root_physx_view.max_shapes
         if isinstance(self.asset, Articulation) and self.asset_cfg.body_ids != slice(None):
             self.num_shapes_per_body = []
             for link_path in self.asset.root_physx_view.link_paths[0]:
                 link_physx_view = self.asset._physics_sim_view.create_rigid_body_view(link_path)  # type: ignore
                 self.num_shapes_per_body.append(link_physx_view.max_shapes)
             num_shapes = sum(self.num_shapes_per_body)
-            expected_shapes = self.asset.root_physx_view.max_shapes
+            expected_shapes = total_num_shapes
             if num_shapes != expected_shapes:
                 raise ValueError(
                     "Randomization term 'randomize_rigid_body_material' failed to parse the number of shapes per body."
                     f" Expected total shapes: {expected_shapes}, but got: {num_shapes}."
                 )
+            # indices of the shapes of the randomized bodies, the shapes of a body are contiguous
+            shape_starts = torch.cumsum(torch.tensor([0] + self.num_shapes_per_body), dim=0)
+            self.shape_ids = torch.cat(
+                [torch.arange(shape_starts[body_id], shape_starts[body_id + 1]) for body_id in self.asset_cfg.body_ids]
+            )
         else:
             self.num_shapes_per_body = None
+            self.shape_ids = torch.arange(total_num_shapes)
 
         # obtain parameters for sampling friction and restitution values
         friction_range = cfg.params.get("friction_range", (1.0, 1.0))
         restitution_range = cfg.params.get("restitution_range", (0.,0.))
         num_buckets = int(cfg.params.get("num_buckets", 1))
         range_list = [friction_range, (0,0), restitution_range]
-        ranges = torch.tensor(range_list, device="cpu")
-        self.material_buckets = math_utils.sample_uniform(ranges[:, 0], ranges[:, 1], (num_buckets, 3), device="cpu")
+        ranges = torch.tensor(range_list, device=self.device)
+        self.material_buckets = math_utils.sample_uniform(ranges[:, 0], ranges[:, 1], (num_buckets, 3), device=self.device)
         self.material_buckets[:,1] = self.material_buckets[:,0]
+        # CPU copy of the material buffer of the simulation, only this term writes it
+        self.materials = self.asset.root_physx_view.get_material_properties().clone()
 
     def __call__(
         self,
@@ -257,25 +344,13 @@ class randomize_rigid_body_material(ManagerTermBase):
         else:
             env_ids = env_ids.cpu()
 
-        bucket_ids = torch.randint(0, num_buckets, (len(env_ids),), device="cpu")
-        material_samples = self.material_buckets[bucket_ids]
-        total_num_shapes = self.asset.root_physx_view.max_shapes
-        material_samples = material_samples.unsqueeze(1).repeat(1,total_num_shapes,1)
-        # retrieve material buffer from the physics simulation
-        materials = self.asset.root_physx_view.get_material_properties()
-        # update material buffer with new samples
-        if self.num_shapes_per_body is not None:
-            # sample material properties from the given ranges
-            for body_id in self.asset_cfg.body_ids:
-                # obtain indices of shapes for the body
-                start_idx = sum(self.num_shapes_per_body[:body_id])
-                end_idx = start_idx + self.num_shapes_per_body[body_id]
-                # assign the new materials
-                # material samples are of shape: num_env_ids x total_num_shapes 
-                materials[env_ids, start_idx:end_idx] = material_samples[:, start_idx:end_idx]
-        else:
-            # assign all the materials
-            materials[env_ids] = material_samples[:]
+        # sample one bucket per env on the device and copy only the samples to the host
+        bucket_ids = torch.randint(0, num_buckets, (len(env_ids),), device=self.device)
+        material_samples = self.material_buckets[bucket_ids].cpu()
+        # assign the samples to all shapes of the randomized bodies at once
+        self.materials[env_ids[:, None], self.shape_ids[None, :]] = material_samples[:, None, :]
 
         # apply to simulation
-        self.asset.root_physx_view.set_material_properties(materials, env_ids)
+        self.asset.root_physx_view.set_material_properties(self.materials, env_ids)
+        if isinstance(self.asset, Articulation):
+            get_privileged_params(env, self.asset_cfg.name).refresh_materials(env_ids, self.materials)
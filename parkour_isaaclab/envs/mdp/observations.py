@@ -15,11 +15,13 @@ from typing import TYPE_CHECKING
 from isaaclab.managers import ManagerTermBase, SceneEntityCfg
 from isaaclab.sensors import ContactSensor, RayCaster, RayCasterCamera
 from isaaclab.assets import Articulation
-from isaaclab.utils.math import euler_xyz_from_quat, wrap_to_pi
 from parkour_isaaclab.envs.mdp.parkours import ParkourEvent
+from parkour_isaaclab.envs.parkour_privileged_params import get_privileged_params
 from collections.abc import Sequence
 import numpy as np
 import cv2
+import queue
+import threading
 
 if TYPE_CHECKING:
     from parkour_isaaclab.envs import ParkourManagerBasedRLEnv
@@ -48,11 +50,23 @@ class ExtremeParkourObservations(ManagerTermBase):
             3 + 2 + 3 + 4 + 36 + 5,
             device=self.device,
         )
+        # the history is a ring buffer: slot ``_history_head`` holds the latest observation and
+        # ``_history_orders[head]`` lists the slots from the oldest to the latest one
+        self._history_head = self.history_length - 1
+        self._history_orders = (
+            torch.arange(self.history_length, device=self.device)[None, :]
+            + torch.arange(1, self.history_length + 1, device=self.device)[:, None]
+        ) % self.history_length
         self.delta_yaw = torch.zeros(self.num_envs, device=self.device)
         self.delta_next_yaw = torch.zeros(self.num_envs, device=self.device)
         self.measured_heights = torch.zeros(self.num_envs, 132, device=self.device)
         self.env = env
         self.body_id = self.asset.find_bodies("base_link")[0]
+        # the privileged parameters only change when a randomization event runs, so the latent is
+        # rebuilt only when the version of the cache moved
+        self.privileged_params = get_privileged_params(env, self.asset_cfg.name)
+        self._priv_latent = None
+        self._priv_latent_version = -1
 
     def reset(self, env_ids: Sequence[int] | None = None) -> None:
         self._obs_history_buffer[env_ids, :, :] = 0.0
@@ -66,20 +80,15 @@ class ExtremeParkourObservations(ManagerTermBase):
         history_length: int,
     ) -> torch.Tensor:
 
-        terrain_names = self.parkour_event.env_per_terrain_name
-        env_idx_tensor = torch.tensor((terrain_names != "parkour_flat")).to(
-            dtype=torch.bool, device=self.device
-        )
-        invert_env_idx_tensor = torch.tensor((terrain_names == "parkour_flat")).to(
-            dtype=torch.bool, device=self.device
-        )
-        roll, pitch, yaw = euler_xyz_from_quat(self.asset.data.root_quat_w)
-        imu_obs = torch.stack((wrap_to_pi(roll), wrap_to_pi(pitch)), dim=1).to(
+        invert_env_idx_tensor = self.parkour_event.get_terrain_mask("parkour_flat")[:, None]
+        env_idx_tensor = ~invert_env_idx_tensor
+        orientation = env.step_cache.root_orientation(self.asset_cfg.name)
+        imu_obs = torch.stack((orientation.roll_wrapped, orientation.pitch_wrapped), dim=1).to(
             self.device
         )
         if env.common_step_counter % 5 == 0:
-            self.delta_yaw = self.parkour_event.target_yaw - wrap_to_pi(yaw)
-            self.delta_next_yaw = self.parkour_event.next_target_yaw - wrap_to_pi(yaw)
+            self.delta_yaw = self.parkour_event.target_yaw - orientation.yaw_wrapped
+            self.delta_next_yaw = self.parkour_event.next_target_yaw - orientation.yaw_wrapped
             self.measured_heights = self._get_heights()
         commands = env.command_manager.get_command("base_velocity")
         obs_buf = torch.cat(
@@ -95,7 +104,7 @@ class ExtremeParkourObservations(ManagerTermBase):
                 invert_env_idx_tensor,
                 self.asset.data.joint_pos - self.asset.data.default_joint_pos,
                 self.asset.data.joint_vel * 0.05,
-                env.action_manager.get_term("joint_pos").action_history_buf[:, -1],  # type: ignore
+                env.action_manager.get_term("joint_pos").last_action,  # type: ignore
                 self._get_contact_fill(),
             ),
             dim=-1,
@@ -108,18 +117,31 @@ class ExtremeParkourObservations(ManagerTermBase):
                 self.measured_heights,  # 132
                 priv_explicit,  # 9
                 priv_latent,  # 29
-                self._obs_history_buffer.view(self.num_envs, -1),
+                self.obs_history.view(self.num_envs, -1),
             ],
             dim=-1,
         )
         obs_buf[:, 6:8] = 0
-        self._obs_history_buffer = torch.where(
-            (env.episode_length_buf <= 1)[:, None, None],
-            torch.stack([obs_buf] * self.history_length, dim=1),  # type: ignore
-            torch.cat([self._obs_history_buffer[:, 1:], obs_buf.unsqueeze(1)], dim=1),
-        )
+        self._update_obs_history(obs_buf, env.episode_length_buf <= 1)
         return observations
 
+    @property
+    def obs_history(self) -> torch.Tensor:
+        """Proprioceptive history of shape (num_envs, history_length, 58), oldest observation first."""
+        return self._obs_history_buffer.index_select(1, self._history_orders[self._history_head])
+
+    def _update_obs_history(self, obs_buf: torch.Tensor, episode_start: torch.Tensor):
+        # advance the write head instead of shifting the whole buffer
+        self._history_head = (self._history_head + 1) % self.history_length
+        self._obs_history_buffer[:, self._history_head] = obs_buf
+        # envs at the start of an episode fill their whole history with the current observation
+        torch.where(
+            episode_start[:, None, None],
+            obs_buf.unsqueeze(1),
+            self._obs_history_buffer,
+            out=self._obs_history_buffer,
+        )
+
     def _get_contact_fill(
         self,
     ):
@@ -129,11 +151,7 @@ class ExtremeParkourObservations(ManagerTermBase):
             return torch.zeros(self.num_envs, 4, device=self.device) - 0.5
         
         # 原有的contact sensor逻辑
-        contact_forces = self.contact_sensor.data.net_forces_w_history[:, 0, self.sensor_cfg.body_ids]  # type: ignore #(N, 4, 3)
-        contact = torch.norm(contact_forces, dim=-1) > 2.0
-        previous_contact_forces = self.contact_sensor.data.net_forces_w_history[:, -1, self.sensor_cfg.body_ids]  # type: ignore # N, 4, 3
-        last_contacts = torch.norm(previous_contact_forces, dim=-1) > 2.0
-        contact_filt = torch.logical_or(contact, last_contacts)
+        contact_filt = self.env.step_cache.foot_contact(self.sensor_cfg.name, self.sensor_cfg.body_ids)  # (N, 4)
         return (contact_filt.float() - 0.5).to(self.device)
 
     def _get_priv_explicit(
@@ -147,31 +165,22 @@ class ExtremeParkourObservations(ManagerTermBase):
     def _get_priv_latent(
         self,
     ):
-        body_mass = self.asset.root_physx_view.get_masses()[:, self.body_id].to(
-            self.device
-        )
-        body_com = (
-            self.asset.data.com_pos_b[:, self.body_id, :].to(self.device).squeeze(1)
-        )
-        mass_params_tensor = torch.cat([body_mass, body_com], dim=-1).to(self.device)
-        friction_coeffs_tensor = self.asset.root_physx_view.get_material_properties()[
-            :, 0, 0
-        ]
-        joint_stiffness = self.asset.data.joint_stiffness.to(self.device)
-        default_joint_stiffness = self.asset.data.default_joint_stiffness.to(
-            self.device
-        )
-        joint_damping = self.asset.data.joint_damping.to(self.device)
-        default_joint_damping = self.asset.data.default_joint_damping.to(self.device)
-        return torch.cat(
-            (
-                mass_params_tensor,
-                friction_coeffs_tensor.unsqueeze(1).to(self.device),
-                (joint_stiffness / default_joint_stiffness) - 1,
-                (joint_damping / default_joint_damping) - 1,
-            ),
-            dim=-1,
-        ).to(self.device)
+        params = self.privileged_params
+        if self._priv_latent_version != params.version:
+            body_mass = params.masses[:, self.body_id]
+            body_com = params.coms[:, self.body_id, :].squeeze(1)
+            self._priv_latent = torch.cat(
+                (
+                    body_mass,
+                    body_com,
+                    params.friction.unsqueeze(1),
+                    params.stiffness_ratio,
+                    params.damping_ratio,
+                ),
+                dim=-1,
+            )
+            self._priv_latent_version = params.version
+        return self._priv_latent
 
     def _get_heights(self):
         return torch.clip(
@@ -192,21 +201,35 @@ class image_features(ManagerTermBase):
         resized: tuple[int, int] = cfg.params["resize"]  # type: ignore
         self.buffer_len: int = cfg.params["buffer_len"]  # type: ignore
         self.debug_vis: bool = cfg.params["debug_vis"]  # type: ignore
+        self.debug_vis_interval: int = cfg.params.get("debug_vis_interval", 5)  # type: ignore
+        self.depth_viewer = None
+        if self.debug_vis:
+            debug_vis_env_ids = cfg.params.get("debug_vis_env_ids")
+            if debug_vis_env_ids is None:
+                debug_vis_env_ids = range(min(self.num_envs, 16))
+            self.debug_vis_env_ids = torch.tensor(list(debug_vis_env_ids), dtype=torch.long, device=self.device)
+            self.depth_viewer = _DepthImageViewer(cfg.params.get("debug_vis_queue_size", 2))  # type: ignore
         self.resize_transform = torchvision.transforms.Resize(
             (resized[0], resized[1]),
             interpolation=torchvision.transforms.InterpolationMode.BICUBIC,
         ).to(env.device)
+        # ring buffer of depth images, slot ``depth_head`` holds the latest image
         self.depth_buffer = torch.zeros(
             self.num_envs, self.buffer_len, resized[0], resized[1]
         ).to(self.device)
+        self.depth_head = self.buffer_len - 1
+
+    @property
+    def delayed_depth_image(self) -> torch.Tensor:
+        """Depth image one update before the latest one, the image fed to the policy."""
+        return self.depth_buffer[:, (self.depth_head - 1) % self.buffer_len]
 
     def reset(self, env_ids: Sequence[int] | None = None) -> None:
         if env_ids is None:
-            env_ids = torch.arange(0, self.num_envs).tolist()  # type: ignore
+            env_ids = slice(None)  # type: ignore
         depth_images = self.camera_sensor.data.output["distance_to_camera"].squeeze(-1)[env_ids]  # type: ignore
-        for depth_image, env_id in zip(depth_images, env_ids):  # type: ignore
-            processed_image = self._process_depth_image(depth_image)
-            self.depth_buffer[env_id] = torch.stack([processed_image] * 2, dim=0)
+        # the whole history of the reset envs starts from the current image
+        self.depth_buffer[env_ids] = self._process_depth_image(depth_images).to(self.device).unsqueeze(1)
 
     def __call__(
         self,
@@ -215,58 +238,30 @@ class image_features(ManagerTermBase):
         resize: tuple[int, int],
         buffer_len: int,
         debug_vis: bool,
+        debug_vis_interval: int = 5,
+        debug_vis_env_ids: Sequence[int] | None = None,
+        debug_vis_queue_size: int = 2,
     ):
         if env.common_step_counter % 5 == 0:
             depth_images = self.camera_sensor.data.output["distance_to_camera"].squeeze(
                 -1
             )
-            for env_id, depth_image in enumerate(depth_images):
-                processed_image = self._process_depth_image(depth_image)
-                self.depth_buffer[env_id] = torch.cat(
-                    [
-                        self.depth_buffer[env_id, 1:],
-                        processed_image.to(self.device).unsqueeze(0),
-                    ],
-                    dim=0,
-                )
-        if self.debug_vis:
-            depth_images_np = self.depth_buffer[:, -2].detach().cpu().numpy()
-            depth_images_norm = []
-            for img in depth_images_np:
-                depth_images_norm.append(img)
-
-            if len(depth_images_norm) > 0:
-                rows = []
-                # 根据图像数量动态调整 ncols，确保能整除
-                num_images = len(depth_images_norm)
-                # 优先使用4列，如果不能整除则找一个合适的除数
-                ncols = 4
-                if num_images % ncols != 0:
-                    # 找一个能整除 num_images 的 ncols（在2-8之间）
-                    for candidate in [2, 3, 4, 5, 6, 7, 8]:
-                        if num_images % candidate == 0:
-                            ncols = candidate
-                            break
-
-                for i in range(0, len(depth_images_norm), ncols):
-                    row = np.hstack(depth_images_norm[i : i + ncols])
-                    rows.append(row)
-
-                if len(rows) > 0:
-                    grid_img = np.vstack(rows)
-                    cv2.imshow("depth_images_grid", grid_img)
-                    cv2.waitKey(1)
-        return self.depth_buffer[:, -2].to(env.device)
+            self.depth_head = (self.depth_head + 1) % self.buffer_len
+            self.depth_buffer[:, self.depth_head] = self._process_depth_image(depth_images).to(self.device)
+        if self.depth_viewer is not None and env.common_step_counter % self.debug_vis_interval == 0:
+            self.depth_viewer.submit(self.delayed_depth_image[self.debug_vis_env_ids])
+        return self.delayed_depth_image.to(env.device)
 
     def _process_depth_image(self, depth_image):
+        """Crop, resize and normalize a batch of depth images of shape (N, H, W) in one pass."""
         depth_image = self._crop_depth_image(depth_image)
-        depth_image = self.resize_transform(depth_image[None, :]).squeeze()
+        depth_image = self.resize_transform(depth_image.unsqueeze(1)).squeeze(1)
         depth_image = self._normalize_depth_image(depth_image)
         return depth_image
 
     def _crop_depth_image(self, depth_image):
         # crop 30 pixels from the left and right and and 20 pixels from bottom and return croped image
-        return depth_image[:-2, 4:-4]
+        return depth_image[..., :-2, 4:-4]
 
     def _normalize_depth_image(self, depth_image):
         depth_image = depth_image  # make similiar to scandot
@@ -274,6 +269,81 @@ class image_features(ManagerTermBase):
         return depth_image
 
 
+class _DepthImageViewer:
+    """Shows grids of depth images from a background thread.
+
+    Frames are copied to the host asynchronously and handed over through a bounded queue. When the
+    viewer is still busy with earlier frames, new frames are dropped so the env step never waits
+    on the device copy, the grid assembly or ``cv2.imshow``.
+    """
+
+    def __init__(self, queue_size: int = 2, window_name: str = "depth_images_grid"):
+        self.window_name = window_name
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="depth_image_viewer", daemon=True)
+        self._thread.start()
+
+    def submit(self, depth_images: torch.Tensor):
+        """Queue a batch of depth images of shape (N, H, W) for display, or drop it if the queue is full."""
+        if self._queue.full():
+            return
+        images = depth_images.detach().to("cpu", non_blocking=True)
+        copied = None
+        if depth_images.is_cuda:
+            copied = torch.cuda.Event()
+            copied.record()
+        try:
+            self._queue.put_nowait((images, copied))
+        except queue.Full:
+            pass
+
+    def close(self):
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def __del__(self):
+        self.close()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            images, copied = item
+            if copied is not None:
+                copied.synchronize()
+            grid_img = self._make_grid(list(images.numpy()))
+            if grid_img is not None:
+                cv2.imshow(self.window_name, grid_img)
+                cv2.waitKey(1)
+
+    @staticmethod
+    def _make_grid(depth_images_norm: list[np.ndarray]) -> np.ndarray | None:
+        if len(depth_images_norm) == 0:
+            return None
+        rows = []
+        # 根据图像数量动态调整 ncols，确保能整除
+        num_images = len(depth_images_norm)
+        # 优先使用4列，如果不能整除则找一个合适的除数
+        ncols = 4
+        if num_images % ncols != 0:
+            # 找一个能整除 num_images 的 ncols（在2-8之间）
+            for candidate in [2, 3, 4, 5, 6, 7, 8]:
+                if num_images % candidate == 0:
+                    ncols = candidate
+                    break
+
+        for i in range(0, len(depth_images_norm), ncols):
+            row = np.hstack(depth_images_norm[i : i + ncols])
+            rows.append(row)
+
+        if len(rows) == 0:
+            return None
+        return np.vstack(rows)
+
+
 class obervation_delta_yaw_ok(ManagerTermBase):
 
     def __init__(self, cfg: ObservationTermCfg, env: ParkourManagerBasedRLEnv):
@@ -289,7 +359,6 @@ class obervation_delta_yaw_ok(ManagerTermBase):
     ):
         if env.common_step_counter % 5 == 0:
             parkour_event: ParkourEvent = env.parkour_manager.get_term(parkour_name)  # type: ignore
-            asset: Articulation = env.scene[asset_cfg.name]
-            _, _, yaw = euler_xyz_from_quat(asset.data.root_quat_w)
-            self.delta_yaw = parkour_event.target_yaw - wrap_to_pi(yaw)
+            yaw = env.step_cache.root_orientation(asset_cfg.name).yaw_wrapped
+            self.delta_yaw = parkour_event.target_yaw - yaw
         return self.delta_yaw < threshold
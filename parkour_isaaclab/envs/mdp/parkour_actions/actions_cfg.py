@@ -14,3 +14,6 @@ class DelayedJointPositionActionCfg(JointPositionActionCfg):
     history_length: int = 8
     action_delay_steps: list[int]| int = [1, 1]
     use_delay: bool = False 
+    randomize_delay: bool = False
+    """Whether every env samples its own delay in [0, current delay step] on reset instead of using the
+    current delay step of ``action_delay_steps``."""
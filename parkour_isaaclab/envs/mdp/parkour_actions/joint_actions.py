@@ -24,10 +24,23 @@ class DelayedJointPositionAction(JointPositionAction):
         # use default joint positions as offset
         if cfg.use_default_offset:
             self._offset = self._asset.data.default_joint_pos[:, self._joint_ids].clone()
+        # ring buffer of the last actions, slot ``_history_head`` holds the latest action
         self._action_history_buf = torch.zeros(self.num_envs, cfg.history_length, self._num_joints, device=self.device, dtype=torch.float)
+        self._history_head = cfg.history_length - 1
+        self._history_orders = (
+            torch.arange(cfg.history_length, device=self.device)[None, :]
+            + torch.arange(1, cfg.history_length + 1, device=self.device)[:, None]
+        ) % cfg.history_length
+        self._env_ids = torch.arange(self.num_envs, device=self.device)
         self._delay_update_global_steps = cfg.delay_update_global_steps
-        self._action_delay_steps = cfg.action_delay_steps
+        action_delay_steps = cfg.action_delay_steps
+        self._action_delay_steps = [action_delay_steps] if isinstance(action_delay_steps, int) else list(action_delay_steps)
         self._use_delay = cfg.use_delay
+        self._randomize_delay = cfg.randomize_delay
+        # maximum delay of the current schedule stage and delay (in steps) of every env
+        self.delay = torch.tensor(0.0, device=self.device)
+        self._max_delay = 0
+        self.delays = torch.zeros(self.num_envs, device=self.device, dtype=torch.long)
         self.env = env 
 
     def apply_actions(self):
@@ -38,11 +51,15 @@ class DelayedJointPositionAction(JointPositionAction):
         # store the raw actions
         if self.env.common_step_counter % self._delay_update_global_steps == 0:
             if len(self._action_delay_steps) != 0:
-                self.delay = torch.tensor(self._action_delay_steps.pop(0), device=self.device, dtype=torch.float)
-        self._action_history_buf = torch.cat([self._action_history_buf[:, 1:].clone(), actions[:, None, :].clone()], dim=1)
-        indices = -1 - self.delay 
+                delay = self._action_delay_steps.pop(0)
+                self.delay = torch.tensor(delay, device=self.device, dtype=torch.float)
+                self._max_delay = min(int(delay), self.cfg.history_length - 1)
+                self._sample_delays(self._env_ids)
+        self._history_head = (self._history_head + 1) % self.cfg.history_length
+        self._action_history_buf[:, self._history_head] = actions
         if self._use_delay:
-            self._raw_actions[:] = self._action_history_buf[:, indices.long()]
+            delayed_slots = (self._history_head - self.delays) % self.cfg.history_length
+            self._raw_actions[:] = self._action_history_buf[self._env_ids, delayed_slots]
         else:
             self._raw_actions[:] = actions
         # apply the affine transformations
@@ -57,7 +74,22 @@ class DelayedJointPositionAction(JointPositionAction):
     def reset(self, env_ids: Sequence[int] | None = None) -> None:
         self._raw_actions[env_ids] = 0.0
         self._action_history_buf[env_ids, :, :] = 0.
+        if self._randomize_delay:
+            self._sample_delays(self._env_ids[env_ids] if env_ids is not None else self._env_ids)
+
+    def _sample_delays(self, env_ids: torch.Tensor):
+        """Set the delay of ``env_ids`` from the current maximum delay of the schedule."""
+        if self._randomize_delay:
+            self.delays[env_ids] = torch.randint(0, self._max_delay + 1, (len(env_ids),), device=self.device)
+        else:
+            self.delays[env_ids] = self._max_delay
 
     @property
     def action_history_buf(self):
-        return self._action_history_buf
+        """Last actions of shape (num_envs, history_length, num_joints), oldest action first."""
+        return self._action_history_buf.index_select(1, self._history_orders[self._history_head])
+
+    @property
+    def last_action(self):
+        """Latest action of shape (num_envs, num_joints), a view of the history slot that holds it."""
+        return self._action_history_buf[:, self._history_head]
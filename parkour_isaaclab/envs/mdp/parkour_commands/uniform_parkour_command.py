@@ -66,8 +66,9 @@ class UniformParkourCommand(CommandTerm):
                                             > self.cfg.clips.lin_vel_clip
             
     def _update_command(self):
+        heading_w = self._env.step_cache.root_orientation(self.cfg.asset_name).heading_w
         heading_error = math_utils.wrap_to_pi(self.heading_target  - \
-                                            self.robot.data.heading_w) * self.cfg.heading_control_stiffness
+                                            heading_w) * self.cfg.heading_control_stiffness
         self.vel_command_b[:, 2] = torch.clip(heading_error,
                     min= -1,
                     max= 1,
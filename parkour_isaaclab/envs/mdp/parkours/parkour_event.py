@@ -37,10 +37,10 @@ class ParkourEvent(ParkourTerm):
                
         self.robot: Articulation = env.scene[cfg.asset_name]
         # -- metrics
-        self.metrics["far_from_current_goal"] = torch.zeros(self.num_envs, device='cpu')
-        self.metrics["how_far_from_start_point"] = torch.zeros(self.num_envs, device='cpu')
-        self.metrics["terrain_levels"] = torch.zeros(self.num_envs, device='cpu')
-        self.metrics["current_goal_idx"] = torch.zeros(self.num_envs, device='cpu')
+        self.metrics["far_from_current_goal"] = torch.zeros(self.num_envs, device=self.device)
+        self.metrics["how_far_from_start_point"] = torch.zeros(self.num_envs, device=self.device)
+        self.metrics["terrain_levels"] = torch.zeros(self.num_envs, device=self.device)
+        self.metrics["current_goal_idx"] = torch.zeros(self.num_envs, device=self.device)
         self.dis_to_start_pos = torch.zeros(self.num_envs, device=self.device)
         self.terrain: ParkourTerrainImporter = self.env.scene.terrain
         terrain_generator: ParkourTerrainGenerator = self.terrain.terrain_generator_class
@@ -70,9 +70,19 @@ class ParkourEvent(ParkourTerm):
             self.env_per_heights = self.total_heights[self.terrain.terrain_levels, self.terrain.terrain_types]
        
         self.total_terrain_names = terrain_generator.terrain_names
-        numpy_terrain_levels = self.terrain.terrain_levels.detach().cpu().numpy() ## string type can't convert to torch
-        numpy_terrain_types = self.terrain.terrain_types.detach().cpu().numpy()
-        self.env_per_terrain_name = self.total_terrain_names[numpy_terrain_levels, numpy_terrain_types]
+        ## string type can't convert to torch, so every sub-terrain name gets an integer id and
+        ## each env keeps the id and a boolean mask per name on the device
+        self.terrain_name_list, terrain_name_ids = np.unique(self.total_terrain_names[..., 0], return_inverse=True)
+        self.terrain_name_ids = torch.from_numpy(
+            terrain_name_ids.reshape(self.total_terrain_names.shape[:2])
+        ).to(device=self.device, dtype=torch.long)
+        self._terrain_name_to_id = {str(name): idx for idx, name in enumerate(self.terrain_name_list)}
+        self.env_terrain_ids = torch.zeros(self.num_envs, device=self.device, dtype=torch.long)
+        ## the last column stays False and is returned for names that are not in the terrain
+        self.env_terrain_masks = torch.zeros(
+            self.num_envs, len(self.terrain_name_list) + 1, device=self.device, dtype=torch.bool
+        )
+        self._update_env_terrain_ids(slice(None))
         self._reset_offset = self.env.event_manager.get_term_cfg('reset_root_state').params['offset']
 
         robot_root_pos_w = self.robot.data.root_pos_w[:, :2] - self.env_origins[:, :2]
@@ -90,8 +100,8 @@ class ParkourEvent(ParkourTerm):
         self.cur_goals = self._gather_cur_goals()
         self.next_goals = self._gather_cur_goals(future=1)
 
-    def _gather_cur_goals(self, future=0):
-        return self.env_goals.gather(1, (self.cur_goal_idx[:, None, None]+future).expand(-1, -1, self.env_goals.shape[-1])).squeeze(1)
+    def _gather_cur_goals(self, future=0, env_ids: Sequence[int] | slice = slice(None)):
+        return self.env_goals[env_ids].gather(1, (self.cur_goal_idx[env_ids, None, None]+future).expand(-1, -1, self.env_goals.shape[-1])).squeeze(1)
 
     def __str__(self) -> str:
         msg = "ParkourCommand:\n"
@@ -138,10 +148,10 @@ class ParkourEvent(ParkourTerm):
                     torch.tensor((self.terrain.cfg.terrain_generator.size[1] + \
                                   self._reset_offset, 0)).to(self.device)
 
-        self.dis_to_start_pos = torch.norm(start_pos - self.robot.data.root_pos_w[env_ids, :2], dim=1)
+        self.dis_to_start_pos[env_ids] = torch.norm(start_pos - self.robot.data.root_pos_w[env_ids, :2], dim=1)
         threshold = self.env.command_manager.get_command("base_velocity")[env_ids, 0] * self.episode_length_s
-        move_up = self.dis_to_start_pos > 0.8*threshold
-        move_down = self.dis_to_start_pos < 0.4*threshold
+        move_up = self.dis_to_start_pos[env_ids] > 0.8*threshold
+        move_down = self.dis_to_start_pos[env_ids] < 0.4*threshold
 
         robot_root_pos_w = self.robot.data.root_pos_w[:, :2] - self.env_origins[:, :2]
         self.terrain.terrain_levels[env_ids] += 1 * move_up - 1 * move_down
@@ -150,13 +160,10 @@ class ParkourEvent(ParkourTerm):
                                                    torch.randint_like(self.terrain.terrain_levels[env_ids], self.terrain.max_terrain_level),
                                                    torch.clip(self.terrain.terrain_levels[env_ids], 0)) # (the minumum level is zero)
         self.env_origins[env_ids] = self.terrain.terrain_origins[self.terrain.terrain_levels[env_ids], self.terrain.terrain_types[env_ids]]
-        self.env_class[env_ids] = self.terrain_class[self.terrain.terrain_levels[env_ids], self.terrain.terrain_types[env_ids]]
-        
-        temp = self.terrain_goals[self.terrain.terrain_levels, self.terrain.terrain_types]
-        last_col = temp[:, -1].unsqueeze(1)
-        self.env_goals[:] = torch.cat((temp, last_col.repeat(1, self.cfg.num_future_goal_obs, 1)), dim=1)[:]
-        self.cur_goals = self._gather_cur_goals()
-        self.next_goals = self._gather_cur_goals(future=1)
+        ## only the resampled envs changed their sub-terrain, the goals of the others are still valid
+        self._update_env_goals(env_ids)
+        self.cur_goals[env_ids] = self._gather_cur_goals(env_ids=env_ids)
+        self.next_goals[env_ids] = self._gather_cur_goals(future=1, env_ids=env_ids)
 
         self.target_pos_rel = self.cur_goals[:, :2] - robot_root_pos_w
         self.next_target_pos_rel = self.next_goals[:, :2] - robot_root_pos_w
@@ -168,25 +175,57 @@ class ParkourEvent(ParkourTerm):
         target_vec_norm = self.next_target_pos_rel / (norm + 1e-5)
         self.next_target_yaw = torch.atan2(target_vec_norm[:, 1], target_vec_norm[:, 0])
 
-        numpy_terrain_levels = self.terrain.terrain_levels.detach().cpu().numpy()
-        numpy_terrain_types = self.terrain.terrain_types.detach().cpu().numpy()
-        self.env_per_terrain_name = self.total_terrain_names[numpy_terrain_levels, numpy_terrain_types]
-
         self.reach_goal_timer[env_ids] = 0
         self.cur_goal_idx[env_ids] = 0
 
         if self.debug_vis:
             self.future_goal_idx[env_ids, 0] = False
             self.future_goal_idx[env_ids, 1:] = True
-            self.env_per_heights = self.total_heights[self.terrain.terrain_levels, self.terrain.terrain_types]
+
+    def _update_env_goals(self, env_ids: Sequence[int]):
+        """Refresh the goals, class, terrain name and goal heights of ``env_ids`` from their sub-terrain."""
+        terrain_levels = self.terrain.terrain_levels[env_ids]
+        terrain_types = self.terrain.terrain_types[env_ids]
+        self.env_class[env_ids] = self.terrain_class[terrain_levels, terrain_types]
+        goals = self.terrain_goals[terrain_levels, terrain_types]
+        ## the future goal observations past the last goal repeat the last goal
+        self.env_goals[env_ids, : goals.shape[1]] = goals
+        self.env_goals[env_ids, goals.shape[1] :] = goals[:, -1:]
+        self._update_env_terrain_ids(env_ids)
+        if self.debug_vis:
+            self.env_per_heights[env_ids] = self.total_heights[terrain_levels, terrain_types]
+
+    def _update_env_terrain_ids(self, env_ids: Sequence[int] | slice):
+        self.env_terrain_ids[env_ids] = self.terrain_name_ids[
+            self.terrain.terrain_levels[env_ids], self.terrain.terrain_types[env_ids]
+        ]
+        self.env_terrain_masks[env_ids, :-1] = self.env_terrain_ids[env_ids, None] == torch.arange(
+            len(self.terrain_name_list), device=self.device
+        )
+
+    def get_terrain_mask(self, terrain_name: str) -> torch.Tensor:
+        """Boolean mask of shape (num_envs,) of the envs currently on ``terrain_name``.
+
+        The mask is a view of a device buffer that is only updated for resampled envs, so reading
+        it needs no host round trip. Names that are not part of the terrain give an all-False mask.
+        """
+        return self.env_terrain_masks[:, self._terrain_name_to_id.get(terrain_name, -1)]
+
+    @property
+    def env_per_terrain_name(self) -> np.ndarray:
+        """Terrain name of every env, shape (num_envs, 1).
+
+        This copies the terrain ids to the host, use :meth:`get_terrain_mask` in MDP terms.
+        """
+        return self.terrain_name_list[self.env_terrain_ids.cpu().numpy()][:, None]
 
     def _update_metrics(self):
-        # logs data
-        self.metrics["terrain_levels"] = (self.terrain.terrain_levels.float()).to(device = 'cpu')
+        # logs data, the metrics stay on the device and are updated in place
+        self.metrics["terrain_levels"].copy_(self.terrain.terrain_levels)
         robot_root_pos_w = self.robot.data.root_pos_w[:, :2] - self.env_origins[:, :2]
-        self.metrics["far_from_current_goal"] = (torch.norm(self.cur_goals[:, :2] - robot_root_pos_w,dim =-1) - self.next_goal_threshold).to(device = 'cpu')
-        self.metrics["current_goal_idx"] = self.cur_goal_idx.to(device='cpu', dtype=float)
-        self.metrics["how_far_from_start_point"] = self.dis_to_start_pos.to(device = 'cpu')
+        self.metrics["far_from_current_goal"].copy_(torch.norm(self.cur_goals[:, :2] - robot_root_pos_w,dim =-1) - self.next_goal_threshold)
+        self.metrics["current_goal_idx"].copy_(self.cur_goal_idx)
+        self.metrics["how_far_from_start_point"].copy_(self.dis_to_start_pos)
         
     def _set_debug_vis_impl(self, debug_vis: bool):
         # create markers if necessary for the first tome
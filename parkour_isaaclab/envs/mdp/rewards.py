@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import torch
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Dict
 from isaaclab.managers import ManagerTermBase, SceneEntityCfg
 from isaaclab.sensors import ContactSensor
 from isaaclab.assets import Articulation
@@ -30,16 +30,9 @@ class reward_feet_edge(ManagerTermBase):
             cfg.params["parkour_name"]
         )
         self.body_id = self.contact_sensor.find_bodies("base_link")[0]
-        self.horizontal_scale = env.scene.terrain.cfg.terrain_generator.horizontal_scale
-        size_x, size_y = env.scene.terrain.cfg.terrain_generator.size
-        self.rows_offset = size_x * env.scene.terrain.cfg.terrain_generator.num_rows / 2
-        self.cols_offset = size_y * env.scene.terrain.cfg.terrain_generator.num_cols / 2
-        total_x_edge_maskes = torch.from_numpy(
-            self.parkour_event.terrain.terrain_generator_class.x_edge_maskes
-        ).to(device=self.device)
-        self.x_edge_masks_tensor = total_x_edge_maskes.permute(0, 2, 1, 3).reshape(
-            env.scene.terrain.terrain_generator_class.total_width_pixels,
-            env.scene.terrain.terrain_generator_class.total_length_pixels,
+        # bit-packed edge mask of the whole terrain grid, 1 bit per cell on the device
+        self.edge_mask = self.parkour_event.terrain.terrain_generator_class.edge_mask.to(
+            self.device
         )
 
     def __call__(
@@ -49,49 +42,19 @@ class reward_feet_edge(ManagerTermBase):
         sensor_cfg: SceneEntityCfg,
         parkour_name: str,
     ) -> torch.Tensor:
-        feet_pos_x = (
-            (
-                (
-                    self.asset.data.body_state_w[:, self.asset_cfg.body_ids, 0]
-                    + self.rows_offset
-                )
-                / self.horizontal_scale
-            )
-            .round()
-            .long()
+        feet_at_edge = self.edge_mask.lookup(
+            self.asset.data.body_state_w[:, self.asset_cfg.body_ids, :2]
         )
-        feet_pos_y = (
-            (
-                (
-                    self.asset.data.body_state_w[:, self.asset_cfg.body_ids, 1]
-                    + self.cols_offset
-                )
-                / self.horizontal_scale
-            )
-            .round()
-            .long()
-        )
-        feet_pos_x = torch.clip(feet_pos_x, 0, self.x_edge_masks_tensor.shape[0] - 1)
-        feet_pos_y = torch.clip(feet_pos_y, 0, self.x_edge_masks_tensor.shape[1] - 1)
-        feet_at_edge = self.x_edge_masks_tensor[feet_pos_x, feet_pos_y]
-        contact_forces = self.contact_sensor.data.net_forces_w_history[
-            :, 0, self.sensor_cfg.body_ids
-        ]  # (N, 4, 3)
-        previous_contact_forces = self.contact_sensor.data.net_forces_w_history[
-            :, -1, self.sensor_cfg.body_ids
-        ]  # N, 4, 3
-        contact = torch.norm(contact_forces, dim=-1) > 2.0
-        last_contacts = torch.norm(previous_contact_forces, dim=-1) > 2.0
-        contact_filt = torch.logical_or(contact, last_contacts)
+        contact_filt = env.step_cache.foot_contact(
+            self.sensor_cfg.name, self.sensor_cfg.body_ids
+        )  # (N, 4)
         self.feet_at_edge = contact_filt & feet_at_edge
         rew = (self.parkour_event.terrain.terrain_levels > 3) * torch.sum(
             self.feet_at_edge, dim=-1
         )
         ## This is for debugging to matching index and x_edge_mask
-        # origin = self.x_edge_masks_tensor.detach().cpu().numpy().astype(np.uint8) * 255
+        # origin = self.edge_mask.unpack().detach().cpu().numpy().astype(np.uint8) * 255
         # cv2.imshow('origin',origin)
-        # origin[feet_pos_x.detach().cpu().numpy(), feet_pos_y.detach().cpu().numpy()] -= 100
-        # cv2.imshow('feet_edge',origin)
         # cv2.waitKey(1)
         return rew
 
@@ -198,11 +161,9 @@ def reward_lin_vel_z(
     asset_cfg: SceneEntityCfg = SceneEntityCfg("robot"),
 ) -> torch.Tensor:
     parkour_event: ParkourEvent = env.parkour_manager.get_term(parkour_name)
-    terrain_names = parkour_event.env_per_terrain_name
     asset: Articulation = env.scene[asset_cfg.name]
     rew = torch.square(asset.data.root_lin_vel_b[:, 2])
-    rew[(terrain_names != "parkour_flat")[:, -1]] *= 0.5
-    return rew
+    return torch.where(parkour_event.get_terrain_mask("parkour_flat"), rew, rew * 0.5)
 
 
 def reward_orientation(
@@ -211,11 +172,9 @@ def reward_orientation(
     asset_cfg: SceneEntityCfg = SceneEntityCfg("robot"),
 ) -> torch.Tensor:
     parkour_event: ParkourEvent = env.parkour_manager.get_term(parkour_name)
-    terrain_names = parkour_event.env_per_terrain_name
-    asset: Articulation = env.scene[asset_cfg.name]
-    rew = torch.sum(torch.square(asset.data.projected_gravity_b[:, :2]), dim=1)
-    rew[(terrain_names != "parkour_flat")[:, -1]] = 0.0
-    return rew
+    projected_gravity_b = env.step_cache.root_orientation(asset_cfg.name).projected_gravity_b
+    rew = torch.sum(torch.square(projected_gravity_b[:, :2]), dim=1)
+    return torch.where(parkour_event.get_terrain_mask("parkour_flat"), rew, 0.0)
 
 
 def reward_feet_stumble(
@@ -258,12 +217,7 @@ def reward_tracking_yaw(
     asset_cfg: SceneEntityCfg = SceneEntityCfg("robot"),
 ) -> torch.Tensor:
     parkour_event: ParkourEvent = env.parkour_manager.get_term(parkour_name)
-    asset: Articulation = env.scene[asset_cfg.name]
-    q = asset.data.root_quat_w
-    yaw = torch.atan2(
-        2 * (q[:, 0] * q[:, 3] + q[:, 1] * q[:, 2]),
-        1 - 2 * (q[:, 2] ** 2 + q[:, 3] ** 2),
-    )
+    yaw = env.step_cache.root_orientation(asset_cfg.name).yaw_atan2
     return torch.exp(-torch.abs((parkour_event.target_yaw - yaw)))
 
 
@@ -302,8 +256,79 @@ def reward_collision(
     env: ParkourManagerBasedRLEnv,
     sensor_cfg: SceneEntityCfg,
 ) -> torch.Tensor:
-    contact_sensor: ContactSensor = env.scene.sensors[sensor_cfg.name]
-    net_contact_forces = contact_sensor.data.net_forces_w_history[
-        :, 0, sensor_cfg.body_ids
+    contact_force_norms = env.step_cache.contact_force_norms(sensor_cfg.name)[
+        :, sensor_cfg.body_ids
     ]
-    return torch.sum(1.0 * (torch.norm(net_contact_forces, dim=-1) > 0.1), dim=1)
+    return torch.sum(1.0 * (contact_force_norms > 0.1), dim=1)
+
+
+def _fused_stateless_rewards(
+    applied_torque: torch.Tensor,
+    joint_pos: torch.Tensor,
+    default_joint_pos: torch.Tensor,
+    hip_joint_ids: torch.Tensor,
+    root_ang_vel_b: torch.Tensor,
+    root_lin_vel_b: torch.Tensor,
+    projected_gravity_b: torch.Tensor,
+    root_vel_w: torch.Tensor,
+    root_quat_w: torch.Tensor,
+    stumble_net_forces_w: torch.Tensor,
+    stumble_body_ids: torch.Tensor,
+    collision_net_forces_w: torch.Tensor,
+    collision_body_ids: torch.Tensor,
+    not_flat: torch.Tensor,
+    target_pos_rel: torch.Tensor,
+    target_yaw: torch.Tensor,
+    command_vel: torch.Tensor,
+) -> Dict[str, torch.Tensor]:
+    """All stateless reward terms in a single function, keyed by the name of the term function.
+
+    The values are computed exactly like the term functions above, from inputs gathered once per step
+    by :class:`ParkourRewardManager`, so the function can be compiled as a whole with ``torch.jit.script``.
+    """
+    rewards: Dict[str, torch.Tensor] = {}
+    rewards["reward_torques"] = torch.sum(torch.square(applied_torque), dim=1)
+    rewards["reward_dof_error"] = torch.sum(torch.square(joint_pos - default_joint_pos), dim=1)
+    rewards["reward_hip_pos"] = torch.sum(
+        torch.square(
+            joint_pos.index_select(1, hip_joint_ids) - default_joint_pos.index_select(1, hip_joint_ids)
+        ),
+        dim=1,
+    )
+    rewards["reward_ang_vel_xy"] = torch.sum(torch.square(root_ang_vel_b[:, :2]), dim=1)
+    lin_vel_z = torch.square(root_lin_vel_b[:, 2])
+    rewards["reward_lin_vel_z"] = torch.where(not_flat, lin_vel_z * 0.5, lin_vel_z)
+    orientation = torch.sum(torch.square(projected_gravity_b[:, :2]), dim=1)
+    rewards["reward_orientation"] = torch.where(not_flat, torch.zeros_like(orientation), orientation)
+    stumble_forces = stumble_net_forces_w.index_select(1, stumble_body_ids)
+    rewards["reward_feet_stumble"] = torch.any(
+        torch.norm(stumble_forces[:, :, :2], dim=2) > 4 * torch.abs(stumble_forces[:, :, 2]),
+        dim=1,
+    ).float()
+    collision_forces = collision_net_forces_w.index_select(1, collision_body_ids)
+    rewards["reward_collision"] = torch.sum(1.0 * (torch.norm(collision_forces, dim=-1) > 0.1), dim=1)
+    target_vel = target_pos_rel / (torch.norm(target_pos_rel, dim=-1, keepdim=True) + 1e-5)
+    proj_vel = torch.sum(target_vel * root_vel_w[:, :2], dim=-1)
+    rewards["reward_tracking_goal_vel"] = torch.minimum(proj_vel, command_vel) / (command_vel + 1e-5)
+    q = root_quat_w
+    yaw = torch.atan2(
+        2 * (q[:, 0] * q[:, 3] + q[:, 1] * q[:, 2]),
+        1 - 2 * (q[:, 2] ** 2 + q[:, 3] ** 2),
+    )
+    rewards["reward_tracking_yaw"] = torch.exp(-torch.abs((target_yaw - yaw)))
+    return rewards
+
+
+_FUSABLE_REWARD_TERMS = (
+    reward_torques,
+    reward_dof_error,
+    reward_hip_pos,
+    reward_ang_vel_xy,
+    reward_lin_vel_z,
+    reward_orientation,
+    reward_feet_stumble,
+    reward_collision,
+    reward_tracking_goal_vel,
+    reward_tracking_yaw,
+)
+"""Stateless term functions that :func:`_fused_stateless_rewards` can evaluate."""
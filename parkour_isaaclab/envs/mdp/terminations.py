@@ -16,7 +16,6 @@ from typing import TYPE_CHECKING
 
 from isaaclab.assets import Articulation
 from isaaclab.managers import SceneEntityCfg
-from isaaclab.utils.math  import euler_xyz_from_quat, wrap_to_pi
 from parkour_isaaclab.envs.mdp import ParkourEvent
  
 if TYPE_CHECKING:
@@ -28,9 +27,9 @@ def terminate_episode(
 ):  
     reset_buf = torch.zeros((env.num_envs, ), dtype=torch.bool, device=env.device)
     asset: Articulation = env.scene[asset_cfg.name]
-    roll, pitch, _ = euler_xyz_from_quat(asset.data.root_state_w[:,3:7])
-    roll_cutoff = torch.abs(wrap_to_pi(roll)) > 1.5
-    pitch_cutoff = torch.abs(wrap_to_pi(pitch)) > 1.5
+    orientation = env.step_cache.root_orientation(asset_cfg.name)
+    roll_cutoff = torch.abs(orientation.roll_wrapped) > 1.5
+    pitch_cutoff = torch.abs(orientation.pitch_wrapped) > 1.5
     time_out_buf = env.episode_length_buf >= env.max_episode_length
     parkour_event: ParkourEvent =  env.parkour_manager.get_term('base_parkour')    
     reach_goal_cutoff = parkour_event.cur_goal_idx >= env.scene.terrain.cfg.terrain_generator.num_goals
@@ -18,6 +18,8 @@ from typing import Any, ClassVar
 import math, torch   
 import numpy as np 
 from parkour_isaaclab.managers.parkour_reward_manager import ParkourRewardManager
+from .parkour_step_cache import ParkourStepCache
+from .parkour_profiler import ParkourProfiler
 
 class ParkourManagerBasedRLEnv(ParkourManagerBasedEnv, gym.Env):
     is_vector_env: ClassVar[bool] = True 
@@ -42,6 +44,10 @@ class ParkourManagerBasedRLEnv(ParkourManagerBasedEnv, gym.Env):
         # note: this order is important since observation manager needs to know the command and action managers
         # and the reward manager needs to know the termination manager
         self.episode_length_buf = torch.zeros(self.num_envs, device=self.device, dtype=torch.long)
+        # -- derived quantities shared by the MDP terms within a step
+        self.step_cache = ParkourStepCache(self)
+        # -- opt-in timings of the managers
+        self.profiler = ParkourProfiler(self.device, enabled=self.cfg.profile_managers, window=self.cfg.profile_window)
         
         # -- command manager
 
@@ -68,6 +74,8 @@ class ParkourManagerBasedRLEnv(ParkourManagerBasedEnv, gym.Env):
         # perform events at the start of the simulation
         if "startup" in self.event_manager.available_modes:
             self.event_manager.apply(mode="startup")
+        # time the terms of the managers
+        self.profiler.instrument(self)
 
     def setup_manager_visualizers(self):
         """Creates live visualizers for manager terms."""
@@ -93,8 +101,10 @@ class ParkourManagerBasedRLEnv(ParkourManagerBasedEnv, gym.Env):
         return math.ceil(self.max_episode_length_s / self.step_dt)
     
     def step(self, action: torch.Tensor) -> VecEnvStepReturn:
+        profiler = self.profiler
         # process actions
-        self.action_manager.process_action(action.to(self.device))
+        with profiler.section("step/action_manager"):
+            self.action_manager.process_action(action.to(self.device))
         self.recorder_manager.record_pre_step()
 
         # check if we need to do rendering within the physics loop
@@ -102,31 +112,36 @@ class ParkourManagerBasedRLEnv(ParkourManagerBasedEnv, gym.Env):
         is_rendering = self.sim.has_gui() or self.sim.has_rtx_sensors()
 
         # perform physics stepping
-        for _ in range(self.cfg.decimation):
-            self._sim_step_counter += 1
-            # set actions into buffers
-            self.action_manager.apply_action()
-            # set actions into simulator
-            self.scene.write_data_to_sim()
-            # simulate
-            self.sim.step(render=False)
-            if self._sim_step_counter % self.cfg.sim.render_interval == 0 and is_rendering:
-                self.sim.render()
-            self.scene.update(dt=self.physics_dt)
+        with profiler.section("step/physics"):
+            for _ in range(self.cfg.decimation):
+                self._sim_step_counter += 1
+                # set actions into buffers
+                self.action_manager.apply_action()
+                # set actions into simulator
+                self.scene.write_data_to_sim()
+                # simulate
+                self.sim.step(render=False)
+                if self._sim_step_counter % self.cfg.sim.render_interval == 0 and is_rendering:
+                    self.sim.render()
+                self.scene.update(dt=self.physics_dt)
+        self.step_cache.invalidate()
         
-        self.parkour_manager.compute(dt=self.step_dt)
+        with profiler.section("step/parkour_manager"):
+            self.parkour_manager.compute(dt=self.step_dt)
         # post-step:
         # -- update env counters (used for curriculum generation)
         self.episode_length_buf += 1  # step in current episode (per env)
         self.common_step_counter += 1  # total step (common for all envs)
         # -- check terminations
-        self.reset_buf = self.termination_manager.compute()
+        with profiler.section("step/termination_manager"):
+            self.reset_buf = self.termination_manager.compute()
         self.reset_terminated = self.termination_manager.terminated
         self.reset_time_outs = self.termination_manager.time_outs
 
         # -- reward computation
         reset_env_ids = self.reset_buf.nonzero(as_tuple=False).squeeze(-1)
-        self.reward_buf = self.reward_manager.compute(dt=self.step_dt)
+        with profiler.section("step/reward_manager"):
+            self.reward_buf = self.reward_manager.compute(dt=self.step_dt)
         
         if len(self.recorder_manager.active_terms) > 0:
             # update observations for recording if needed
@@ -139,10 +154,11 @@ class ParkourManagerBasedRLEnv(ParkourManagerBasedEnv, gym.Env):
             # trigger recorder terms for pre-reset calls
             self.recorder_manager.record_pre_reset(reset_env_ids)
 
-            self._reset_idx(reset_env_ids)
-            # update articulation kinematics
-            self.scene.write_data_to_sim()
-            self.sim.forward()
+            with profiler.section("step/reset"):
+                self._reset_idx(reset_env_ids)
+                # update articulation kinematics
+                self.scene.write_data_to_sim()
+                self.sim.forward()
 
             # if sensors are added to the scene, make sure we render to reflect changes in reset
             if self.sim.has_rtx_sensors() and self.cfg.rerender_on_reset:
@@ -150,16 +166,25 @@ class ParkourManagerBasedRLEnv(ParkourManagerBasedEnv, gym.Env):
 
             # trigger recorder terms for post-reset calls
             self.recorder_manager.record_post_reset(reset_env_ids)
-        self.command_manager.compute(dt=self.step_dt)
-        self.parkour_manager() ##Just calling parkour mananger for using '_gather_cur_goal' attribute 
+        with profiler.section("step/command_manager"):
+            self.command_manager.compute(dt=self.step_dt)
+        with profiler.section("step/parkour_manager_call"):
+            self.parkour_manager() ##Just calling parkour mananger for using '_gather_cur_goal' attribute 
 
         # -- update command
         # -- step interval events
         if "interval" in self.event_manager.available_modes:
-            self.event_manager.apply(mode="interval", dt=self.step_dt)
+            with profiler.section("step/event_manager"):
+                self.event_manager.apply(mode="interval", dt=self.step_dt)
         # -- compute observations
         # note: done after reset to get the correct observations for reset envs
-        self.obs_buf = self.observation_manager.compute()
+        with profiler.section("step/observation_manager"):
+            self.obs_buf = self.observation_manager.compute()
+
+        if profiler.enabled:
+            profiler.collect()
+            if self.common_step_counter % self.cfg.profile_log_interval == 0 and "log" in self.extras:
+                self.extras["log"].update(profiler.log())
 
         # return observations, rewards, resets and extras
         return self.obs_buf, self.reward_buf, self.reset_terminated, self.reset_time_outs, self.extras
@@ -210,6 +235,8 @@ class ParkourManagerBasedRLEnv(ParkourManagerBasedEnv, gym.Env):
 
     def close(self):
         if not self._is_closed:
+            if self.profiler.enabled:
+                print("[INFO] Manager timings:\n" + self.profiler.summary())
             # destructor is order-sensitive
             del self.command_manager
             del self.reward_manager
@@ -249,45 +276,41 @@ class ParkourManagerBasedRLEnv(ParkourManagerBasedEnv, gym.Env):
         Args:
             env_ids: List of environment ids which must be reset
         """
+        profiler = self.profiler
         # update the curriculum for environments that need a reset
-        self.curriculum_manager.compute(env_ids=env_ids)
+        with profiler.section("reset/curriculum_manager"):
+            self.curriculum_manager.compute(env_ids=env_ids)
         # reset the internal buffers of the scene elements
-        self.scene.reset(env_ids)
+        with profiler.section("reset/scene"):
+            self.scene.reset(env_ids)
         self.extras["log"] = dict()
         # -- parkour manager
-        info = self.parkour_manager.reset(env_ids)
+        with profiler.section("reset/parkour_manager"):
+            info = self.parkour_manager.reset(env_ids)
         self.extras["log"].update(info)
         # apply events such as randomizations for environments that need a reset
         if "reset" in self.event_manager.available_modes:
             env_step_count = self._sim_step_counter // self.cfg.decimation
-            self.event_manager.apply(mode="reset", env_ids=env_ids, global_env_step_count=env_step_count)
+            with profiler.section("reset/event_manager_apply"):
+                self.event_manager.apply(mode="reset", env_ids=env_ids, global_env_step_count=env_step_count)
 
         # iterate over all managers and reset them
         # this returns a dictionary of information which is stored in the extras
         # note: This is order-sensitive! Certain things need be reset before others.
-        # -- observation manager
-        info = self.observation_manager.reset(env_ids)
-        self.extras["log"].update(info)
-        # -- action manager
-        info = self.action_manager.reset(env_ids)
-        self.extras["log"].update(info)
-        # -- rewards manager
-        info = self.reward_manager.reset(env_ids)
-        self.extras["log"].update(info)
-        # -- curriculum manager
-        info = self.curriculum_manager.reset(env_ids)
-        self.extras["log"].update(info)
-        # -- command manager
-        info = self.command_manager.reset(env_ids)
-        self.extras["log"].update(info)
-        # -- event manager
-        info = self.event_manager.reset(env_ids)
-        self.extras["log"].update(info)
-        # -- termination manager
-        info = self.termination_manager.reset(env_ids)
-        self.extras["log"].update(info)
-        # -- recorder manager
-        info = self.recorder_manager.reset(env_ids)
-        self.extras["log"].update(info)
+        for manager_name in (
+            "observation_manager",
+            "action_manager",
+            "reward_manager",
+            "curriculum_manager",
+            "command_manager",
+            "event_manager",
+            "termination_manager",
+            "recorder_manager",
+        ):
+            with profiler.section(f"reset/{manager_name}"):
+                info = getattr(self, manager_name).reset(env_ids)
+            self.extras["log"].update(info)
         # reset the episode length buffer
         self.episode_length_buf[env_ids] = 0
+        # the reset changed the state of the reset envs
+        self.step_cache.invalidate()
@@ -13,4 +13,18 @@ from parkour_isaaclab.envs.parkour_ui import ParkourManagerBasedRLEnvWindow
 @configclass
 class ParkourManagerBasedRLEnvCfg(ManagerBasedRLEnvCfg):
     ui_window_class_type: type | None = ParkourManagerBasedRLEnvWindow
-    parkours: object = MISSING
\ No newline at end of file
+    parkours: object = MISSING
+    fused_rewards: bool = False
+    """Whether the reward manager evaluates the stateless reward terms in one scripted kernel.
+
+    The shared robot, contact and goal inputs are read once per step. The values, episodic sums and
+    step rewards of the terms are the same as with the per-term calls."""
+    profile_managers: bool = False
+    """Whether to time the managers and their terms in the step and the reset of the environment.
+
+    The rolling percentiles are added to ``extras["log"]`` and a summary table is printed when the
+    environment is closed. Every timed section records two CUDA events, so keep it off for training."""
+    profile_window: int = 1000
+    """Number of latest durations of a section the percentiles are computed over."""
+    profile_log_interval: int = 24
+    """Number of steps between two updates of the profiler statistics in ``extras["log"]``."""
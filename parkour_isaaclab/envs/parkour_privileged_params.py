@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import torch
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from isaaclab.assets import Articulation
+
+if TYPE_CHECKING:
+    from isaaclab.envs import ManagerBasedEnv
+
+
+class ParkourPrivilegedParams:
+    """Device copies of the physical parameters of an articulation used by the privileged observations.
+
+    Masses, CoMs and materials live in PhysX and reading them copies the whole buffer to the host, so
+    they are read once here and refreshed only by the randomization events that change them. Every
+    refresh bumps :attr:`version`, which lets the observation terms rebuild derived tensors only when
+    a parameter changed.
+    """
+
+    def __init__(self, asset: Articulation, device: str):
+        self.asset = asset
+        self.device = device
+        self.version = 0
+        self.masses = torch.zeros(asset.num_instances, asset.num_bodies, device=device)
+        """Masses of the bodies, shape (num_envs, num_bodies)."""
+        self.coms = torch.zeros(asset.num_instances, asset.num_bodies, 3, device=device)
+        """CoM positions of the bodies in their body frame, shape (num_envs, num_bodies, 3)."""
+        self.friction = torch.zeros(asset.num_instances, device=device)
+        """Static friction of the first shape of the articulation, shape (num_envs,)."""
+        self.stiffness_ratio = torch.zeros(asset.num_instances, asset.num_joints, device=device)
+        """Joint stiffness relative to its default value minus one, shape (num_envs, num_joints)."""
+        self.damping_ratio = torch.zeros(asset.num_instances, asset.num_joints, device=device)
+        """Joint damping relative to its default value minus one, shape (num_envs, num_joints)."""
+        self.refresh_masses()
+        self.refresh_coms()
+        self.refresh_materials()
+        self.refresh_gains()
+
+    def refresh_masses(self, env_ids: Sequence[int] | torch.Tensor | None = None):
+        """Read the masses of ``env_ids`` back from the simulation."""
+        env_ids, physx_env_ids = self._resolve_env_ids(env_ids)
+        self.masses[env_ids] = self.asset.root_physx_view.get_masses()[physx_env_ids].to(self.device)
+        self.version += 1
+
+    def refresh_coms(self, env_ids: Sequence[int] | torch.Tensor | None = None, coms: torch.Tensor | None = None):
+        """Read the CoM positions of ``env_ids`` back from the simulation.
+
+        Args:
+            env_ids: Envs to refresh. Defaults to all envs.
+            coms: CoM buffer of all envs that was just written to the simulation. Saves reading it
+                back when given.
+        """
+        env_ids, physx_env_ids = self._resolve_env_ids(env_ids)
+        # read the view directly, the buffered ``com_pos_b`` of the data may lag behind a new write
+        if coms is None:
+            coms = self.asset.root_physx_view.get_coms()
+        self.coms[env_ids] = coms[physx_env_ids, :, :3].to(self.device)
+        self.version += 1
+
+    def refresh_materials(
+        self, env_ids: Sequence[int] | torch.Tensor | None = None, materials: torch.Tensor | None = None
+    ):
+        """Read the friction of ``env_ids`` back from the simulation.
+
+        Args:
+            env_ids: Envs to refresh. Defaults to all envs.
+            materials: Material buffer of all envs that was just written to the simulation. Saves
+                reading it back when given.
+        """
+        env_ids, physx_env_ids = self._resolve_env_ids(env_ids)
+        if materials is None:
+            materials = self.asset.root_physx_view.get_material_properties()
+        self.friction[env_ids] = materials[physx_env_ids, 0, 0].to(self.device)
+        self.version += 1
+
+    def refresh_gains(self, env_ids: Sequence[int] | torch.Tensor | None = None):
+        """Read the joint stiffness and damping of ``env_ids`` from the articulation data."""
+        env_ids, _ = self._resolve_env_ids(env_ids)
+        data = self.asset.data
+        self.stiffness_ratio[env_ids] = (data.joint_stiffness[env_ids] / data.default_joint_stiffness[env_ids]) - 1
+        self.damping_ratio[env_ids] = (data.joint_damping[env_ids] / data.default_joint_damping[env_ids]) - 1
+        self.version += 1
+
+    def _resolve_env_ids(self, env_ids):
+        if env_ids is None:
+            return slice(None), slice(None)
+        env_ids = torch.as_tensor(env_ids, dtype=torch.long)
+        return env_ids.to(self.device), env_ids.cpu()
+
+
+def get_privileged_params(env: ManagerBasedEnv, asset_name: str = "robot") -> ParkourPrivilegedParams:
+    """Privileged parameters of ``asset_name``, created on the first request and stored on the env."""
+    if not hasattr(env, "privileged_params"):
+        env.privileged_params = {}
+    if asset_name not in env.privileged_params:
+        env.privileged_params[asset_name] = ParkourPrivilegedParams(env.scene[asset_name], env.device)
+    return env.privileged_params[asset_name]
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import functools
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import torch
+
+if TYPE_CHECKING:
+    from parkour_isaaclab.envs import ParkourManagerBasedRLEnv
+
+_NULL_SECTION = nullcontext()
+
+
+class _Section:
+    """Times one execution of a profiled section with CUDA events, or with the host clock on CPU."""
+
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler: ParkourProfiler, name: str):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        if self._profiler.use_cuda:
+            self._start = torch.cuda.Event(enable_timing=True)
+            self._start.record()
+        else:
+            self._start = time.perf_counter()
+
+    def __exit__(self, *args):
+        if self._profiler.use_cuda:
+            end = torch.cuda.Event(enable_timing=True)
+            end.record()
+            self._profiler._pending.append((self._name, self._start, end))
+        else:
+            self._profiler._record(self._name, (time.perf_counter() - self._start) * 1000.0)
+
+
+class ParkourProfiler:
+    """Opt-in timings of the managers and their terms in the step and the reset of the environment.
+
+    Every section is timed with a pair of CUDA events, so the timings reflect the GPU work of the
+    section without synchronizing the stream. The events are resolved in :meth:`collect` once they
+    completed. The latest ``window`` durations (in ms) of a section are kept to compute rolling
+    percentiles. When disabled, :meth:`section` returns a shared no-op context.
+    """
+
+    def __init__(self, device: str, enabled: bool = False, window: int = 1000):
+        self.enabled = enabled
+        self.use_cuda = "cuda" in str(device)
+        self.window = window
+        self.durations: dict[str, deque[float]] = {}
+        self._pending: list[tuple[str, torch.cuda.Event, torch.cuda.Event]] = []
+
+    def section(self, name: str) -> _Section | nullcontext:
+        """Context that times the enclosed code under ``name``."""
+        if not self.enabled:
+            return _NULL_SECTION
+        return _Section(self, name)
+
+    def collect(self):
+        """Record the durations of the sections whose events completed."""
+        pending = []
+        for name, start, end in self._pending:
+            if end.query():
+                self._record(name, start.elapsed_time(end))
+            else:
+                pending.append((name, start, end))
+        self._pending = pending
+
+    def statistics(self) -> dict[str, dict[str, float]]:
+        """Count, mean and 50th, 90th and 99th percentiles (in ms) of every section."""
+        self.collect()
+        stats = {}
+        for name, durations in self.durations.items():
+            values = np.fromiter(durations, dtype=np.float64)
+            p50, p90, p99 = np.percentile(values, (50, 90, 99))
+            stats[name] = {"count": len(values), "mean": values.mean(), "p50": p50, "p90": p90, "p99": p99}
+        return stats
+
+    def log(self) -> dict[str, float]:
+        """Rolling percentiles of every section, keyed for ``extras["log"]``."""
+        log = {}
+        for name, stats in self.statistics().items():
+            for key in ("p50", "p90", "p99"):
+                log[f"Profiler/{name}/{key}_ms"] = stats[key]
+        return log
+
+    def summary(self) -> str:
+        """Table of the statistics of all sections."""
+        stats = self.statistics()
+        width = max([len(name) for name in stats] + [len("section")])
+        lines = [f"{'section':<{width}} {'count':>8} {'mean':>9} {'p50':>9} {'p90':>9} {'p99':>9}  (ms)"]
+        lines.append("-" * len(lines[0]))
+        for name, s in stats.items():
+            lines.append(
+                f"{name:<{width}} {s['count']:>8d} {s['mean']:>9.3f} {s['p50']:>9.3f} {s['p90']:>9.3f} {s['p99']:>9.3f}"
+            )
+        return "\n".join(lines)
+
+    def instrument(self, env: ParkourManagerBasedRLEnv):
+        """Time the terms of the managers of ``env``.
+
+        Function-based terms of the reward, termination, curriculum, observation and event managers
+        are timed through their configuration, the term objects of the command and parkour managers
+        through their ``compute`` and ``reset`` methods. The reward terms of the fused kernel are timed
+        together as ``term/reward_manager/fused``.
+        """
+        if not self.enabled:
+            return
+        for manager_name in ("reward_manager", "termination_manager", "curriculum_manager"):
+            manager = getattr(env, manager_name)
+            for term_name, term_cfg in zip(manager._term_names, manager._term_cfgs):
+                term_cfg.func = _TimedTerm(self, f"term/{manager_name}/{term_name}", term_cfg.func)
+        reward_manager = env.reward_manager
+        if len(getattr(reward_manager, "_fused_terms", {})) > 0:
+            reward_manager._compute_fused_rewards = self._timed(
+                "term/reward_manager/fused", reward_manager._compute_fused_rewards
+            )
+        for group_name, term_names in env.observation_manager._group_obs_term_names.items():
+            term_cfgs = env.observation_manager._group_obs_term_cfgs[group_name]
+            for term_name, term_cfg in zip(term_names, term_cfgs):
+                name = f"term/observation_manager/{group_name}/{term_name}"
+                term_cfg.func = _TimedTerm(self, name, term_cfg.func)
+        for mode, term_names in env.event_manager._mode_term_names.items():
+            for term_name, term_cfg in zip(term_names, env.event_manager._mode_term_cfgs[mode]):
+                term_cfg.func = _TimedTerm(self, f"term/event_manager/{mode}/{term_name}", term_cfg.func)
+        for manager_name in ("command_manager", "parkour_manager"):
+            for term_name, term in getattr(env, manager_name)._terms.items():
+                for method in ("compute", "reset"):
+                    name = f"term/{manager_name}/{term_name}" + ("/reset" if method == "reset" else "")
+                    setattr(term, method, self._timed(name, getattr(term, method)))
+
+    def _timed(self, name: str, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Section(self, name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def _record(self, name: str, duration: float):
+        if name not in self.durations:
+            self.durations[name] = deque(maxlen=self.window)
+        self.durations[name].append(duration)
+
+
+class _TimedTerm:
+    """Callable in place of the ``func`` of a term configuration that times the calls of the term.
+
+    Other attributes, e.g. ``reset`` of class-based terms, are forwarded to the wrapped term, and the
+    reset of class-based terms is timed as well.
+    """
+
+    def __init__(self, profiler: ParkourProfiler, name: str, func: Any):
+        self._profiler = profiler
+        self._name = name
+        self._func = func
+        if hasattr(func, "reset"):
+            self.reset = profiler._timed(f"{name}/reset", func.reset)
+
+    def __call__(self, *args, **kwargs):
+        with _Section(self._profiler, self._name):
+            return self._func(*args, **kwargs)
+
+    def __getattr__(self, name: str):
+        if name == "_func":
+            raise AttributeError(name)
+        return getattr(self._func, name)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import torch
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from isaaclab.assets import Articulation
+from isaaclab.sensors import ContactSensor
+from isaaclab.utils.math import euler_xyz_from_quat, wrap_to_pi
+
+if TYPE_CHECKING:
+    from parkour_isaaclab.envs import ParkourManagerBasedRLEnv
+
+
+class RootOrientation(NamedTuple):
+    """Orientation quantities of the root of an articulation, each of shape (num_envs,) unless noted."""
+
+    roll: torch.Tensor
+    """Roll as returned by ``euler_xyz_from_quat``."""
+    pitch: torch.Tensor
+    """Pitch as returned by ``euler_xyz_from_quat``."""
+    yaw: torch.Tensor
+    """Yaw as returned by ``euler_xyz_from_quat``."""
+    roll_wrapped: torch.Tensor
+    """Roll wrapped to [-pi, pi]."""
+    pitch_wrapped: torch.Tensor
+    """Pitch wrapped to [-pi, pi]."""
+    yaw_wrapped: torch.Tensor
+    """Yaw wrapped to [-pi, pi]."""
+    yaw_atan2: torch.Tensor
+    """Yaw straight from ``atan2`` of the quaternion, in [-pi, pi]."""
+    heading_w: torch.Tensor
+    """Heading of the forward axis of the root in the world frame, as ``ArticulationData.heading_w``."""
+    projected_gravity_b: torch.Tensor
+    """Gravity direction in the root frame, shape (num_envs, 3)."""
+
+
+class ParkourStepCache:
+    """Per-step cache of quantities derived from the simulation state and shared by the MDP terms.
+
+    Observation, reward, termination and command terms often need the same derived quantities, e.g.
+    the foot contact state or the orientation of the robot. They are computed on the first request
+    of a step and reused by the other terms. The cache is cleared when the step counter changes,
+    after the physics step and after a reset, because both change the simulation state.
+    """
+
+    def __init__(self, env: ParkourManagerBasedRLEnv):
+        self._env = env
+        self._values: dict[Any, Any] = {}
+        self._step = None
+
+    def invalidate(self):
+        """Drop all cached quantities."""
+        self._values.clear()
+        self._step = None
+
+    def get(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """Return the cached value of ``key``, computing it with ``compute`` on the first request of the step."""
+        if self._step != self._env.common_step_counter:
+            self._values.clear()
+            self._step = self._env.common_step_counter
+        if key not in self._values:
+            self._values[key] = compute()
+        return self._values[key]
+
+    def root_orientation(self, asset_name: str = "robot") -> RootOrientation:
+        """Roll, pitch, yaw (raw and wrapped), heading and projected gravity of the root of ``asset_name``."""
+        asset: Articulation = self._env.scene[asset_name]
+
+        def compute() -> RootOrientation:
+            q = asset.data.root_quat_w
+            roll, pitch, yaw = euler_xyz_from_quat(q)
+            yaw_atan2 = torch.atan2(
+                2 * (q[:, 0] * q[:, 3] + q[:, 1] * q[:, 2]),
+                1 - 2 * (q[:, 2] ** 2 + q[:, 3] ** 2),
+            )
+            return RootOrientation(
+                roll=roll,
+                pitch=pitch,
+                yaw=yaw,
+                roll_wrapped=wrap_to_pi(roll),
+                pitch_wrapped=wrap_to_pi(pitch),
+                yaw_wrapped=wrap_to_pi(yaw),
+                yaw_atan2=yaw_atan2,
+                heading_w=asset.data.heading_w,
+                projected_gravity_b=asset.data.projected_gravity_b,
+            )
+
+        return self.get(("root_orientation", asset_name), compute)
+
+    def contact_force_norms(self, sensor_name: str = "contact_forces", history_idx: int = 0) -> torch.Tensor:
+        """Norm of the net contact forces of all bodies of ``sensor_name``, shape (num_envs, num_bodies).
+
+        Args:
+            sensor_name: Name of the contact sensor.
+            history_idx: Index in the force history, 0 is the latest and -1 the oldest entry.
+        """
+        sensor: ContactSensor = self._env.scene.sensors[sensor_name]
+        return self.get(
+            ("contact_force_norms", sensor_name, history_idx),
+            lambda: torch.norm(sensor.data.net_forces_w_history[:, history_idx], dim=-1),
+        )
+
+    def foot_contact(
+        self, sensor_name: str = "contact_forces", body_ids: Sequence[int] | slice = slice(None), threshold: float = 2.0
+    ) -> torch.Tensor:
+        """Filtered contact state of ``body_ids``, shape (num_envs, num_bodies).
+
+        A body is in contact when its net force is above ``threshold`` (in N) at the latest or the
+        oldest entry of the force history.
+        """
+        key_ids = (body_ids.start, body_ids.stop, body_ids.step) if isinstance(body_ids, slice) else tuple(body_ids)
+        return self.get(
+            ("foot_contact", sensor_name, key_ids, threshold),
+            lambda: torch.logical_or(
+                self.contact_force_norms(sensor_name, 0)[:, body_ids] > threshold,
+                self.contact_force_norms(sensor_name, -1)[:, body_ids] > threshold,
+            ),
+        )
@@ -29,7 +29,8 @@ class ParkourTerm(CommandTerm):
 
         extras = {}
         for metric_name, metric_value in self.metrics.items():
-            extras[metric_name] = torch.mean(metric_value).item()
+            # keep the mean on the device, it is only copied to the host when the log is written
+            extras[metric_name] = torch.mean(metric_value)
             metric_value[env_ids] = 0.0
 
         self._resample(env_ids)
@@ -4,7 +4,7 @@ from __future__ import annotations
 import torch
 from typing import TYPE_CHECKING
 import omni.kit.app
-from isaaclab.managers import RewardManager
+from isaaclab.managers import RewardManager, SceneEntityCfg
 
 if TYPE_CHECKING:
     from parkour_isaaclab.envs import ParkourManagerBasedRLEnv
@@ -14,6 +14,10 @@ class ParkourRewardManager(RewardManager):
 
     def __init__(self, cfg: object, env: ParkourManagerBasedRLEnv):
         super().__init__(cfg, env)
+        # name of the term -> name of the term function, for the terms evaluated by the fused kernel
+        self._fused_terms: dict[str, str] = {}
+        if getattr(env.cfg, "fused_rewards", False):
+            self._prepare_fused_rewards()
 
     def compute(self, dt: float) -> torch.Tensor:
         """
@@ -21,6 +25,8 @@ class ParkourRewardManager(RewardManager):
         """
         # reset computation
         self._reward_buf[:] = 0.0
+        # evaluate all fused stateless terms at once
+        fused_values = self._compute_fused_rewards() if len(self._fused_terms) > 0 else {}
         # iterate over all the reward terms
         for term_idx, (name, term_cfg) in enumerate(zip(self._term_names, self._term_cfgs)):
             # skip if weight is zero (kind of a micro-optimization)
@@ -28,7 +34,10 @@ class ParkourRewardManager(RewardManager):
                 self._step_reward[:, term_idx] = 0.0
                 continue
             # compute term's value
-            value = term_cfg.func(self._env, **term_cfg.params) * term_cfg.weight * dt
+            if name in self._fused_terms:
+                value = fused_values[self._fused_terms[name]] * term_cfg.weight * dt
+            else:
+                value = term_cfg.func(self._env, **term_cfg.params) * term_cfg.weight * dt
             # update total reward
             self._reward_buf += value
             # update episodic sum
@@ -37,3 +46,98 @@ class ParkourRewardManager(RewardManager):
             self._step_reward[:, term_idx] = value / dt
         self._reward_buf[:] = torch.clip(self._reward_buf[:], min=0.)
         return self._reward_buf
+
+    def _prepare_fused_rewards(self):
+        """Select the stateless terms for the fused kernel and resolve their inputs once."""
+        from parkour_isaaclab.envs.mdp.rewards import _FUSABLE_REWARD_TERMS, _fused_stateless_rewards
+
+        fused_cfgs = {}
+        asset_name, parkour_name = None, None
+        for name, term_cfg in zip(self._term_names, self._term_cfgs):
+            func_name = getattr(term_cfg.func, "__name__", None)
+            if term_cfg.func not in _FUSABLE_REWARD_TERMS or term_cfg.weight == 0.0 or func_name in fused_cfgs:
+                continue
+            # all fused terms have to read the same robot and parkour term, the others keep their own call
+            term_asset_name = term_cfg.params.get("asset_cfg", SceneEntityCfg("robot")).name
+            if "sensor_cfg" not in term_cfg.params:
+                if asset_name is None:
+                    asset_name = term_asset_name
+                if term_asset_name != asset_name:
+                    continue
+            if "parkour_name" in term_cfg.params:
+                if parkour_name is None:
+                    parkour_name = term_cfg.params["parkour_name"]
+                if term_cfg.params["parkour_name"] != parkour_name:
+                    continue
+            fused_cfgs[func_name] = term_cfg
+            self._fused_terms[name] = func_name
+        if len(self._fused_terms) == 0:
+            return
+
+        device, num_envs = self.device, self.num_envs
+        self._fused_asset = self._env.scene[asset_name if asset_name is not None else "robot"]
+        self._fused_parkour_event = (
+            self._env.parkour_manager.get_term(parkour_name) if parkour_name is not None else None
+        )
+        self._fused_hip_joint_ids = self._resolve_fused_ids(
+            fused_cfgs.get("reward_hip_pos"), "asset_cfg", "joint_ids", self._fused_asset.num_joints
+        )
+        self._fused_sensors = {}
+        self._fused_body_ids = {}
+        for func_name in ("reward_feet_stumble", "reward_collision"):
+            term_cfg = fused_cfgs.get(func_name)
+            sensor = self._env.scene.sensors[term_cfg.params["sensor_cfg"].name] if term_cfg is not None else None
+            self._fused_sensors[func_name] = sensor
+            self._fused_body_ids[func_name] = self._resolve_fused_ids(
+                term_cfg, "sensor_cfg", "body_ids", sensor.num_bodies if sensor is not None else 0
+            )
+        # inputs of the terms that are not fused
+        self._fused_empty_forces = torch.zeros(num_envs, 0, 3, device=device)
+        self._fused_zeros = torch.zeros(num_envs, device=device)
+        self._fused_zeros_2d = torch.zeros(num_envs, 2, device=device)
+        self._fused_false = torch.zeros(num_envs, device=device, dtype=torch.bool)
+        self._fused_kernel = torch.jit.script(_fused_stateless_rewards)
+
+    def _resolve_fused_ids(self, term_cfg, cfg_name: str, ids_name: str, num_ids: int) -> torch.Tensor:
+        if term_cfg is None:
+            return torch.zeros(0, device=self.device, dtype=torch.long)
+        ids = getattr(term_cfg.params[cfg_name], ids_name)
+        if isinstance(ids, slice):
+            ids = range(num_ids)[ids]
+        return torch.tensor(list(ids), device=self.device, dtype=torch.long)
+
+    def _compute_fused_rewards(self) -> dict[str, torch.Tensor]:
+        data = self._fused_asset.data
+        parkour_event = self._fused_parkour_event
+        if parkour_event is not None:
+            not_flat = ~parkour_event.get_terrain_mask("parkour_flat")
+            target_pos_rel, target_yaw = parkour_event.target_pos_rel, parkour_event.target_yaw
+        else:
+            not_flat, target_pos_rel, target_yaw = self._fused_false, self._fused_zeros_2d, self._fused_zeros
+        if "reward_tracking_goal_vel" in self._fused_terms.values():
+            command_vel = self._env.command_manager.get_command("base_velocity")[:, 0]
+        else:
+            command_vel = self._fused_zeros
+        net_forces_w = {
+            func_name: sensor.data.net_forces_w_history[:, 0] if sensor is not None else self._fused_empty_forces
+            for func_name, sensor in self._fused_sensors.items()
+        }
+        return self._fused_kernel(
+            data.applied_torque,
+            data.joint_pos,
+            data.default_joint_pos,
+            self._fused_hip_joint_ids,
+            data.root_ang_vel_b,
+            data.root_lin_vel_b,
+            data.projected_gravity_b,
+            data.root_vel_w,
+            data.root_quat_w,
+            net_forces_w["reward_feet_stumble"],
+            self._fused_body_ids["reward_feet_stumble"],
+            net_forces_w["reward_collision"],
+            self._fused_body_ids["reward_collision"],
+            not_flat,
+            target_pos_rel,
+            target_yaw,
+            command_vel,
+        )
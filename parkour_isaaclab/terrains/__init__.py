@@ -1,5 +1,6 @@
 from .extreme_parkour import *
-from .utils import parkour_field_to_mesh
+from .utils import parkour_field_to_mesh, compile_difficulty_expression
 from .parkour_terrain_generator_cfg import ParkourSubTerrainBaseCfg, ParkourTerrainGeneratorCfg
+from .parkour_edge_mask import ParkourEdgeMask
 from .parkour_terrain_generator import ParkourTerrainGenerator
 from .parkour_terrain_importer import ParkourTerrainImporter
\ No newline at end of file
@@ -4,7 +4,11 @@ import numpy as np
 import random
 import scipy.interpolate as interpolate
 from typing import TYPE_CHECKING
-from ..utils import parkour_field_to_mesh
+from ..utils import (
+    eval_difficulty_expression,
+    parkour_field_to_mesh,
+    sub_terrain_rng,
+)
 
 if TYPE_CHECKING:
     from . import extreme_parkour_terrains_cfg
@@ -32,6 +36,7 @@ def random_uniform_terrain(
     difficulty: float,
     cfg: extreme_parkour_terrains_cfg.ExtremeParkourRoughTerrainCfg,
     height_field_raw: np.ndarray,
+    rng: np.random.Generator,
 ):
     if cfg.downsampled_scale is None:
         cfg.downsampled_scale = cfg.horizontal_scale
@@ -52,7 +57,7 @@ def random_uniform_terrain(
     # create range of heights possible
     height_range = np.arange(height_min, height_max + height_step, height_step)
     # sample heights randomly from the range along a grid
-    height_field_downsampled = np.random.choice(
+    height_field_downsampled = rng.choice(
         height_range, size=(width_downsampled, length_downsampled)
     )
     # create interpolation function for the sampled heights
@@ -74,6 +79,7 @@ def parkour_fixed_gap_terrain(
     difficulty: float,
     cfg: extreme_parkour_terrains_cfg.ExtremeParkourFixedGapTerrainCfg,
     num_goals: int,
+    rng: np.random.Generator,
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
     间隙地形：平台-间隙-平台-间隙循环往复
@@ -82,15 +88,8 @@ def parkour_fixed_gap_terrain(
     - 通道宽度：cfg.walkway_width (固定值)
     """
     # 评估动态表达式
-    if isinstance(cfg.platform_length, str):
-        platform_length = eval(cfg.platform_length, {"difficulty": difficulty})
-    else:
-        platform_length = cfg.platform_length
-
-    if isinstance(cfg.gap_length, str):
-        gap_length = eval(cfg.gap_length, {"difficulty": difficulty})
-    else:
-        gap_length = cfg.gap_length
+    platform_length = eval_difficulty_expression(cfg.platform_length, difficulty)
+    gap_length = eval_difficulty_expression(cfg.gap_length, difficulty)
 
     print(
         f"cfg.internal_horizontal_scale={cfg.internal_horizontal_scale}, difficulty={difficulty:.2f}, "
@@ -113,7 +112,7 @@ def parkour_fixed_gap_terrain(
     # 平台高度和间隙深度
     platform_height = round(cfg.platform_height / cfg.vertical_scale)
     gap_depth = -round(
-        np.random.uniform(cfg.gap_depth[0], cfg.gap_depth[1]) / cfg.vertical_scale
+        rng.uniform(cfg.gap_depth[0], cfg.gap_depth[1]) / cfg.vertical_scale
     )
 
     # 初始平台
@@ -194,7 +193,9 @@ def parkour_fixed_gap_terrain(
 
     # 可选：添加粗糙表面
     if cfg.apply_roughness:
-        height_field_raw = random_uniform_terrain(difficulty, cfg, height_field_raw)
+        height_field_raw = random_uniform_terrain(
+            difficulty, cfg, height_field_raw, rng
+        )
 
     return (
         height_field_raw,
@@ -210,6 +211,7 @@ def parkour_gap_terrain(
     difficulty: float,
     cfg: extreme_parkour_terrains_cfg.ExtremeParkourGapTerrainCfg,
     num_goals: int,
+    rng: np.random.Generator,
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     width_pixels = int(cfg.size[0] / cfg.horizontal_scale)
     length_pixels = int(cfg.size[1] / cfg.horizontal_scale)
@@ -218,17 +220,11 @@ def parkour_gap_terrain(
     gap_size_expr = getattr(cfg, "gap_width", None)
     if gap_size_expr is None:
         gap_size_expr = cfg.gap_size
-    if isinstance(gap_size_expr, str):
-        gap_width = eval(gap_size_expr, {"difficulty": difficulty})
-    else:
-        gap_width = gap_size_expr
+    gap_width = eval_difficulty_expression(gap_size_expr, difficulty)
     gap_size = max(round(gap_width / cfg.horizontal_scale), 1)
 
     height_drop_expr = getattr(cfg, "height_drop_per_gap", 0.0)
-    if isinstance(height_drop_expr, str):
-        height_drop = eval(height_drop_expr, {"difficulty": difficulty})
-    else:
-        height_drop = height_drop_expr
+    height_drop = eval_difficulty_expression(height_drop_expr, difficulty)
     height_drop_cells = max(round(height_drop / cfg.vertical_scale), 0)
 
     dis_x_min = round(cfg.x_range[0] / cfg.horizontal_scale) + gap_size
@@ -248,10 +244,10 @@ def parkour_gap_terrain(
     height_field_raw[0:platform_len, :] = platform_height
 
     gap_depth = -round(
-        np.random.uniform(cfg.gap_depth[0], cfg.gap_depth[1]) / cfg.vertical_scale
+        rng.uniform(cfg.gap_depth[0], cfg.gap_depth[1]) / cfg.vertical_scale
     )
     half_valid_width = round(
-        np.random.uniform(cfg.half_valid_width[0], cfg.half_valid_width[1])
+        rng.uniform(cfg.half_valid_width[0], cfg.half_valid_width[1])
         / cfg.horizontal_scale
     )
     goals = np.zeros((num_goals, 2))
@@ -265,9 +261,9 @@ def parkour_gap_terrain(
     current_walkway_right = min(mid_y + half_valid_width, length_pixels)
     current_walkway_center = mid_y
     for i in range(num_goals - 2):
-        rand_x = np.random.randint(dis_x_min, dis_x_max)
+        rand_x = rng.integers(dis_x_min, dis_x_max)
         dis_x += rand_x
-        rand_y = np.random.randint(dis_y_min, dis_y_max)
+        rand_y = rng.integers(dis_y_min, dis_y_max)
         walkway_center = mid_y + rand_y
         walkway_left = int(
             np.clip(walkway_center - half_valid_width, 0, length_pixels - 1)
@@ -298,7 +294,7 @@ def parkour_gap_terrain(
         current_walkway_center = walkway_center
         if height_drop_cells > 0:
             current_height -= height_drop_cells
-    final_dis_x = dis_x + np.random.randint(dis_x_min, dis_x_max)
+    final_dis_x = dis_x + rng.integers(dis_x_min, dis_x_max)
 
     if final_dis_x > width_pixels:
         final_dis_x = width_pixels - 0.5 // cfg.horizontal_scale
@@ -330,7 +326,9 @@ def parkour_gap_terrain(
     edge_mask[:, 1:] |= height_diff_y >= min_height_step
     height_field_raw = padding_height_field_raw(height_field_raw, cfg)
     if cfg.apply_roughness:
-        height_field_raw = random_uniform_terrain(difficulty, cfg, height_field_raw)
+        height_field_raw = random_uniform_terrain(
+            difficulty, cfg, height_field_raw, rng
+        )
     return (
         height_field_raw,
         goals * cfg.horizontal_scale,
@@ -344,9 +342,10 @@ def parkour_hurdle_terrain(
     difficulty: float,
     cfg: extreme_parkour_terrains_cfg.ExtremeParkourHurdleTerrainCfg,
     num_goals: int,
+    rng: np.random.Generator,
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
 
-    stone_len = eval(cfg.stone_len, {"difficulty": difficulty})
+    stone_len = eval_difficulty_expression(cfg.stone_len, difficulty)
     stone_len = round(stone_len / cfg.horizontal_scale)
 
     width_pixels = int(cfg.size[0] / cfg.horizontal_scale)
@@ -360,10 +359,12 @@ def parkour_hurdle_terrain(
     dis_y_max = round(cfg.y_range[1] / cfg.horizontal_scale)
 
     half_valid_width = round(
-        np.random.uniform(cfg.half_valid_width[0], cfg.half_valid_width[1])
+        rng.uniform(cfg.half_valid_width[0], cfg.half_valid_width[1])
         / cfg.horizontal_scale
     )
-    hurdle_height_range = eval(cfg.hurdle_height_range, {"difficulty": difficulty})
+    hurdle_height_range = eval_difficulty_expression(
+        cfg.hurdle_height_range, difficulty
+    )
     hurdle_height_max = round(hurdle_height_range[1] / cfg.vertical_scale)
     hurdle_height_min = round(hurdle_height_range[0] / cfg.vertical_scale)
 
@@ -377,12 +378,12 @@ def parkour_hurdle_terrain(
     goals[0] = [platform_len - 1, mid_y]
 
     for i in range(num_goals - 2):
-        rand_x = np.random.randint(dis_x_min, dis_x_max)
-        rand_y = np.random.randint(dis_y_min, dis_y_max)
+        rand_x = rng.integers(dis_x_min, dis_x_max)
+        rand_y = rng.integers(dis_y_min, dis_y_max)
         dis_x += rand_x
         if not cfg.apply_flat:
             height_field_raw[dis_x - stone_len // 2 : dis_x + stone_len // 2,] = (
-                np.random.randint(hurdle_height_min, hurdle_height_max)
+                rng.integers(hurdle_height_min, hurdle_height_max)
             )
             height_field_raw[
                 dis_x - stone_len // 2 : dis_x + stone_len // 2,
@@ -393,14 +394,16 @@ def parkour_hurdle_terrain(
                 mid_y + rand_y + half_valid_width :,
             ] = 0
         goals[i + 1] = [dis_x - rand_x // 2, mid_y + rand_y]
-    final_dis_x = dis_x + np.random.randint(dis_x_min, dis_x_max)
+    final_dis_x = dis_x + rng.integers(dis_x_min, dis_x_max)
 
     if final_dis_x > width_pixels:
         final_dis_x = width_pixels - 0.5 // cfg.horizontal_scale
     goals[-1] = [final_dis_x, mid_y]
     height_field_raw = padding_height_field_raw(height_field_raw, cfg)
     if cfg.apply_roughness:
-        height_field_raw = random_uniform_terrain(difficulty, cfg, height_field_raw)
+        height_field_raw = random_uniform_terrain(
+            difficulty, cfg, height_field_raw, rng
+        )
     return (
         height_field_raw,
         goals * cfg.horizontal_scale,
@@ -413,8 +416,9 @@ def parkour_step_terrain(
     difficulty: float,
     cfg: extreme_parkour_terrains_cfg.ExtremeParkourStepTerrainCfg,
     num_goals: int,
+    rng: np.random.Generator,
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
-    step_height = eval(cfg.step_height, {"difficulty": difficulty})
+    step_height = eval_difficulty_expression(cfg.step_height, difficulty)
     width_pixels = int(cfg.size[0] / cfg.horizontal_scale)
     length_pixels = int(cfg.size[1] / cfg.horizontal_scale)
     height_field_raw = np.zeros((width_pixels, length_pixels))
@@ -428,7 +432,7 @@ def parkour_step_terrain(
     step_height = round(step_height / cfg.vertical_scale)
 
     half_valid_width = round(
-        np.random.uniform(cfg.half_valid_width[0], cfg.half_valid_width[1])
+        rng.uniform(cfg.half_valid_width[0], cfg.half_valid_width[1])
         / cfg.horizontal_scale
     )
 
@@ -445,8 +449,8 @@ def parkour_step_terrain(
 
     num_stones = num_goals - 2
     for i in range(num_stones):
-        rand_x = np.random.randint(dis_x_min, dis_x_max)
-        rand_y = np.random.randint(dis_y_min, dis_y_max)
+        rand_x = rng.integers(dis_x_min, dis_x_max)
+        rand_y = rng.integers(dis_y_min, dis_y_max)
         if i < num_stones // 2:
             stair_height += step_height
         elif i > num_stones // 2:
@@ -459,14 +463,16 @@ def parkour_step_terrain(
         last_dis_x = dis_x
         goals[i + 1] = [dis_x - rand_x // 2, mid_y + rand_y]
         goal_heights[i + 1] = stair_height
-    final_dis_x = dis_x + np.random.randint(dis_x_min, dis_x_max)
+    final_dis_x = dis_x + rng.integers(dis_x_min, dis_x_max)
     # import ipdb; ipdb.set_trace()
     if final_dis_x > width_pixels:
         final_dis_x = width_pixels - 0.5 // cfg.horizontal_scale
     goals[-1] = [final_dis_x, mid_y]
     height_field_raw = padding_height_field_raw(height_field_raw, cfg)
     if cfg.apply_roughness:
-        height_field_raw = random_uniform_terrain(difficulty, cfg, height_field_raw)
+        height_field_raw = random_uniform_terrain(
+            difficulty, cfg, height_field_raw, rng
+        )
     return height_field_raw, goals * cfg.horizontal_scale, goal_heights
 
 
@@ -475,20 +481,21 @@ def parkour_terrain(
     difficulty: float,
     cfg: extreme_parkour_terrains_cfg.ExtremeParkourTerrainCfg,
     num_goals: int,
+    rng: np.random.Generator,
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     width_pixels = int(cfg.size[0] / cfg.horizontal_scale)
     length_pixels = int(cfg.size[1] / cfg.horizontal_scale)
     height_field_raw = np.zeros((width_pixels, length_pixels))
     height_field_raw[:] = -round(
-        np.random.uniform(cfg.pit_depth[0], cfg.pit_depth[1]) / cfg.vertical_scale
+        rng.uniform(cfg.pit_depth[0], cfg.pit_depth[1]) / cfg.vertical_scale
     )
     mid_y = length_pixels // 2  # length is actually y width
-    stone_len = eval(cfg.stone_len, {"difficulty": difficulty})
-    stone_len = np.random.uniform(*stone_len)
+    stone_len = eval_difficulty_expression(cfg.stone_len, difficulty)
+    stone_len = rng.uniform(*stone_len)
     stone_len = 2 * round(stone_len / 2.0, 1)
     stone_len = round(stone_len / cfg.horizontal_scale)
-    x_range = eval(cfg.x_range, {"difficulty": difficulty})
-    y_range = eval(cfg.y_range, {"difficulty": difficulty})
+    x_range = eval_difficulty_expression(cfg.x_range, difficulty)
+    y_range = eval_difficulty_expression(cfg.y_range, difficulty)
     dis_x_min = stone_len + round(x_range[0] / cfg.horizontal_scale)
     dis_x_max = stone_len + round(x_range[1] / cfg.horizontal_scale)
     dis_y_min = round(y_range[0] / cfg.horizontal_scale)
@@ -501,25 +508,24 @@ def parkour_terrain(
     stone_width = round(cfg.stone_width / cfg.horizontal_scale)
     last_stone_len = round(cfg.last_stone_len / cfg.horizontal_scale)
 
-    incline_height = eval(cfg.incline_height, {"difficulty": difficulty})
-    last_incline_height = eval(
-        cfg.last_incline_height,
-        {"difficulty": difficulty, "incline_height": incline_height},
+    incline_height = eval_difficulty_expression(cfg.incline_height, difficulty)
+    last_incline_height = eval_difficulty_expression(
+        cfg.last_incline_height, difficulty, incline_height=incline_height
     )
     last_incline_height = round(last_incline_height / cfg.vertical_scale)
     incline_height = round(incline_height / cfg.vertical_scale)
 
-    dis_x = platform_len - np.random.randint(dis_x_min, dis_x_max) + stone_len // 2
+    dis_x = platform_len - rng.integers(dis_x_min, dis_x_max) + stone_len // 2
     goals = np.zeros((num_goals, 2))
     goal_heights = np.ones((num_goals)) * platform_height
     goals[0] = [platform_len - stone_len // 2, mid_y]
-    left_right_flag = np.random.randint(0, 2)
+    left_right_flag = rng.integers(0, 2)
     dis_z = 0
     num_stones = num_goals - 2
     for i in range(num_stones):
-        dis_x += np.random.randint(dis_x_min, dis_x_max)
+        dis_x += rng.integers(dis_x_min, dis_x_max)
         pos_neg = round(2 * (left_right_flag - 0.5))
-        dis_y = mid_y + pos_neg * np.random.randint(dis_y_min, dis_y_max)
+        dis_y = mid_y + pos_neg * rng.integers(dis_y_min, dis_y_max)
         if i == num_stones - 1:
             dis_x += last_stone_len // 4
             heights = (
@@ -554,7 +560,7 @@ def parkour_terrain(
         goal_heights[i + 1] = np.mean(heights.astype(int))
 
         left_right_flag = 1 - left_right_flag
-    final_dis_x = dis_x + 2 * np.random.randint(dis_x_min, dis_x_max)
+    final_dis_x = dis_x + 2 * rng.integers(dis_x_min, dis_x_max)
     final_platform_start = (
         dis_x + last_stone_len // 2 + round(0.05 // cfg.horizontal_scale)
     )
@@ -562,7 +568,9 @@ def parkour_terrain(
     goals[-1] = [final_dis_x, mid_y]
     height_field_raw = padding_height_field_raw(height_field_raw, cfg)
     if cfg.apply_roughness:
-        height_field_raw = random_uniform_terrain(difficulty, cfg, height_field_raw)
+        height_field_raw = random_uniform_terrain(
+            difficulty, cfg, height_field_raw, rng
+        )
 
     return (
         height_field_raw,
@@ -576,6 +584,7 @@ def parkour_demo_terrain(
     difficulty: float,
     cfg: extreme_parkour_terrains_cfg.ExtremeParkourDemoTerrainCfg,
     num_goals: int,
+    rng: np.random.Generator,
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     goals = np.zeros((num_goals, 2))
     width_pixels = int(cfg.size[0] / cfg.horizontal_scale)
@@ -587,19 +596,19 @@ def parkour_demo_terrain(
         cfg.platform_height / cfg.vertical_scale
     )
     platform_length = round(2 / cfg.horizontal_scale)
-    hurdle_depth = round(np.random.uniform(0.35, 0.4) / cfg.horizontal_scale)
-    hurdle_height = round(np.random.uniform(0.3, 0.36) / cfg.vertical_scale)
-    hurdle_width = round(np.random.uniform(1, 1.2) / cfg.horizontal_scale)
+    hurdle_depth = round(rng.uniform(0.35, 0.4) / cfg.horizontal_scale)
+    hurdle_height = round(rng.uniform(0.3, 0.36) / cfg.vertical_scale)
+    hurdle_width = round(rng.uniform(1, 1.2) / cfg.horizontal_scale)
     goals[0] = [platform_length + hurdle_depth / 2, mid_y]
     height_field_raw[
         platform_length : platform_length + hurdle_depth,
         round(mid_y - hurdle_width / 2) : round(mid_y + hurdle_width / 2),
     ] = hurdle_height
 
-    platform_length += round(np.random.uniform(1.5, 2.5) / cfg.horizontal_scale)
-    first_step_depth = round(np.random.uniform(0.45, 0.8) / cfg.horizontal_scale)
-    first_step_height = round(np.random.uniform(0.35, 0.45) / cfg.vertical_scale)
-    first_step_width = round(np.random.uniform(1, 1.2) / cfg.horizontal_scale)
+    platform_length += round(rng.uniform(1.5, 2.5) / cfg.horizontal_scale)
+    first_step_depth = round(rng.uniform(0.45, 0.8) / cfg.horizontal_scale)
+    first_step_height = round(rng.uniform(0.35, 0.45) / cfg.vertical_scale)
+    first_step_width = round(rng.uniform(1, 1.2) / cfg.horizontal_scale)
     goals[1] = [platform_length + first_step_depth / 2, mid_y]
     height_field_raw[
         platform_length : platform_length + first_step_depth,
@@ -608,7 +617,7 @@ def parkour_demo_terrain(
     goal_heights[1] = first_step_height
 
     platform_length += first_step_depth
-    second_step_depth = round(np.random.uniform(0.45, 0.8) / cfg.horizontal_scale)
+    second_step_depth = round(rng.uniform(0.45, 0.8) / cfg.horizontal_scale)
     second_step_height = first_step_height
     second_step_width = first_step_width
     goals[2] = [platform_length + second_step_depth / 2, mid_y]
@@ -620,13 +629,13 @@ def parkour_demo_terrain(
 
     # gap
     platform_length += second_step_depth
-    gap_size = round(np.random.uniform(0.5, 0.8) / cfg.horizontal_scale)
+    gap_size = round(rng.uniform(0.5, 0.8) / cfg.horizontal_scale)
 
     # step down
     platform_length += gap_size
-    third_step_depth = round(np.random.uniform(0.25, 0.6) / cfg.horizontal_scale)
+    third_step_depth = round(rng.uniform(0.25, 0.6) / cfg.horizontal_scale)
     third_step_height = first_step_height
-    third_step_width = round(np.random.uniform(1, 1.2) / cfg.horizontal_scale)
+    third_step_width = round(rng.uniform(1, 1.2) / cfg.horizontal_scale)
     goals[3] = [platform_length + third_step_depth / 2, mid_y]
     height_field_raw[
         platform_length : platform_length + third_step_depth,
@@ -635,7 +644,7 @@ def parkour_demo_terrain(
     goal_heights[3] = third_step_height
 
     platform_length += third_step_depth
-    forth_step_depth = round(np.random.uniform(0.25, 0.6) / cfg.horizontal_scale)
+    forth_step_depth = round(rng.uniform(0.25, 0.6) / cfg.horizontal_scale)
     forth_step_height = first_step_height
     forth_step_width = third_step_width
     goals[4] = [platform_length + forth_step_depth / 2, mid_y]
@@ -647,17 +656,17 @@ def parkour_demo_terrain(
 
     # parkour
     platform_length += forth_step_depth
-    gap_size = round(np.random.uniform(0.1, 0.4) / cfg.horizontal_scale)
+    gap_size = round(rng.uniform(0.1, 0.4) / cfg.horizontal_scale)
     platform_length += gap_size
 
-    left_y = mid_y + round(np.random.uniform(0.15, 0.3) / cfg.horizontal_scale)
-    right_y = mid_y - round(np.random.uniform(0.15, 0.3) / cfg.horizontal_scale)
+    left_y = mid_y + round(rng.uniform(0.15, 0.3) / cfg.horizontal_scale)
+    right_y = mid_y - round(rng.uniform(0.15, 0.3) / cfg.horizontal_scale)
 
-    slope_height = round(np.random.uniform(0.15, 0.22) / cfg.vertical_scale)
-    slope_depth = round(np.random.uniform(0.75, 0.85) / cfg.horizontal_scale)
+    slope_height = round(rng.uniform(0.15, 0.22) / cfg.vertical_scale)
+    slope_depth = round(rng.uniform(0.75, 0.85) / cfg.horizontal_scale)
     slope_width = round(1.0 / cfg.horizontal_scale)
 
-    platform_height = slope_height + np.random.randint(0, 0.2 / cfg.vertical_scale)
+    platform_height = slope_height + rng.integers(0, int(0.2 / cfg.vertical_scale))
 
     goals[5] = [platform_length + slope_depth / 2, left_y]
     heights = (
@@ -691,7 +700,9 @@ def parkour_demo_terrain(
 
     height_field_raw = padding_height_field_raw(height_field_raw, cfg)
     if cfg.apply_roughness:
-        height_field_raw = random_uniform_terrain(difficulty, cfg, height_field_raw)
+        height_field_raw = random_uniform_terrain(
+            difficulty, cfg, height_field_raw, rng
+        )
 
     return (
         height_field_raw,
@@ -705,6 +716,7 @@ def parkour_wall_terrain(
     difficulty: float,
     cfg: extreme_parkour_terrains_cfg.ExtremeParkourWallTerrainCfg,
     num_goals: int,
+    rng: np.random.Generator,
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
     创建墙跳地形 - 机器人需要跳过垂直的墙
@@ -716,10 +728,12 @@ def parkour_wall_terrain(
     mid_y = length_pixels // 2
 
     # 解析配置参数
-    wall_thickness = eval(cfg.wall_thickness, {"difficulty": difficulty})
+    wall_thickness = eval_difficulty_expression(cfg.wall_thickness, difficulty)
     wall_thickness = round(wall_thickness / cfg.horizontal_scale)
 
-    wall_height_range = eval(cfg.wall_height_range, {"difficulty": difficulty})
+    wall_height_range = eval_difficulty_expression(
+        cfg.wall_height_range, difficulty
+    )
     wall_height_min = round(wall_height_range[0] / cfg.vertical_scale)
     wall_height_max = round(wall_height_range[1] / cfg.vertical_scale)
 
@@ -729,7 +743,7 @@ def parkour_wall_terrain(
     dis_y_max = round(cfg.y_range[1] / cfg.horizontal_scale)
 
     half_valid_width = round(
-        np.random.uniform(cfg.half_valid_width[0], cfg.half_valid_width[1])
+        rng.uniform(cfg.half_valid_width[0], cfg.half_valid_width[1])
         / cfg.horizontal_scale
     )
 
@@ -745,14 +759,14 @@ def parkour_wall_terrain(
 
     # 生成多个墙
     for i in range(num_goals - 2):
-        rand_x = np.random.randint(dis_x_min, dis_x_max)
-        rand_y = np.random.randint(dis_y_min, dis_y_max)
+        rand_x = rng.integers(dis_x_min, dis_x_max)
+        rand_y = rng.integers(dis_y_min, dis_y_max)
 
         # 墙前的平台
         height_field_raw[dis_x : dis_x + rand_x - wall_thickness, :] = platform_height
 
         # 创建墙
-        wall_height = np.random.randint(wall_height_min, wall_height_max)
+        wall_height = rng.integers(wall_height_min, wall_height_max)
         wall_start = dis_x + rand_x - wall_thickness
         wall_end = dis_x + rand_x
 
@@ -772,7 +786,7 @@ def parkour_wall_terrain(
             if cfg.add_side_pits:
                 # 在墙两侧添加深坑，防止机器人从边缘绕过
                 pit_depth_value = -round(
-                    np.random.uniform(cfg.pit_depth[0], cfg.pit_depth[1])
+                    rng.uniform(cfg.pit_depth[0], cfg.pit_depth[1])
                     / cfg.vertical_scale
                 )
                 # 墙前的两侧区域变成深坑
@@ -800,7 +814,7 @@ def parkour_wall_terrain(
         goal_heights[i + 1] = wall_height + platform_height
 
     # 最后的平台
-    final_dis_x = dis_x + np.random.randint(dis_x_min, dis_x_max)
+    final_dis_x = dis_x + rng.integers(dis_x_min, dis_x_max)
     if final_dis_x > width_pixels:
         final_dis_x = width_pixels - round(0.5 / cfg.horizontal_scale)
 
@@ -810,7 +824,9 @@ def parkour_wall_terrain(
     # 添加边界和粗糙度
     height_field_raw = padding_height_field_raw(height_field_raw, cfg)
     if cfg.apply_roughness:
-        height_field_raw = random_uniform_terrain(difficulty, cfg, height_field_raw)
+        height_field_raw = random_uniform_terrain(
+            difficulty, cfg, height_field_raw, rng
+        )
 
     return (
         height_field_raw,
@@ -872,6 +888,7 @@ def parkour_hurdle_terrain_trimesh(
     difficulty: float,
     cfg,  # extreme_parkour_terrains_cfg.ExtremeParkourHurdleTerrainCfg
     num_goals: int,
+    rng: np.random.Generator | None = None,
 ) -> Tuple[list, np.ndarray, np.ndarray, np.ndarray]:
     """
     创建跨栏地形 - 直接生成trimesh
@@ -883,23 +900,27 @@ def parkour_hurdle_terrain_trimesh(
         goals: 目标点坐标
         goal_heights: 目标点高度
     """
+    if rng is None:
+        rng = sub_terrain_rng(getattr(cfg, "seed", None))
     width = cfg.size[0]
     length = cfg.size[1]
     mid_y = length / 2
 
     # 解析配置参数 - 所有横截面都是正方形
-    pole_size = eval(cfg.pole_size, {"difficulty": difficulty})  # 柱子边长
-    bar_size = eval(cfg.bar_size, {"difficulty": difficulty})  # 横杆边长
+    pole_size = eval_difficulty_expression(cfg.pole_size, difficulty)  # 柱子边长
+    bar_size = eval_difficulty_expression(cfg.bar_size, difficulty)  # 横杆边长
 
-    hurdle_height_range = eval(cfg.hurdle_height_range, {"difficulty": difficulty})
-    hurdle_height = np.random.uniform(hurdle_height_range[0], hurdle_height_range[1])
+    hurdle_height_range = eval_difficulty_expression(
+        cfg.hurdle_height_range, difficulty
+    )
+    hurdle_height = rng.uniform(hurdle_height_range[0], hurdle_height_range[1])
 
     dis_x_min = cfg.x_range[0]
     dis_x_max = cfg.x_range[1]
     dis_y_min = cfg.y_range[0]
     dis_y_max = cfg.y_range[1]
 
-    half_valid_width = np.random.uniform(
+    half_valid_width = rng.uniform(
         cfg.half_valid_width[0], cfg.half_valid_width[1]
     )
 
@@ -922,8 +943,8 @@ def parkour_hurdle_terrain_trimesh(
 
     # 生成多个跨栏
     for i in range(num_goals - 2):
-        rand_x = np.random.uniform(dis_x_min, dis_x_max)
-        rand_y = np.random.uniform(dis_y_min, dis_y_max)
+        rand_x = rng.uniform(dis_x_min, dis_x_max)
+        rand_y = rng.uniform(dis_y_min, dis_y_max)
         dis_x += rand_x
 
         hurdle_center_y = mid_y + rand_y
@@ -955,7 +976,7 @@ def parkour_hurdle_terrain_trimesh(
         goal_heights[i + 1] = platform_height
 
     # 最终目标
-    final_dis_x = dis_x + np.random.uniform(dis_x_min, dis_x_max)
+    final_dis_x = dis_x + rng.uniform(dis_x_min, dis_x_max)
     if final_dis_x > width:
         final_dis_x = width - 0.5
     goals[-1] = [final_dis_x, mid_y]
@@ -980,6 +1001,7 @@ def parkour_slope_terrain(
     difficulty: float,
     cfg: extreme_parkour_terrains_cfg.ExtremeParkourSlopeTerrainCfg,
     num_goals: int,
+    rng: np.random.Generator,
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
     前进方向的斜坡地形：
@@ -999,16 +1021,15 @@ def parkour_slope_terrain(
     height_field_raw[0:platform_len, :] = platform_height
 
     # 解析斜率与段长范围
-    slope_range = eval(cfg.slope_range, {"difficulty": difficulty})
+    slope_range = eval_difficulty_expression(cfg.slope_range, difficulty)
     if not (isinstance(slope_range, (tuple, list)) and len(slope_range) == 2):
         raise ValueError(
             f"slope_range 应该是两个值的表达式，比如 '-0.1, 0.2'，当前为: {cfg.slope_range}"
         )
 
-    if isinstance(cfg.segment_width_range, str):
-        segment_width_range = eval(cfg.segment_width_range, {"difficulty": difficulty})
-    else:
-        segment_width_range = cfg.segment_width_range
+    segment_width_range = eval_difficulty_expression(
+        cfg.segment_width_range, difficulty
+    )
 
     if not (
         isinstance(segment_width_range, (tuple, list)) and len(segment_width_range) == 2
@@ -1039,12 +1060,12 @@ def parkour_slope_terrain(
         if dis_x >= width_pixels:
             break
 
-        seg_len = np.random.randint(seg_len_min, seg_len_max)
+        seg_len = rng.integers(seg_len_min, seg_len_max)
         x_start = dis_x
         x_end = min(dis_x + seg_len, width_pixels)
 
         # 采样一个斜率（上坡为正，下坡为负）
-        raw_slope = np.random.uniform(
+        raw_slope = rng.uniform(
             slope_range[0], slope_range[1]
         )  # 单位：m 高 / m 宽（x方向）
         slope_grid = raw_slope * (
@@ -1086,7 +1107,9 @@ def parkour_slope_terrain(
     # 边界 padding + 粗糙度
     height_field_raw = padding_height_field_raw(height_field_raw, cfg)
     if cfg.apply_roughness:
-        height_field_raw = random_uniform_terrain(difficulty, cfg, height_field_raw)
+        height_field_raw = random_uniform_terrain(
+            difficulty, cfg, height_field_raw, rng
+        )
 
     return (
         height_field_raw,
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import numpy as np
+import torch
+
+
+class ParkourEdgeMask:
+    """Bit-packed x edge mask of the whole parkour terrain grid.
+
+    Every sub-terrain keeps its ``(width_pixels, length_pixels)`` mask with the rows packed into
+    bytes (8 cells per byte, least significant bit first), so the mask of the full grid takes an
+    eighth of a byte per cell instead of the two bytes of a dense int16 tensor. Foot positions are
+    looked up in a single batched gather with :meth:`lookup`.
+    """
+
+    def __init__(
+        self,
+        bits: np.ndarray | torch.Tensor,
+        length_pixels: int,
+        horizontal_scale: float,
+        size: tuple[float, float],
+        device: str = "cpu",
+    ):
+        """Initialize the edge mask.
+
+        Args:
+            bits: Packed masks of shape (num_rows, num_cols, width_pixels, ceil(length_pixels / 8))
+                as produced by :meth:`pack`.
+            length_pixels: Number of cells of a sub-terrain along y (before packing).
+            horizontal_scale: Size of a cell (in m).
+            size: Size of a sub-terrain (in m).
+            device: Device to keep the packed bits on.
+        """
+        bits = torch.as_tensor(bits, dtype=torch.uint8)
+        self.num_rows, self.num_cols, self.width_pixels, self.row_bytes = bits.shape
+        self.length_pixels = length_pixels
+        self.horizontal_scale = horizontal_scale
+        self.size = tuple(size)
+        self.device = device
+        self.bits = bits.reshape(-1).to(device)
+        # the grid is centered at the world origin
+        self.rows_offset = size[0] * self.num_rows / 2
+        self.cols_offset = size[1] * self.num_cols / 2
+
+    @staticmethod
+    def pack(x_edge_mask: np.ndarray) -> np.ndarray:
+        """Pack the last axis of a boolean mask into bytes."""
+        return np.packbits(np.asarray(x_edge_mask, dtype=bool), axis=-1, bitorder="little")
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Shape of the unpacked mask of the full grid in cells."""
+        return self.num_rows * self.width_pixels, self.num_cols * self.length_pixels
+
+    @property
+    def nbytes(self) -> int:
+        """Memory taken by the packed bits (in bytes)."""
+        return self.bits.numel() * self.bits.element_size()
+
+    def to(self, device: str) -> ParkourEdgeMask:
+        """Return a copy of the mask with the packed bits on ``device``."""
+        bits = self.bits.reshape(self.num_rows, self.num_cols, self.width_pixels, self.row_bytes)
+        return ParkourEdgeMask(bits, self.length_pixels, self.horizontal_scale, self.size, device)
+
+    def lookup(self, pos_w: torch.Tensor) -> torch.Tensor:
+        """Whether the world positions lie on an x edge.
+
+        Positions are rounded to the nearest cell and clipped to the grid, like indexing the dense
+        mask of the full grid.
+
+        Args:
+            pos_w: World positions of shape (..., 2) or (..., 3). Only x and y are used.
+
+        Returns:
+            Boolean tensor of shape (...).
+        """
+        total_width, total_length = self.shape
+        pos_x = ((pos_w[..., 0] + self.rows_offset) / self.horizontal_scale).round().long()
+        pos_y = ((pos_w[..., 1] + self.cols_offset) / self.horizontal_scale).round().long()
+        pos_x = torch.clip(pos_x, 0, total_width - 1)
+        pos_y = torch.clip(pos_y, 0, total_length - 1)
+        # split the global cell index into sub-terrain and cell within the sub-terrain
+        row, x = pos_x // self.width_pixels, pos_x % self.width_pixels
+        col, y = pos_y // self.length_pixels, pos_y % self.length_pixels
+        byte_idx = ((row * self.num_cols + col) * self.width_pixels + x) * self.row_bytes + (y >> 3)
+        return ((self.bits[byte_idx].long() >> (y & 7)) & 1).bool()
+
+    def unpack(self) -> torch.Tensor:
+        """Dense boolean mask of the full grid, e.g. for debugging. Allocates the full mask."""
+        bits = self.bits.reshape(self.num_rows, self.num_cols, self.width_pixels, self.row_bytes)
+        shifts = torch.arange(8, device=bits.device, dtype=torch.uint8)
+        mask = ((bits.unsqueeze(-1) >> shifts) & 1).bool()
+        mask = mask.reshape(self.num_rows, self.num_cols, self.width_pixels, -1)[..., : self.length_pixels]
+        return mask.permute(0, 2, 1, 3).reshape(self.shape)
@@ -1,20 +1,188 @@
+import os
+import multiprocessing
 import numpy as np
 import trimesh
+from concurrent.futures import ProcessPoolExecutor
 
 import omni.log
 from isaaclab.terrains.trimesh.utils import make_border
 from isaaclab.terrains.terrain_generator import TerrainGenerator
+from isaaclab.utils.dict import dict_to_md5_hash
+from .utils import sub_terrain_rng
+from .parkour_edge_mask import ParkourEdgeMask
 from .parkour_terrain_generator_cfg import (
     ParkourTerrainGeneratorCfg,
     ParkourSubTerrainBaseCfg,
 )
 
 
+SUB_TERRAIN_CACHE_VERSION = 2
+"""Version of the on-disk sub-terrain cache layout. Bump it when the stored fields change."""
+
+
+def save_sub_terrain_cache(
+    filename: str,
+    mesh: trimesh.Trimesh,
+    origin: np.ndarray,
+    goals: np.ndarray,
+    goal_heights: np.ndarray,
+    x_edge_mask: np.ndarray,
+):
+    """Store a generated sub-terrain as a single uncompressed ``.npz`` archive.
+
+    Faces are stored as int32 and the edge mask is bit-packed, so a cell is a fraction of
+    the size of the equivalent ``.obj`` export while all float data stays bit-exact. The
+    archive is written to a temporary file first and moved into place, so concurrent
+    launches sharing a cache directory never observe a partially written file.
+    """
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    x_edge_mask = np.asarray(x_edge_mask, dtype=bool)
+    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp_filename, "wb") as f:
+        np.savez(
+            f,
+            vertices=np.asarray(mesh.vertices),
+            faces=np.asarray(mesh.faces, dtype=np.int32),
+            origin=np.asarray(origin),
+            goals=np.asarray(goals),
+            goal_heights=np.asarray(goal_heights),
+            x_edge_mask=np.packbits(x_edge_mask, axis=None),
+            x_edge_mask_shape=np.asarray(x_edge_mask.shape, dtype=np.int64),
+        )
+    os.replace(tmp_filename, filename)
+
+
+def load_sub_terrain_cache(
+    filename: str,
+) -> tuple[trimesh.Trimesh, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Load a sub-terrain stored by :func:`save_sub_terrain_cache`.
+
+    ``np.load`` only reads the members of the archive as they are accessed, and the mesh is
+    rebuilt with ``process=False`` so the vertex order matches the freshly generated mesh.
+    """
+    with np.load(filename) as data:
+        mesh = trimesh.Trimesh(
+            vertices=data["vertices"], faces=data["faces"], process=False
+        )
+        x_edge_mask_shape = tuple(data["x_edge_mask_shape"])
+        x_edge_mask = np.unpackbits(
+            data["x_edge_mask"], count=int(np.prod(x_edge_mask_shape))
+        ).reshape(x_edge_mask_shape).astype(bool)
+        return (
+            mesh,
+            data["origin"].copy(),
+            data["goals"].copy(),
+            data["goal_heights"].copy(),
+            x_edge_mask,
+        )
+
+
+def generate_sub_terrain(
+    terrain_cfg: ParkourTerrainGeneratorCfg,
+    difficulty: float,
+    cfg: ParkourSubTerrainBaseCfg,
+    sub_row: int = 0,
+    sub_col: int = 0,
+    seed: int | None = None,
+) -> tuple[trimesh.Trimesh, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Generate (or load from the cache) a single sub-terrain centered at the origin.
+
+    The terrain function draws from a generator derived from ``(seed, sub_row, sub_col)``,
+    so the result does not depend on the other cells. ``seed`` defaults to the seed of
+    ``terrain_cfg``. This is kept free of generator state so that it can run in worker
+    processes.
+    """
+    if seed is None:
+        seed = terrain_cfg.seed
+    # copy the configuration
+    cfg: ParkourSubTerrainBaseCfg = cfg.copy()
+    # add other parameters to the sub-terrain configuration
+    cfg.difficulty = float(difficulty)
+    cfg.seed = seed
+    # generate hash for the sub-terrain
+    sub_terrain_hash = dict_to_md5_hash(
+        {
+            "cfg": cfg.to_dict(),
+            "num_goals": terrain_cfg.num_goals,
+            "cell": (int(sub_row), int(sub_col)),
+            "version": SUB_TERRAIN_CACHE_VERSION,
+        }
+    )
+    sub_terrain_cache_filename = os.path.join(
+        terrain_cfg.cache_dir, f"{sub_terrain_hash}.npz"
+    )
+    # check if hash exists - if true, load the cached sub-terrain and return
+    if terrain_cfg.use_cache and os.path.exists(sub_terrain_cache_filename):
+        try:
+            return load_sub_terrain_cache(sub_terrain_cache_filename)
+        except (OSError, KeyError, ValueError) as e:
+            omni.log.warn(
+                f"Failed to load cached sub-terrain '{sub_terrain_cache_filename}': {e}."
+                " Regenerating it."
+            )
+    # generate the terrain
+    meshes, origin, goals, goal_heights, x_edge_mask = cfg.function(
+        difficulty, cfg, terrain_cfg.num_goals, sub_terrain_rng(seed, sub_row, sub_col)
+    )
+    mesh = trimesh.util.concatenate(meshes)
+    # offset mesh such that they are in their center
+    transform = np.eye(4)
+    transform[0:2, -1] = -cfg.size[0] * 0.5, -cfg.size[1] * 0.5
+    mesh.apply_transform(transform)
+    # change origin to be in the center of the sub-terrain
+    origin += transform[0:3, -1]
+
+    # if caching is enabled, save the mesh and origin
+    if terrain_cfg.use_cache:
+        save_sub_terrain_cache(
+            sub_terrain_cache_filename,
+            mesh,
+            origin,
+            goals,
+            goal_heights,
+            x_edge_mask,
+        )
+
+    return mesh, origin, goals, goal_heights, x_edge_mask
+
+
+_worker_terrain_cfg: ParkourTerrainGeneratorCfg | None = None
+_worker_seed: int = 0
+
+
+def _init_sub_terrain_worker(terrain_cfg: ParkourTerrainGeneratorCfg, seed: int):
+    global _worker_terrain_cfg, _worker_seed
+    _worker_terrain_cfg = terrain_cfg
+    _worker_seed = seed
+
+
+def _sub_terrain_worker(job: tuple[int, int, float, str]):
+    sub_row, sub_col, difficulty, sub_terrain_name = job
+    mesh, origin, goals, goal_heights, x_edge_mask = generate_sub_terrain(
+        _worker_terrain_cfg,
+        difficulty,
+        _worker_terrain_cfg.sub_terrains[sub_terrain_name],
+        sub_row,
+        sub_col,
+        _worker_seed,
+    )
+    # ship the raw buffers back, the parent rebuilds the mesh without re-processing it
+    return (
+        np.asarray(mesh.vertices),
+        np.asarray(mesh.faces),
+        origin,
+        goals,
+        goal_heights,
+        x_edge_mask,
+    )
+
+
 class ParkourTerrainGenerator(TerrainGenerator):
     def __init__(self, cfg: ParkourTerrainGeneratorCfg, device: str = "cpu"):
         self.num_goals = cfg.num_goals
         self.terrain_type = np.zeros((cfg.num_rows, cfg.num_cols))
         self.goals = np.zeros((cfg.num_rows, cfg.num_cols, self.num_goals, 3))
+        self.terrain_difficulties = np.zeros((cfg.num_rows, cfg.num_cols))
         self.terrain_names = np.zeros((cfg.num_rows, cfg.num_cols, 1)).astype(str)
         width_pixels = int(cfg.size[0] / cfg.horizontal_scale) + 1
         length_pixels = int(cfg.size[1] / cfg.horizontal_scale) + 1
@@ -23,12 +191,37 @@ class ParkourTerrainGenerator(TerrainGenerator):
         self.goal_heights = np.zeros(
             (cfg.num_rows, cfg.num_cols, self.num_goals), dtype=np.float32
         )
-        self.x_edge_maskes = np.zeros(
-            (cfg.num_rows, cfg.num_cols, width_pixels, length_pixels), dtype=np.int16
+        # edge masks are bit-packed along y, see ParkourEdgeMask
+        self.length_pixels = length_pixels
+        self.x_edge_mask_bits = np.zeros(
+            (cfg.num_rows, cfg.num_cols, width_pixels, (length_pixels + 7) // 8),
+            dtype=np.uint8,
+        )
+
+        # same resolution as the base class, which does not keep the seed around.
+        # every cell draws from its own generator derived from this seed
+        self.seed = (
+            cfg.seed if cfg.seed is not None else int(np.random.get_state()[1][0])
         )
 
         super().__init__(cfg=cfg, device=device)
         self.cfg: ParkourTerrainGeneratorCfg
+        self.edge_mask = ParkourEdgeMask(
+            self.x_edge_mask_bits,
+            self.length_pixels,
+            self.cfg.horizontal_scale,
+            self.cfg.size,
+        )
+
+    @property
+    def x_edge_maskes(self) -> np.ndarray:
+        """Dense x edge masks of shape (num_rows, num_cols, width_pixels, length_pixels).
+
+        Unpacked from :attr:`x_edge_mask_bits` on every access, prefer :attr:`edge_mask`.
+        """
+        return np.unpackbits(
+            self.x_edge_mask_bits, axis=-1, count=self.length_pixels, bitorder="little"
+        ).astype(np.int16)
 
     def _generate_random_terrains(self):
         """Add terrains based on randomly sampled difficulty parameter."""
@@ -37,10 +230,10 @@ class ParkourTerrainGenerator(TerrainGenerator):
             [sub_cfg.proportion for sub_cfg in self.cfg.sub_terrains.values()]
         )
         proportions /= np.sum(proportions)
-        # create a list of all terrain configs
-        sub_terrains_cfgs = list(self.cfg.sub_terrains.values())
+        # create a list of all terrain names
         sub_terrains_names = list(self.cfg.sub_terrains.keys())
         # randomly sample sub-terrains
+        jobs = []
         for index in range(self.cfg.num_rows * self.cfg.num_cols):
             # coordinate index of the sub-terrain
             (sub_row, sub_col) = np.unravel_index(
@@ -50,20 +243,14 @@ class ParkourTerrainGenerator(TerrainGenerator):
             sub_index = self.np_rng.choice(len(proportions), p=proportions)
             # randomly sample difficulty parameter
             difficulty = self.np_rng.uniform(*self.cfg.difficulty_range)
-            # generate terrain
-            sub_terrains_name = sub_terrains_names[sub_index]
             self.terrain_type[sub_row, sub_col] = sub_col
-            sub_terrains_cfg = sub_terrains_cfgs[sub_index]
-            mesh, origin, sub_terrain_goal, goal_heights, x_edge_mask = (
-                self._get_terrain_mesh(difficulty, sub_terrains_cfg)
+            self.terrain_names[sub_row, sub_col] = sub_terrains_names[sub_index]
+            self.terrain_difficulties[sub_row, sub_col] = difficulty
+            jobs.append(
+                (int(sub_row), int(sub_col), difficulty, sub_terrains_names[sub_index])
             )
-            # add to sub-terrains
-            self.terrain_names[sub_row, sub_col] = sub_terrains_name
-            self._add_sub_terrain(
-                mesh, origin, sub_row, sub_col, sub_terrain_goal, goal_heights
-            )
-            self.goal_heights[sub_row, sub_col, :] = goal_heights
-            self.x_edge_maskes[sub_row, sub_col, :, :] = x_edge_mask
+        # generate terrains
+        self._generate_sub_terrains(jobs)
 
     def _generate_curriculum_terrains(self):
         """Add terrains based on the difficulty parameter."""
@@ -80,10 +267,10 @@ class ParkourTerrainGenerator(TerrainGenerator):
             )
             sub_indices.append(sub_index)
         sub_indices = np.array(sub_indices, dtype=np.int32)
-        # create a list of all terrain configs
-        sub_terrains_cfgs = list(self.cfg.sub_terrains.values())
+        # create a list of all terrain names
         sub_terrains_names = list(self.cfg.sub_terrains.keys())
         # curriculum-based sub-terrains
+        jobs = []
         for sub_col in range(self.cfg.num_cols):
             for sub_row in range(self.cfg.num_rows):
                 lower, upper = self.cfg.difficulty_range
@@ -93,47 +280,92 @@ class ParkourTerrainGenerator(TerrainGenerator):
                     difficulty = sub_row / (self.cfg.num_rows - 1)
 
                 difficulty = lower + (upper - lower) * difficulty
-                # generate terrain
-                sub_terrains_cfg = sub_terrains_cfgs[sub_indices[sub_col]]
                 sub_terrains_name = sub_terrains_names[sub_indices[sub_col]]
-                mesh, origin, sub_terrain_goal, goal_heights, x_edge_mask = (
-                    self._get_terrain_mesh(difficulty, sub_terrains_cfg)
-                )
-                # add to sub-terrains
                 self.terrain_type[sub_row, sub_col] = sub_indices[sub_col]
                 self.terrain_names[sub_row, sub_col] = sub_terrains_name
-                self._add_sub_terrain(
-                    mesh, origin, sub_row, sub_col, sub_terrain_goal, goal_heights
+                self.terrain_difficulties[sub_row, sub_col] = difficulty
+                jobs.append((sub_row, sub_col, difficulty, sub_terrains_name))
+        # generate terrains
+        self._generate_sub_terrains(jobs)
+
+    def _generate_sub_terrains(self, jobs: list[tuple[int, int, float, str]]):
+        """Generate the sub-terrains of ``jobs`` and add them in the order of the list.
+
+        Each job is ``(sub_row, sub_col, difficulty, sub_terrain_name)``. With
+        ``cfg.num_workers > 1`` the cells are generated in a process pool; the results are
+        still gathered in job order, so meshes, goals and edge masks end up in the same
+        place as with serial generation.
+        """
+        if self.cfg.num_workers > 1 and len(jobs) > 1:
+            num_workers = min(self.cfg.num_workers, len(jobs))
+            # a few chunks per worker to balance cheap and expensive terrains
+            chunksize = max(1, len(jobs) // (4 * num_workers))
+            with ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context(self.cfg.worker_start_method),
+                initializer=_init_sub_terrain_worker,
+                initargs=(self.cfg, self.seed),
+            ) as executor:
+                for job, result in zip(
+                    jobs, executor.map(_sub_terrain_worker, jobs, chunksize=chunksize)
+                ):
+                    vertices, faces, *sub_terrain = result
+                    mesh = trimesh.Trimesh(
+                        vertices=vertices, faces=faces, process=False
+                    )
+                    self._add_generated_sub_terrain(job, mesh, *sub_terrain)
+        else:
+            for job in jobs:
+                sub_row, sub_col, difficulty, sub_terrains_name = job
+                sub_terrains_cfg = self.cfg.sub_terrains[sub_terrains_name]
+                sub_terrain = self._get_terrain_mesh(
+                    difficulty, sub_terrains_cfg, sub_row, sub_col
                 )
-                self.goal_heights[sub_row, sub_col, :] = goal_heights
-                self.x_edge_maskes[sub_row, sub_col, :, :] = x_edge_mask
+                self._add_generated_sub_terrain(job, *sub_terrain)
+
+    def _add_generated_sub_terrain(
+        self,
+        job: tuple[int, int, float, str],
+        mesh: trimesh.Trimesh,
+        origin: np.ndarray,
+        sub_terrain_goal: np.ndarray,
+        goal_heights: np.ndarray,
+        x_edge_mask: np.ndarray,
+    ):
+        sub_row, sub_col = job[:2]
+        # add to sub-terrains
+        self._add_sub_terrain(
+            mesh, origin, sub_row, sub_col, sub_terrain_goal, goal_heights
+        )
+        self.goal_heights[sub_row, sub_col, :] = goal_heights
+        self.x_edge_mask_bits[sub_row, sub_col] = ParkourEdgeMask.pack(x_edge_mask)
 
     def _get_terrain_mesh(
         self,
         difficulty: float,
         cfg: ParkourSubTerrainBaseCfg,
-    ) -> tuple[trimesh.Trimesh, np.ndarray, np.ndarray]:
-        # copy the configuration
-        cfg: ParkourSubTerrainBaseCfg = cfg.copy()
-        # add other parameters to the sub-terrain configuration
-        cfg.difficulty = float(difficulty)
-        cfg.seed = self.cfg.seed
-        # generate hash for the sub-terrain
-        # generate the terrain
-        meshes, origin, goals, goal_heights, x_edge_mask = cfg.function(
-            difficulty, cfg, self.num_goals
-        )
-        mesh = trimesh.util.concatenate(meshes)
-        # offset mesh such that they are in their center
-        transform = np.eye(4)
-        transform[0:2, -1] = -cfg.size[0] * 0.5, -cfg.size[1] * 0.5
-        mesh.apply_transform(transform)
-        # change origin to be in the center of the sub-terrain
-        origin += transform[0:3, -1]
+        sub_row: int = 0,
+        sub_col: int = 0,
+    ) -> tuple[trimesh.Trimesh, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        return generate_sub_terrain(
+            self.cfg, difficulty, cfg, sub_row, sub_col, self.seed
+        )
 
-        # if caching is enabled, save the mesh and origin
+    def regenerate_sub_terrain(
+        self, sub_row: int, sub_col: int
+    ) -> tuple[trimesh.Trimesh, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Generate a single cell of the grid again, without touching the other cells.
 
-        return mesh, origin, goals, goal_heights, x_edge_mask
+        The result matches the cell generated at construction time and is centered at the
+        origin (the same frame as :meth:`_get_terrain_mesh`).
+        """
+        sub_terrains_name = str(self.terrain_names[sub_row, sub_col, 0])
+        return self._get_terrain_mesh(
+            self.terrain_difficulties[sub_row, sub_col],
+            self.cfg.sub_terrains[sub_terrains_name],
+            sub_row,
+            sub_col,
+        )
 
     def _add_terrain_border(self):
         """Add a surrounding border over all the sub-terrains into the terrain meshes."""
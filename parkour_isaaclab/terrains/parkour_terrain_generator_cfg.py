@@ -23,3 +23,16 @@ class ParkourTerrainGeneratorCfg(TerrainGeneratorCfg):
     num_goals: int = 8
     terrain_names: list[str] = []
     random_difficulty: bool = False
+    num_workers: int = 0
+    """Number of worker processes used to generate the sub-terrains. Defaults to 0 (serial).
+
+    Values above 1 fan the cells out to a process pool. Every cell draws from its own
+    generator derived from ``(seed, row, col)``, so the result is identical to serial
+    generation.
+    """
+    worker_start_method: str = "fork"
+    """Start method of the worker processes. Defaults to "fork".
+
+    Forked workers inherit the already imported simulator modules; "spawn" and
+    "forkserver" have to re-import them in every worker.
+    """
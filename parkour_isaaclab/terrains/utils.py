@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import ast
 import copy
 import functools
 import numpy as np
+import operator
 import trimesh
 from collections.abc import Callable
 from scipy.ndimage import binary_dilation
@@ -12,9 +14,148 @@ if TYPE_CHECKING:
     from ..terrains import ParkourSubTerrainBaseCfg
 
 
+_DIFFICULTY_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_DIFFICULTY_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+# like the builtins, min and max take any number of arguments, reduced pairwise element-wise
+_DIFFICULTY_FUNCTIONS = {
+    "min": lambda *args: functools.reduce(np.minimum, args),
+    "max": lambda *args: functools.reduce(np.maximum, args),
+    "abs": np.abs,
+}
+# name -> (min, max) number of arguments, None for any number
+_DIFFICULTY_FUNCTION_ARITIES = {"min": (2, None), "max": (2, None), "abs": (1, 1)}
+
+
+def _compile_difficulty_node(node: ast.AST, expression: str) -> Callable[[dict], object]:
+    """Turn one node of a difficulty expression into a closure over the variable dict."""
+    if (
+        isinstance(node, ast.Constant)
+        and isinstance(node.value, (int, float))
+        and not isinstance(node.value, bool)
+    ):
+        value = node.value
+        return lambda names: value
+    if isinstance(node, ast.Name):
+        name = node.id
+
+        def load(names: dict):
+            try:
+                return names[name]
+            except KeyError:
+                raise ValueError(
+                    f"Unknown variable '{name}' in difficulty expression '{expression}'."
+                    f" Available variables: {sorted(names)}."
+                ) from None
+
+        return load
+    if isinstance(node, ast.BinOp) and type(node.op) in _DIFFICULTY_BINARY_OPS:
+        op = _DIFFICULTY_BINARY_OPS[type(node.op)]
+        left = _compile_difficulty_node(node.left, expression)
+        right = _compile_difficulty_node(node.right, expression)
+        return lambda names: op(left(names), right(names))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _DIFFICULTY_UNARY_OPS:
+        op = _DIFFICULTY_UNARY_OPS[type(node.op)]
+        operand = _compile_difficulty_node(node.operand, expression)
+        return lambda names: op(operand(names))
+    if isinstance(node, (ast.Tuple, ast.List)):
+        elements = [_compile_difficulty_node(elt, expression) for elt in node.elts]
+        return lambda names: tuple(element(names) for element in elements)
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in _DIFFICULTY_FUNCTIONS
+        and not node.keywords
+    ):
+        func = _DIFFICULTY_FUNCTIONS[node.func.id]
+        min_args, max_args = _DIFFICULTY_FUNCTION_ARITIES[node.func.id]
+        if len(node.args) < min_args or (max_args is not None and len(node.args) > max_args):
+            expected = f"{min_args} argument" if min_args == max_args == 1 else f"at least {min_args} arguments"
+            raise ValueError(
+                f"'{node.func.id}' takes {expected}, got {len(node.args)} in difficulty"
+                f" expression '{expression}'."
+            )
+        args = [_compile_difficulty_node(arg, expression) for arg in node.args]
+        return lambda names: func(*(arg(names) for arg in args))
+    raise ValueError(
+        f"Unsupported syntax '{ast.unparse(node)}' in difficulty expression '{expression}'."
+        " Only numbers, variables, + - * / // % **, tuples and"
+        f" {sorted(_DIFFICULTY_FUNCTIONS)} are allowed."
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def compile_difficulty_expression(expression: str) -> Callable[..., object]:
+    """Compile a difficulty expression such as ``"0.1 + 0.7*difficulty"`` once.
+
+    The returned function is called as ``func(difficulty, **names)``, where ``names`` are
+    extra variables the expression refers to (e.g. ``incline_height``). Expressions with a
+    comma evaluate to a tuple. Compiled expressions are cached by their text, so every
+    sub-terrain sharing a config only parses it once. Unlike ``eval`` only arithmetic is
+    accepted.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid difficulty expression '{expression}': {e}") from e
+    body = _compile_difficulty_node(tree.body, expression)
+
+    def evaluate(difficulty, **names):
+        names["difficulty"] = difficulty
+        return body(names)
+
+    return evaluate
+
+
+def eval_difficulty_expression(expression, difficulty, **names):
+    """Evaluate a config value that is either a difficulty expression or a plain value.
+
+    Non-string values are returned unchanged. ``difficulty`` may be an array, e.g. the
+    difficulties of a whole column of sub-terrains, in which case every element of the
+    result is an array of the same shape.
+    """
+    if not isinstance(expression, str):
+        return expression
+    result = compile_difficulty_expression(expression)(difficulty, **names)
+    if np.ndim(difficulty) > 0:
+        shape = np.shape(difficulty)
+        if isinstance(result, tuple):
+            return tuple(np.broadcast_to(value, shape) for value in result)
+        return np.broadcast_to(result, shape)
+    return result
+
+
+def sub_terrain_rng(
+    seed: int | None, sub_row: int = 0, sub_col: int = 0
+) -> np.random.Generator:
+    """Random generator of a single sub-terrain cell.
+
+    The stream only depends on ``(seed, sub_row, sub_col)``, so a cell produces the same terrain
+    whether it is generated serially, in a worker process or on its own. With ``seed=None``
+    the generator is seeded from fresh OS entropy.
+    """
+    if seed is None:
+        return np.random.default_rng()
+    return np.random.default_rng(np.random.SeedSequence([seed, sub_row, sub_col]))
+
+
 def parkour_field_to_mesh(func: Callable) -> Callable:
     @functools.wraps(func)
-    def wrapper(difficulty: float, cfg: ParkourSubTerrainBaseCfg, num_goals: int):
+    def wrapper(
+        difficulty: float,
+        cfg: ParkourSubTerrainBaseCfg,
+        num_goals: int,
+        rng: np.random.Generator | None = None,
+    ):
+        if rng is None:
+            rng = sub_terrain_rng(getattr(cfg, "seed", None))
         # generate the height field
         # 如果配置中有 internal_horizontal_scale，则使用它
         if hasattr(cfg, "internal_horizontal_scale"):
@@ -45,7 +186,7 @@ def parkour_field_to_mesh(func: Callable) -> Callable:
         terrain_size = copy.deepcopy(cfg.size)
         cfg.size = tuple(sub_terrain_size)
 
-        result = func(difficulty, cfg, num_goals)
+        result = func(difficulty, cfg, num_goals, rng)
         if len(result) == 5:
             z_gen, goals, goal_heights, custom_edge_mask, _ = (
                 result  # 忽略返回的 scale，已经在开头处理了
@@ -125,71 +266,97 @@ def parkour_field_to_mesh(func: Callable) -> Callable:
     return wrapper
 
 
+@functools.lru_cache(maxsize=16)
+def _height_field_triangles(
+    num_rows: int, num_cols: int, dtype: np.dtype = np.uint32
+) -> np.ndarray:
+    """Triangle indices of a regular ``num_rows x num_cols`` vertex grid.
+
+    The result only depends on the grid shape, so it is computed once per shape and shared by
+    every sub-terrain with the same resolution. The returned array is read-only.
+    """
+    ind0 = (
+        np.arange(num_rows - 1, dtype=np.int64)[:, None] * num_cols
+        + np.arange(num_cols - 1, dtype=np.int64)[None, :]
+    ).reshape(-1)
+    ind1 = ind0 + 1
+    ind2 = ind0 + num_cols
+    ind3 = ind2 + 1
+    triangles = np.empty((2 * ind0.shape[0], 3), dtype=dtype)
+    triangles[0::2, 0] = ind0
+    triangles[0::2, 1] = ind3
+    triangles[0::2, 2] = ind1
+    triangles[1::2, 0] = ind0
+    triangles[1::2, 1] = ind2
+    triangles[1::2, 2] = ind3
+    triangles.flags.writeable = False
+    return triangles
+
+
+def _slope_moves(hf: np.ndarray, slope_threshold: float, axis: int) -> np.ndarray:
+    """Per-vertex shift (-1, 0 or 1 cells) that turns steep steps along ``axis`` into walls.
+
+    ``axis`` is 0 for x, 1 for y and ``None`` for the diagonal corners.
+    """
+    move = np.zeros(hf.shape, dtype=np.int8)
+    if axis is None:
+        upper, lower = hf[1:, 1:], hf[:-1, :-1]
+        move[:-1, :-1] += upper - lower > slope_threshold
+        move[1:, 1:] -= lower - upper > slope_threshold
+    elif axis == 0:
+        upper, lower = hf[1:, :], hf[:-1, :]
+        move[:-1, :] += upper - lower > slope_threshold
+        move[1:, :] -= lower - upper > slope_threshold
+    else:
+        upper, lower = hf[:, 1:], hf[:, :-1]
+        move[:, :-1] += upper - lower > slope_threshold
+        move[:, 1:] -= lower - upper > slope_threshold
+    return move
+
+
 def convert_height_field_to_mesh(
     height_field: np.ndarray,
     horizontal_scale: float,
     vertical_scale: float,
     slope_threshold: float | None = None,
+    triangle_dtype: np.dtype = np.uint32,
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Convert a height field to vertices and triangles of a mesh.
+
+    Vertices that belong to a step steeper than ``slope_threshold`` are moved horizontally
+    onto the step so that it becomes a vertical wall. The returned mask marks the vertices
+    that were moved along x and is used to build the edge mask of the sub-terrain.
+    ``triangle_dtype`` can be set to ``np.int32`` to emit signed indices.
+    """
     num_rows, num_cols = height_field.shape
     # create a mesh grid of the height field
     y = np.linspace(0, (num_cols - 1) * horizontal_scale, num_cols)
     x = np.linspace(0, (num_rows - 1) * horizontal_scale, num_rows)
-    yy, xx = np.meshgrid(y, x)
-    # copy height field to avoid modifying the original array
-    hf = height_field.copy()
+    # create vertices for the mesh
+    vertices = np.empty((num_rows, num_cols, 3), dtype=np.float32)
     # correct vertical surfaces above the slope threshold
     if slope_threshold is not None:
         # scale slope threshold based on the horizontal and vertical scale
         slope_threshold *= horizontal_scale / vertical_scale
-        # allocate arrays to store the movement of the vertices
-        move_x = np.zeros((num_rows, num_cols))
-        move_y = np.zeros((num_rows, num_cols))
-        move_corners = np.zeros((num_rows, num_cols))
-        # move vertices along the x-axis
-        move_x[: num_rows - 1, :] += (
-            hf[1:num_rows, :] - hf[: num_rows - 1, :] > slope_threshold
-        )
-        move_x[1:num_rows, :] -= (
-            hf[: num_rows - 1, :] - hf[1:num_rows, :] > slope_threshold
-        )
-        # move vertices along the y-axis
-        move_y[:, : num_cols - 1] += (
-            hf[:, 1:num_cols] - hf[:, : num_cols - 1] > slope_threshold
-        )
-        move_y[:, 1:num_cols] -= (
-            hf[:, : num_cols - 1] - hf[:, 1:num_cols] > slope_threshold
-        )
-        # move vertices along the corners
-        move_corners[: num_rows - 1, : num_cols - 1] += (
-            hf[1:num_rows, 1:num_cols] - hf[: num_rows - 1, : num_cols - 1]
-            > slope_threshold
-        )
-        move_corners[1:num_rows, 1:num_cols] -= (
-            hf[: num_rows - 1, : num_cols - 1] - hf[1:num_rows, 1:num_cols]
-            > slope_threshold
-        )
-        xx += (move_x + move_corners * (move_x == 0)) * horizontal_scale
-        yy += (move_y + move_corners * (move_y == 0)) * horizontal_scale
-
-    # create vertices for the mesh
-    vertices = np.zeros((num_rows * num_cols, 3), dtype=np.float32)
-    vertices[:, 0] = xx.flatten()
-    vertices[:, 1] = yy.flatten()
-    vertices[:, 2] = hf.flatten() * vertical_scale
+        move_x = _slope_moves(height_field, slope_threshold, axis=0)
+        move_y = _slope_moves(height_field, slope_threshold, axis=1)
+        move_corners = _slope_moves(height_field, slope_threshold, axis=None)
+        # corner moves only apply where the vertex did not move along the axis itself
+        vertices[..., 0] = x[:, None] + np.where(
+            move_x != 0, move_x, move_corners
+        ) * horizontal_scale
+        vertices[..., 1] = y[None, :] + np.where(
+            move_y != 0, move_y, move_corners
+        ) * horizontal_scale
+        x_moved = move_x != 0
+    else:
+        vertices[..., 0] = x[:, None]
+        vertices[..., 1] = y[None, :]
+        x_moved = np.zeros((num_rows, num_cols), dtype=bool)
+    vertices[..., 2] = height_field * vertical_scale
+    vertices = vertices.reshape(-1, 3)
     # create triangles for the mesh
-    triangles = -np.ones((2 * (num_rows - 1) * (num_cols - 1), 3), dtype=np.uint32)
-    for i in range(num_rows - 1):
-        ind0 = np.arange(0, num_cols - 1) + i * num_cols
-        ind1 = ind0 + 1
-        ind2 = ind0 + num_cols
-        ind3 = ind2 + 1
-        start = 2 * i * (num_cols - 1)
-        stop = start + 2 * (num_cols - 1)
-        triangles[start:stop:2, 0] = ind0
-        triangles[start:stop:2, 1] = ind3
-        triangles[start:stop:2, 2] = ind1
-        triangles[start + 1 : stop : 2, 0] = ind0
-        triangles[start + 1 : stop : 2, 1] = ind2
-        triangles[start + 1 : stop : 2, 2] = ind3
-    return vertices, triangles, move_x != 0
+    triangles = _height_field_triangles(
+        num_rows, num_cols, np.dtype(triangle_dtype)
+    ).copy()
+    return vertices, triangles, x_moved
@@ -16,7 +16,6 @@ from isaaclab.managers import SceneEntityCfg
 from isaaclab.managers import TerminationTermCfg as DoneTerm
 from isaaclab.utils import configclass
 from isaaclab.envs.mdp.events import (
-    randomize_rigid_body_mass,
     apply_external_force_torque,
     reset_joints_by_scale,
 )
@@ -309,7 +308,7 @@ class EventCfg:
     )
 
     randomize_rigid_body_mass = EventTerm(
-        func=randomize_rigid_body_mass,
+        func=events.randomize_rigid_body_mass,
         mode="startup",
         params={
             "asset_cfg": SceneEntityCfg("robot", body_names="base_link"),
@@ -47,6 +47,10 @@ class ParkourRslRlEstimatorCfg(ParkourRslRlBaseCfg):
     train_with_estimated_states: bool = True 
     learning_rate: float = 1.e-4 
     hidden_dims: list[int] = MISSING 
+    update_mode: str = "minibatch"
+    """How PPO trains the estimator: "minibatch" takes a step per PPO minibatch, "fused" one step on
+    the whole rollout per epoch and "side_stream" the minibatch steps on a side CUDA stream, so that
+    the PPO update does not wait on them. "side_stream" falls back to "fused" on CPU."""
     
 @configclass
 class ParkourRslRlActorCfg(ParkourRslRlBaseCfg):
@@ -67,10 +71,19 @@ class ParkourRslRlPpoAlgorithmCfg(RslRlPpoAlgorithmCfg):
     class_name: str = 'PPOWithExtractor'
     dagger_update_freq: int = 1
     priv_reg_coef_schedual: list[float]= [0, 0.1, 2000, 3000]
+    amp_dtype: Literal["bfloat16", "float16"] | None = None
+    """Autocast dtype of the PPO, DAgger and estimator updates: None (float32), "bfloat16" or "float16".
+    "float16" needs CUDA and scales the losses, whose scales are logged."""
+    rollout_inference: Literal["eager", "compile", "cuda_graph"] = "eager"
+    """Inference of the estimator, actor and critic in the rollouts: eager, compiled with ``torch.compile``
+    or replayed from CUDA graphs captured for the batch of all envs. Falls back to eager on failure."""
 
 @configclass
 class ParkourRslRlDistillationAlgorithmCfg(RslRlPpoAlgorithmCfg):
     class_name: str = "DistillationWithExtractor"
+    amp_dtype: Literal["bfloat16", "float16"] | None = None
+    """Autocast dtype of the depth encoder and actor: None (float32), "bfloat16" or "float16".
+    "float16" needs CUDA and scales the loss, whose scale is logged."""
 
 @configclass
 class ParkourRslRlOnPolicyRunnerCfg(RslRlOnPolicyRunnerCfg):
@@ -0,0 +1,141 @@
+"""Micro-benchmark of the reset latency of ``events.randomize_actuator_gains``.
+
+Compares the term with the index maps resolved at construction against the former function that
+rebuilt them and cloned the gain slices on every call, for a growing number of resets per step.
+The actuators are stand-ins that are not written to the simulation, so only the gain bookkeeping is
+timed.
+
+Example:
+    python parkour_test/benchmark_actuator_gains.py --num_envs 4096 --headless
+"""
+
+import argparse
+
+from isaaclab.app import AppLauncher
+
+parser = argparse.ArgumentParser(description="Benchmark the actuator gain randomization.")
+parser.add_argument("--num_envs", type=int, default=4096, help="Number of environments.")
+parser.add_argument("--num_joints", type=int, default=12, help="Number of joints of the robot.")
+parser.add_argument("--num_actuators", type=int, default=2, help="Number of actuator groups.")
+parser.add_argument("--num_resets", type=int, nargs="+", default=[1, 8, 64, 512], help="Resets per step.")
+parser.add_argument("--repeats", type=int, default=200, help="Number of timed steps.")
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import time
+from types import SimpleNamespace
+
+import torch
+
+from isaaclab.envs.mdp.events import _randomize_prop_by_op
+from isaaclab.managers import SceneEntityCfg
+
+from parkour_isaaclab.envs.mdp import events
+
+PARAMS = {"stiffness_distribution_params": (0.975, 1.025), "damping_distribution_params": (0.975, 1.025)}
+
+
+class Scene(dict):
+    """Stand-in for ``InteractiveScene`` that resolves the assets by name."""
+
+    def __init__(self, num_envs: int, **assets):
+        super().__init__(**assets)
+        self.num_envs = num_envs
+
+
+def make_env(device: str) -> SimpleNamespace:
+    """Build a bare env holding an articulation stand-in with ``num_actuators`` actuator groups."""
+    num_envs, num_joints = args_cli.num_envs, args_cli.num_joints
+    joint_groups = torch.arange(num_joints).chunk(args_cli.num_actuators)
+    actuators = {
+        f"group_{i}": SimpleNamespace(
+            joint_indices=joint_ids.tolist(),
+            stiffness=torch.full((num_envs, len(joint_ids)), 20.0, device=device),
+            damping=torch.full((num_envs, len(joint_ids)), 0.5, device=device),
+        )
+        for i, joint_ids in enumerate(joint_groups)
+    }
+    data = SimpleNamespace(
+        default_joint_stiffness=torch.full((num_envs, num_joints), 20.0, device=device),
+        default_joint_damping=torch.full((num_envs, num_joints), 0.5, device=device),
+    )
+    asset = SimpleNamespace(actuators=actuators, data=data, device=device)
+    privileged_params = SimpleNamespace(refresh_gains=lambda env_ids: None)
+    return SimpleNamespace(
+        scene=Scene(num_envs, robot=asset),
+        num_envs=num_envs,
+        device=device,
+        privileged_params={"robot": privileged_params},
+    )
+
+
+def legacy_randomize_actuator_gains(env, env_ids, asset_cfg, stiffness_distribution_params, damping_distribution_params):
+    """Former ``randomize_actuator_gains`` that resolved the indices on every call."""
+    asset = env.scene[asset_cfg.name]
+
+    def randomize(data: torch.Tensor, params: tuple[float, float]) -> torch.Tensor:
+        return _randomize_prop_by_op(
+            data, params, dim_0_ids=None, dim_1_ids=actuator_indices, operation="scale", distribution="uniform"
+        )
+
+    for actuator in asset.actuators.values():
+        actuator_joint_indices = torch.tensor(actuator.joint_indices, device=asset.device)
+        asset_joint_ids = torch.tensor(asset_cfg.joint_ids, device=asset.device)
+        actuator_indices = torch.nonzero(torch.isin(actuator_joint_indices, asset_joint_ids)).view(-1)
+        if len(actuator_indices) == 0:
+            continue
+        global_indices = actuator_joint_indices[actuator_indices]
+        stiffness = actuator.stiffness[env_ids].clone()
+        stiffness[:, actuator_indices] = asset.data.default_joint_stiffness[env_ids][:, global_indices].clone()
+        randomize(stiffness, stiffness_distribution_params)
+        actuator.stiffness[env_ids] = stiffness
+        damping = actuator.damping[env_ids].clone()
+        damping[:, actuator_indices] = asset.data.default_joint_damping[env_ids][:, global_indices].clone()
+        randomize(damping, damping_distribution_params)
+        actuator.damping[env_ids] = damping
+
+
+def timeit(func, all_env_ids: list[torch.Tensor]) -> float:
+    torch.cuda.synchronize()
+    start = time.perf_counter()
+    for env_ids in all_env_ids:
+        func(env_ids)
+    torch.cuda.synchronize()
+    return (time.perf_counter() - start) / len(all_env_ids)
+
+
+def main():
+    device = args_cli.device if args_cli.device is not None else "cuda:0"
+    # randomize every other joint so that the actuators take the indexed path
+    asset_cfg = SceneEntityCfg("robot")
+    asset_cfg.joint_ids = list(range(0, args_cli.num_joints, 2))
+    env = make_env(device)
+    term = events.randomize_actuator_gains(
+        SimpleNamespace(params={"asset_cfg": asset_cfg, "operation": "scale", **PARAMS}), env
+    )
+
+    generator = torch.Generator(device="cpu").manual_seed(0)
+    print(f"[INFO] Number of envs: {args_cli.num_envs} on {device}")
+    for num_resets in args_cli.num_resets:
+        all_env_ids = [
+            torch.randperm(args_cli.num_envs, generator=generator)[:num_resets].to(device)
+            for _ in range(args_cli.repeats)
+        ]
+        legacy_time = timeit(
+            lambda env_ids: legacy_randomize_actuator_gains(env, env_ids, asset_cfg, **PARAMS), all_env_ids
+        )
+        term_time = timeit(lambda env_ids: term(env, env_ids, asset_cfg, operation="scale", **PARAMS), all_env_ids)
+        print(
+            f"[INFO] Resets {num_resets:5d}: legacy {legacy_time * 1e6:8.1f} us, "
+            f"term {term_time * 1e6:8.1f} us, speed-up {legacy_time / term_time:6.2f} x"
+        )
+
+
+if __name__ == "__main__":
+    main()
+    simulation_app.close()
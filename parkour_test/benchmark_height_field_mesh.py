@@ -0,0 +1,104 @@
+"""Micro-benchmark of ``convert_height_field_to_mesh`` against the former row-loop implementation.
+
+Example:
+    python parkour_test/benchmark_height_field_mesh.py --size 16 4 --horizontal_scale 0.02
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from parkour_isaaclab.terrains.utils import convert_height_field_to_mesh
+
+parser = argparse.ArgumentParser(description="Benchmark the height field to mesh conversion.")
+parser.add_argument("--size", type=float, nargs=2, default=[16.0, 4.0], help="Sub-terrain size in m.")
+parser.add_argument("--horizontal_scale", type=float, default=0.02, help="Horizontal scale in m.")
+parser.add_argument("--vertical_scale", type=float, default=0.005, help="Vertical scale in m.")
+parser.add_argument("--slope_threshold", type=float, default=3.75, help="Slope threshold.")
+parser.add_argument("--repeats", type=int, default=20, help="Number of timed conversions.")
+args_cli = parser.parse_args()
+
+
+def legacy_convert_height_field_to_mesh(height_field, horizontal_scale, vertical_scale, slope_threshold=None):
+    """Row-loop implementation that ``convert_height_field_to_mesh`` replaced."""
+    num_rows, num_cols = height_field.shape
+    y = np.linspace(0, (num_cols - 1) * horizontal_scale, num_cols)
+    x = np.linspace(0, (num_rows - 1) * horizontal_scale, num_rows)
+    yy, xx = np.meshgrid(y, x)
+    hf = height_field.copy()
+    if slope_threshold is not None:
+        slope_threshold *= horizontal_scale / vertical_scale
+        move_x = np.zeros((num_rows, num_cols))
+        move_y = np.zeros((num_rows, num_cols))
+        move_corners = np.zeros((num_rows, num_cols))
+        move_x[: num_rows - 1, :] += hf[1:num_rows, :] - hf[: num_rows - 1, :] > slope_threshold
+        move_x[1:num_rows, :] -= hf[: num_rows - 1, :] - hf[1:num_rows, :] > slope_threshold
+        move_y[:, : num_cols - 1] += hf[:, 1:num_cols] - hf[:, : num_cols - 1] > slope_threshold
+        move_y[:, 1:num_cols] -= hf[:, : num_cols - 1] - hf[:, 1:num_cols] > slope_threshold
+        move_corners[: num_rows - 1, : num_cols - 1] += (
+            hf[1:num_rows, 1:num_cols] - hf[: num_rows - 1, : num_cols - 1] > slope_threshold
+        )
+        move_corners[1:num_rows, 1:num_cols] -= (
+            hf[: num_rows - 1, : num_cols - 1] - hf[1:num_rows, 1:num_cols] > slope_threshold
+        )
+        xx += (move_x + move_corners * (move_x == 0)) * horizontal_scale
+        yy += (move_y + move_corners * (move_y == 0)) * horizontal_scale
+    vertices = np.zeros((num_rows * num_cols, 3), dtype=np.float32)
+    vertices[:, 0] = xx.flatten()
+    vertices[:, 1] = yy.flatten()
+    vertices[:, 2] = hf.flatten() * vertical_scale
+    triangles = -np.ones((2 * (num_rows - 1) * (num_cols - 1), 3), dtype=np.uint32)
+    for i in range(num_rows - 1):
+        ind0 = np.arange(0, num_cols - 1) + i * num_cols
+        ind1 = ind0 + 1
+        ind2 = ind0 + num_cols
+        ind3 = ind2 + 1
+        start = 2 * i * (num_cols - 1)
+        stop = start + 2 * (num_cols - 1)
+        triangles[start:stop:2, 0] = ind0
+        triangles[start:stop:2, 1] = ind3
+        triangles[start:stop:2, 2] = ind1
+        triangles[start + 1 : stop : 2, 0] = ind0
+        triangles[start + 1 : stop : 2, 1] = ind2
+        triangles[start + 1 : stop : 2, 2] = ind3
+    return vertices, triangles, move_x != 0
+
+
+def timeit(func, height_fields):
+    start = time.perf_counter()
+    for height_field in height_fields:
+        func(height_field, args_cli.horizontal_scale, args_cli.vertical_scale, args_cli.slope_threshold)
+    return (time.perf_counter() - start) / len(height_fields)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    width_pixels = int(args_cli.size[0] / args_cli.horizontal_scale) + 1
+    length_pixels = int(args_cli.size[1] / args_cli.horizontal_scale) + 1
+    # steps of up to 1 m so that the slope correction is exercised
+    height_fields = [
+        rng.integers(-200, 200, size=(width_pixels, length_pixels)).astype(np.int16)
+        for _ in range(args_cli.repeats)
+    ]
+    # check that both implementations agree before timing them
+    reference = legacy_convert_height_field_to_mesh(
+        height_fields[0], args_cli.horizontal_scale, args_cli.vertical_scale, args_cli.slope_threshold
+    )
+    result = convert_height_field_to_mesh(
+        height_fields[0], args_cli.horizontal_scale, args_cli.vertical_scale, args_cli.slope_threshold
+    )
+    for name, ref, res in zip(("vertices", "triangles", "x_edge_mask"), reference, result):
+        if ref.dtype != res.dtype or not np.array_equal(ref, res):
+            raise RuntimeError(f"Mismatch in '{name}' between legacy and vectorized implementation.")
+
+    legacy_time = timeit(legacy_convert_height_field_to_mesh, height_fields)
+    vectorized_time = timeit(convert_height_field_to_mesh, height_fields)
+    print(f"[INFO] Height field shape: {width_pixels} x {length_pixels}")
+    print(f"[INFO] Legacy:     {legacy_time * 1e3:8.2f} ms / sub-terrain")
+    print(f"[INFO] Vectorized: {vectorized_time * 1e3:8.2f} ms / sub-terrain")
+    print(f"[INFO] Speed-up:   {legacy_time / vectorized_time:8.2f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Benchmark of the learner iterations of ``PPOWithExtractor`` on random rollouts.
+
+Times ``update`` and ``update_dagger`` of the teacher policy of the go2 config against the former
+minibatch work: ``update`` encoded the priv latent a second time after the forward pass of the
+actor, and ``update_dagger`` ran an unused forward pass of the actor with the history encoder.
+
+Example:
+    python parkour_test/benchmark_ppo_update.py --num_envs 4096 --headless
+"""
+
+import argparse
+
+from isaaclab.app import AppLauncher
+
+parser = argparse.ArgumentParser(description="Benchmark the learner iterations of PPOWithExtractor.")
+parser.add_argument("--num_envs", type=int, default=4096, help="Number of environments.")
+parser.add_argument("--num_steps_per_env", type=int, default=24, help="Number of transitions per env.")
+parser.add_argument("--num_learning_epochs", type=int, default=5, help="Number of epochs per update.")
+parser.add_argument("--num_mini_batches", type=int, default=4, help="Number of minibatches per epoch.")
+parser.add_argument("--repeats", type=int, default=10, help="Number of timed updates.")
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import time
+
+import torch
+
+from scripts.rsl_rl.modules.actor_critic_with_encoder import ActorCriticRMA
+from scripts.rsl_rl.modules.feature_extractors import DefaultEstimator
+from scripts.rsl_rl.modules.ppo_with_extractor import PPOWithExtractor
+
+NUM_PROP, NUM_SCAN, NUM_PRIV_EXPLICIT, NUM_PRIV_LATENT, NUM_HIST = 53, 132, 9, 29, 10
+NUM_OBS = NUM_PROP + NUM_SCAN + NUM_PRIV_EXPLICIT + NUM_PRIV_LATENT + NUM_PROP * NUM_HIST
+NUM_ACTIONS = 12
+
+
+class LegacyActorCriticRMA(ActorCriticRMA):
+    """Policy that encodes the priv latent again after the forward pass, like the former ``update``."""
+
+    def update_distribution(self, observations, hist_encoding):
+        super().update_distribution(observations, hist_encoding)
+        if not hist_encoding:
+            self.actor_latent = self.actor.infer_priv_latent(observations)
+
+
+class LegacyPPOWithExtractor(PPOWithExtractor):
+    """Algorithm that runs the former unused actor pass on every minibatch of ``update_dagger``."""
+
+    def update_dagger(self):
+        generator = self.storage.mini_batch_generator
+
+        def legacy_generator(*args):
+            for batch in generator(*args):
+                with torch.inference_mode():
+                    self.policy.act(batch[0], hist_encoding=True)
+                yield batch
+
+        self.storage.mini_batch_generator = legacy_generator
+        try:
+            return super().update_dagger()
+        finally:
+            del self.storage.mini_batch_generator
+
+
+def make_alg(policy_class: type[ActorCriticRMA], alg_class: type[PPOWithExtractor], device: str) -> PPOWithExtractor:
+    """Build the teacher of the go2 config with random rollouts in its storage."""
+    torch.manual_seed(0)
+    base_cfg = dict(
+        num_prop=NUM_PROP,
+        num_scan=NUM_SCAN,
+        num_priv_explicit=NUM_PRIV_EXPLICIT,
+        num_priv_latent=NUM_PRIV_LATENT,
+        num_hist=NUM_HIST,
+    )
+    policy = policy_class(
+        NUM_OBS,
+        NUM_ACTIONS,
+        actor_hidden_dims=[512, 256, 128],
+        critic_hidden_dims=[512, 256, 128],
+        activation="elu",
+        scan_encoder_dims=[128, 64, 32],
+        priv_encoder_dims=[64, 20],
+        tanh_encoder_output=False,
+        actor=dict(
+            class_name="Actor",
+            state_history_encoder=dict(class_name="StateHistoryEncoder", channel_size=10, **base_cfg),
+            **base_cfg,
+        ),
+    ).to(device)
+    estimator_paras = dict(train_with_estimated_states=True, learning_rate=1.0e-4, **base_cfg)
+    estimator = DefaultEstimator(hidden_dims=[128, 64], **base_cfg).to(device)
+    alg = alg_class(
+        policy,
+        estimator,
+        estimator_paras,
+        num_learning_epochs=args_cli.num_learning_epochs,
+        num_mini_batches=args_cli.num_mini_batches,
+        learning_rate=2.0e-4,
+        schedule="adaptive",
+        device=device,
+        priv_reg_coef_schedual=[0.0, 0.1, 2000.0, 3000.0],
+    )
+    alg.init_storage("rl", args_cli.num_envs, args_cli.num_steps_per_env, [NUM_OBS], [NUM_OBS], [NUM_ACTIONS])
+    storage = alg.storage
+    for name in ("observations", "privileged_observations", "actions", "values", "returns", "advantages", "mu"):
+        getattr(storage, name).normal_()
+    storage.actions_log_prob.normal_()
+    storage.sigma.uniform_(0.5, 1.0)
+    return alg
+
+
+def timeit(func, device: str) -> float:
+    func()  # warm-up
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(args_cli.repeats):
+        func()
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return args_cli.repeats / (time.perf_counter() - start)
+
+
+def main():
+    device = args_cli.device if args_cli.device is not None else "cuda:0"
+    print(f"[INFO] Number of envs: {args_cli.num_envs} on {device}")
+    for name in ("update", "update_dagger"):
+        legacy_alg = make_alg(LegacyActorCriticRMA, LegacyPPOWithExtractor, device)
+        alg = make_alg(ActorCriticRMA, PPOWithExtractor, device)
+        legacy_rate = timeit(getattr(legacy_alg, name), device)
+        rate = timeit(getattr(alg, name), device)
+        print(
+            f"[INFO] {name:>13}: legacy {legacy_rate:8.2f} it/s, "
+            f"reused latent {rate:8.2f} it/s, speed-up {rate / legacy_rate:6.2f} x"
+        )
+
+
+if __name__ == "__main__":
+    main()
+    simulation_app.close()
@@ -0,0 +1,136 @@
+"""Micro-benchmark of the goal bookkeeping of ``ParkourEvent._resample_command``.
+
+Compares the incremental update of the resampled envs against the former update of the whole
+population, for a growing number of resets per step.
+
+Example:
+    python parkour_test/benchmark_resample_command.py --num_envs 4096 --headless
+"""
+
+import argparse
+
+from isaaclab.app import AppLauncher
+
+parser = argparse.ArgumentParser(description="Benchmark the goal bookkeeping of the parkour resampling.")
+parser.add_argument("--num_envs", type=int, default=4096, help="Number of environments.")
+parser.add_argument("--num_rows", type=int, default=10, help="Number of terrain rows (levels).")
+parser.add_argument("--num_cols", type=int, default=40, help="Number of terrain columns (types).")
+parser.add_argument("--num_goals", type=int, default=8, help="Number of goals per sub-terrain.")
+parser.add_argument("--num_future_goal_obs", type=int, default=2, help="Number of future goal observations.")
+parser.add_argument("--num_resets", type=int, nargs="+", default=[1, 8, 64, 512], help="Resets per step.")
+parser.add_argument("--repeats", type=int, default=200, help="Number of timed steps.")
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+from parkour_isaaclab.envs.mdp.parkours.parkour_event import ParkourEvent
+
+
+def make_event(device: str) -> ParkourEvent:
+    """Build a bare event term holding only the buffers touched by the goal bookkeeping."""
+    generator = torch.Generator(device="cpu").manual_seed(0)
+    rows, cols, num_envs = args_cli.num_rows, args_cli.num_cols, args_cli.num_envs
+    event = ParkourEvent.__new__(ParkourEvent)
+    event.debug_vis = True
+    event.num_goals = args_cli.num_goals
+    event.terrain = SimpleNamespace(
+        terrain_levels=torch.randint(rows, (num_envs,), generator=generator).to(device),
+        terrain_types=torch.randint(cols, (num_envs,), generator=generator).to(device),
+    )
+    event.terrain_class = torch.randint(5, (rows, cols), generator=generator).to(device, torch.float)
+    event.terrain_goals = torch.rand(rows, cols, args_cli.num_goals, 3, generator=generator).to(device)
+    event.total_heights = torch.rand(rows, cols, args_cli.num_goals, generator=generator).to(device)
+    event.total_terrain_names = np.array(["parkour_flat", "parkour_gap", "parkour_hurdle"])[
+        torch.randint(3, (rows, cols, 1), generator=generator).numpy()
+    ]
+    event.terrain_name_list, terrain_name_ids = np.unique(event.total_terrain_names[..., 0], return_inverse=True)
+    event.terrain_name_ids = torch.from_numpy(terrain_name_ids.reshape(rows, cols)).to(device, torch.long)
+    event.env_class = torch.zeros(num_envs, device=device)
+    event.env_goals = torch.zeros(num_envs, args_cli.num_goals + args_cli.num_future_goal_obs, 3, device=device)
+    event.env_per_heights = torch.zeros(num_envs, args_cli.num_goals, device=device)
+    event.env_terrain_ids = torch.zeros(num_envs, device=device, dtype=torch.long)
+    event.env_terrain_masks = torch.zeros(num_envs, len(event.terrain_name_list) + 1, device=device, dtype=torch.bool)
+    event.cur_goal_idx = torch.zeros(num_envs, device=device, dtype=torch.long)
+    event.device = device
+    event._update_env_goals(slice(None))
+    return event
+
+
+def legacy_update(event: ParkourEvent, env_ids: torch.Tensor):
+    """Bookkeeping that ``_resample_command`` used to run over all envs on every reset."""
+    levels, types = event.terrain.terrain_levels, event.terrain.terrain_types
+    event.env_class[env_ids] = event.terrain_class[levels[env_ids], types[env_ids]]
+    temp = event.terrain_goals[levels, types]
+    last_col = temp[:, -1].unsqueeze(1)
+    event.env_goals[:] = torch.cat((temp, last_col.repeat(1, args_cli.num_future_goal_obs, 1)), dim=1)[:]
+    event.cur_goals = event._gather_cur_goals()
+    event.next_goals = event._gather_cur_goals(future=1)
+    numpy_terrain_levels = levels.detach().cpu().numpy()
+    numpy_terrain_types = types.detach().cpu().numpy()
+    event.legacy_env_per_terrain_name = event.total_terrain_names[numpy_terrain_levels, numpy_terrain_types]
+    event.env_per_heights = event.total_heights[levels, types]
+
+
+def incremental_update(event: ParkourEvent, env_ids: torch.Tensor):
+    """Bookkeeping of ``_resample_command`` restricted to the resampled envs."""
+    event._update_env_goals(env_ids)
+    event.cur_goals[env_ids] = event._gather_cur_goals(env_ids=env_ids)
+    event.next_goals[env_ids] = event._gather_cur_goals(future=1, env_ids=env_ids)
+
+
+def timeit(func, event: ParkourEvent, all_env_ids: list[torch.Tensor]) -> float:
+    if event.device.startswith("cuda"):
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for env_ids in all_env_ids:
+        event.terrain.terrain_levels[env_ids] = (event.terrain.terrain_levels[env_ids] + 1) % args_cli.num_rows
+        func(event, env_ids)
+    if event.device.startswith("cuda"):
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / len(all_env_ids)
+
+
+def main():
+    device = args_cli.device if args_cli.device is not None else "cuda:0"
+    generator = torch.Generator(device="cpu").manual_seed(1)
+    print(f"[INFO] Number of envs: {args_cli.num_envs} on {device}")
+    for num_resets in args_cli.num_resets:
+        all_env_ids = [
+            torch.randperm(args_cli.num_envs, generator=generator)[:num_resets].to(device)
+            for _ in range(args_cli.repeats)
+        ]
+        legacy_event, event = make_event(device), make_event(device)
+        legacy_event.cur_goals = legacy_event._gather_cur_goals()
+        legacy_event.next_goals = legacy_event._gather_cur_goals(future=1)
+        event.cur_goals = event._gather_cur_goals()
+        event.next_goals = event._gather_cur_goals(future=1)
+        # warm up and check that both updates agree before timing them
+        legacy_update(legacy_event, all_env_ids[0])
+        incremental_update(event, all_env_ids[0])
+        for name in ("env_class", "env_goals", "cur_goals", "next_goals", "env_per_heights"):
+            if not torch.equal(getattr(legacy_event, name), getattr(event, name)):
+                raise RuntimeError(f"Mismatch in '{name}' between legacy and incremental update.")
+        if not np.array_equal(legacy_event.legacy_env_per_terrain_name, event.env_per_terrain_name):
+            raise RuntimeError("Mismatch in the terrain names between legacy and incremental update.")
+
+        legacy_time = timeit(legacy_update, legacy_event, all_env_ids)
+        incremental_time = timeit(incremental_update, event, all_env_ids)
+        print(
+            f"[INFO] Resets {num_resets:5d}: legacy {legacy_time * 1e6:8.1f} us, "
+            f"incremental {incremental_time * 1e6:8.1f} us, speed-up {legacy_time / incremental_time:6.2f} x"
+        )
+
+
+if __name__ == "__main__":
+    main()
+    simulation_app.close()
@@ -0,0 +1,122 @@
+"""Benchmark of the collection phase of ``PPOWithExtractor`` with the rollout inference modes.
+
+Runs the rollout loop of ``learn_rl`` for the teacher policy of the go2 config with every mode of
+``rollout_inference`` (``"cuda_graph"`` on CUDA only) and reports the collection steps per second.
+The environment is replaced by random observations and rewards, so only the policy side of the
+collection is timed. The first iteration warms the modes up and is not timed.
+
+Example:
+    python parkour_test/benchmark_rollout_inference.py --num_envs 4096 --headless
+"""
+
+import argparse
+
+from isaaclab.app import AppLauncher
+
+parser = argparse.ArgumentParser(description="Benchmark the rollout inference modes of PPOWithExtractor.")
+parser.add_argument("--num_envs", type=int, default=4096, help="Number of environments.")
+parser.add_argument("--num_steps_per_env", type=int, default=24, help="Number of transitions per env.")
+parser.add_argument("--num_iterations", type=int, default=20, help="Number of timed rollouts.")
+parser.add_argument("--dagger_update_freq", type=int, default=20, help="Rollouts between history encodings.")
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import time
+
+import torch
+
+from scripts.rsl_rl.modules.actor_critic_with_encoder import ActorCriticRMA
+from scripts.rsl_rl.modules.feature_extractors import DefaultEstimator
+from scripts.rsl_rl.modules.ppo_with_extractor import PPOWithExtractor
+
+NUM_PROP, NUM_SCAN, NUM_PRIV_EXPLICIT, NUM_PRIV_LATENT, NUM_HIST = 53, 132, 9, 29, 10
+NUM_OBS = NUM_PROP + NUM_SCAN + NUM_PRIV_EXPLICIT + NUM_PRIV_LATENT + NUM_PROP * NUM_HIST
+NUM_ACTIONS = 12
+
+
+def make_alg(rollout_inference: str, device: str) -> PPOWithExtractor:
+    """Build the teacher of the go2 config with the given rollout inference."""
+    torch.manual_seed(0)
+    base_cfg = dict(
+        num_prop=NUM_PROP,
+        num_scan=NUM_SCAN,
+        num_priv_explicit=NUM_PRIV_EXPLICIT,
+        num_priv_latent=NUM_PRIV_LATENT,
+        num_hist=NUM_HIST,
+    )
+    policy = ActorCriticRMA(
+        NUM_OBS,
+        NUM_ACTIONS,
+        actor_hidden_dims=[512, 256, 128],
+        critic_hidden_dims=[512, 256, 128],
+        activation="elu",
+        scan_encoder_dims=[128, 64, 32],
+        priv_encoder_dims=[64, 20],
+        tanh_encoder_output=False,
+        actor=dict(
+            class_name="Actor",
+            state_history_encoder=dict(class_name="StateHistoryEncoder", channel_size=10, **base_cfg),
+            **base_cfg,
+        ),
+    ).to(device)
+    estimator_paras = dict(train_with_estimated_states=True, learning_rate=1.0e-4, **base_cfg)
+    estimator = DefaultEstimator(hidden_dims=[128, 64], **base_cfg).to(device)
+    alg = PPOWithExtractor(
+        policy,
+        estimator,
+        estimator_paras,
+        device=device,
+        priv_reg_coef_schedual=[0.0, 0.1, 2000.0, 3000.0],
+        rollout_inference=rollout_inference,
+    )
+    alg.init_storage("rl", args_cli.num_envs, args_cli.num_steps_per_env, [NUM_OBS], [NUM_OBS], [NUM_ACTIONS])
+    return alg
+
+
+def collect(alg: PPOWithExtractor, it: int, obs: torch.Tensor, rewards: torch.Tensor, dones: torch.Tensor):
+    """One rollout of ``learn_rl`` on a stand-in environment."""
+    hist_encoding = it % args_cli.dagger_update_freq == 0
+    with torch.inference_mode():
+        for step in range(args_cli.num_steps_per_env):
+            alg.act(obs[step], obs[step], hist_encoding)
+            alg.process_env_step(rewards[step], dones[step], {})
+    alg.storage.clear()
+
+
+def main():
+    device = args_cli.device if args_cli.device is not None else "cuda:0"
+    modes = ["eager", "compile"] + (["cuda_graph"] if "cuda" in device else [])
+    num_envs, num_steps = args_cli.num_envs, args_cli.num_steps_per_env
+    obs = torch.randn(num_steps, num_envs, NUM_OBS, device=device)
+    rewards = torch.randn(num_steps, num_envs, device=device)
+    dones = torch.zeros(num_steps, num_envs, dtype=torch.bool, device=device)
+    print(f"[INFO] Number of envs: {num_envs} on {device}")
+    eager_rate = None
+    for mode in modes:
+        alg = make_alg(mode, device)
+        # warm up both history encodings
+        collect(alg, 0, obs, rewards, dones)
+        collect(alg, 1, obs, rewards, dones)
+        if device.startswith("cuda"):
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        for it in range(args_cli.num_iterations):
+            collect(alg, it, obs, rewards, dones)
+        if device.startswith("cuda"):
+            torch.cuda.synchronize()
+        rate = args_cli.num_iterations * num_steps * num_envs / (time.perf_counter() - start)
+        eager_rate = eager_rate or rate
+        print(
+            f"[INFO] {mode:>10} (runs {alg.rollout_policy.mode:>10}): {rate:12.0f} steps/s, "
+            f"speed-up {rate / eager_rate:6.2f} x"
+        )
+
+
+if __name__ == "__main__":
+    main()
+    simulation_app.close()
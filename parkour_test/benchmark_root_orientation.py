@@ -0,0 +1,125 @@
+"""Micro-benchmark of the shared root-orientation provider of ``ParkourStepCache``.
+
+Compares one step of the orientation work of the parkour MDP terms when every term derives its own
+angles (observations, delta-yaw observation, termination, yaw tracking reward, heading command)
+against reading them from :meth:`ParkourStepCache.root_orientation`.
+
+Example:
+    python parkour_test/benchmark_root_orientation.py --num_envs 4096 --headless
+"""
+
+import argparse
+
+from isaaclab.app import AppLauncher
+
+parser = argparse.ArgumentParser(description="Benchmark the shared root-orientation provider.")
+parser.add_argument("--num_envs", type=int, default=4096, help="Number of environments.")
+parser.add_argument("--repeats", type=int, default=1000, help="Number of timed steps.")
+AppLauncher.add_app_launcher_args(parser)
+args_cli = parser.parse_args()
+
+app_launcher = AppLauncher(args_cli)
+simulation_app = app_launcher.app
+
+"""Rest everything follows."""
+
+import time
+from types import SimpleNamespace
+
+import torch
+
+from isaaclab.utils.math import euler_xyz_from_quat, quat_apply, quat_conjugate, wrap_to_pi
+
+from parkour_isaaclab.envs.parkour_step_cache import ParkourStepCache
+
+
+class RootData:
+    """Stand-in for ``ArticulationData`` that derives heading and gravity on access like Isaac Lab does."""
+
+    def __init__(self, root_quat_w: torch.Tensor):
+        self.root_quat_w = root_quat_w
+        self.gravity_vec_w = torch.tensor((0.0, 0.0, -1.0), device=root_quat_w.device).repeat(len(root_quat_w), 1)
+        self.forward_vec_b = torch.tensor((1.0, 0.0, 0.0), device=root_quat_w.device).repeat(len(root_quat_w), 1)
+
+    @property
+    def projected_gravity_b(self) -> torch.Tensor:
+        return quat_apply(quat_conjugate(self.root_quat_w), self.gravity_vec_w)
+
+    @property
+    def heading_w(self) -> torch.Tensor:
+        forward_w = quat_apply(self.root_quat_w, self.forward_vec_b)
+        return torch.atan2(forward_w[:, 1], forward_w[:, 0])
+
+
+def legacy_step(data: RootData, target_yaw: torch.Tensor):
+    """Orientation work of one step before the provider, one block per term."""
+    # ExtremeParkourObservations
+    roll, pitch, yaw = euler_xyz_from_quat(data.root_quat_w)
+    imu_obs = torch.stack((wrap_to_pi(roll), wrap_to_pi(pitch)), dim=1)
+    delta_yaw = target_yaw - wrap_to_pi(yaw)
+    # obervation_delta_yaw_ok
+    _, _, yaw = euler_xyz_from_quat(data.root_quat_w)
+    delta_yaw_ok = (target_yaw - wrap_to_pi(yaw)) < 0.6
+    # terminate_episode
+    roll, pitch, _ = euler_xyz_from_quat(data.root_quat_w)
+    cutoff = (torch.abs(wrap_to_pi(roll)) > 1.5) | (torch.abs(wrap_to_pi(pitch)) > 1.5)
+    # reward_orientation
+    orientation = torch.sum(torch.square(data.projected_gravity_b[:, :2]), dim=1)
+    # reward_tracking_yaw
+    q = data.root_quat_w
+    yaw = torch.atan2(2 * (q[:, 0] * q[:, 3] + q[:, 1] * q[:, 2]), 1 - 2 * (q[:, 2] ** 2 + q[:, 3] ** 2))
+    tracking_yaw = torch.exp(-torch.abs(target_yaw - yaw))
+    # UniformParkourCommand
+    heading_error = wrap_to_pi(target_yaw - data.heading_w)
+    return imu_obs, delta_yaw, delta_yaw_ok, cutoff, orientation, tracking_yaw, heading_error
+
+
+def cached_step(cache: ParkourStepCache, target_yaw: torch.Tensor):
+    """Orientation work of one step with every term reading the provider."""
+    o = cache.root_orientation()
+    imu_obs = torch.stack((o.roll_wrapped, o.pitch_wrapped), dim=1)
+    delta_yaw = target_yaw - o.yaw_wrapped
+    delta_yaw_ok = (target_yaw - cache.root_orientation().yaw_wrapped) < 0.6
+    o = cache.root_orientation()
+    cutoff = (torch.abs(o.roll_wrapped) > 1.5) | (torch.abs(o.pitch_wrapped) > 1.5)
+    orientation = torch.sum(torch.square(cache.root_orientation().projected_gravity_b[:, :2]), dim=1)
+    tracking_yaw = torch.exp(-torch.abs(target_yaw - cache.root_orientation().yaw_atan2))
+    heading_error = wrap_to_pi(target_yaw - cache.root_orientation().heading_w)
+    return imu_obs, delta_yaw, delta_yaw_ok, cutoff, orientation, tracking_yaw, heading_error
+
+
+def timeit(func, env: SimpleNamespace, *args) -> float:
+    torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(args_cli.repeats):
+        env.common_step_counter += 1
+        func(*args)
+    torch.cuda.synchronize()
+    return (time.perf_counter() - start) / args_cli.repeats
+
+
+def main():
+    device = args_cli.device if args_cli.device is not None else "cuda:0"
+    generator = torch.Generator(device="cpu").manual_seed(0)
+    root_quat_w = torch.nn.functional.normalize(torch.randn(args_cli.num_envs, 4, generator=generator), dim=-1)
+    data = RootData(root_quat_w.to(device))
+    target_yaw = (torch.rand(args_cli.num_envs, generator=generator) * 6.0 - 3.0).to(device)
+    env = SimpleNamespace(common_step_counter=0, scene={"robot": SimpleNamespace(data=data)})
+    cache = ParkourStepCache(env)
+
+    # check that both paths agree before timing them
+    for legacy, cached in zip(legacy_step(data, target_yaw), cached_step(cache, target_yaw)):
+        if not torch.equal(legacy, cached):
+            raise RuntimeError("Mismatch between the per-term and the cached orientation.")
+
+    legacy_time = timeit(legacy_step, env, data, target_yaw)
+    cached_time = timeit(cached_step, env, cache, target_yaw)
+    print(f"[INFO] Number of envs: {args_cli.num_envs} on {device}")
+    print(f"[INFO] Per-term: {legacy_time * 1e6:8.1f} us / step")
+    print(f"[INFO] Cached:   {cached_time * 1e6:8.1f} us / step")
+    print(f"[INFO] Speed-up: {legacy_time / cached_time:8.2f} x")
+
+
+if __name__ == "__main__":
+    main()
+    simulation_app.close()
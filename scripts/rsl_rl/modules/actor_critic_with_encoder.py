@@ -92,6 +92,15 @@ class Actor(nn.Module):
         hist_encoding: bool, 
         scandots_latent: Optional[torch.Tensor] = None
         ):
+        return self.forward_with_latent(obs, hist_encoding, scandots_latent)[0]
+
+    def forward_with_latent(
+        self, 
+        obs, 
+        hist_encoding: bool, 
+        scandots_latent: Optional[torch.Tensor] = None
+        ):
+        """Actions and the history (``hist_encoding``) or priv latent the actions were computed from."""
         if self.if_scan_encode:
             obs_scan = obs[:, self.num_prop:self.num_prop + self.num_scan]
             if scandots_latent is None:
@@ -108,7 +117,7 @@ class Actor(nn.Module):
             latent = self.infer_priv_latent(obs)
         backbone_input = torch.cat([obs_prop_scan, obs_priv_explicit, latent], dim=1)
         backbone_output = self.actor_backbone(backbone_input)
-        return backbone_output
+        return backbone_output, latent
     
     def infer_priv_latent(self, obs):
         priv = obs[:, self.num_prop + self.num_scan + self.num_priv_explicit: self.num_prop + self.num_scan + self.num_priv_explicit + self.num_priv_latent]
@@ -178,6 +187,8 @@ class ActorCriticRMA(nn.Module):
             raise ValueError(f"Unknown standard deviation type: {self.noise_std_type}. Should be 'scalar' or 'log'")
 
         self.distribution = None
+        # latent of the last forward pass of the actor in :meth:`update_distribution`
+        self.actor_latent = None
         Normal.set_default_validate_args = False
 
     @staticmethod
@@ -205,7 +216,13 @@ class ActorCriticRMA(nn.Module):
         return self.distribution.entropy().sum(dim=-1)
 
     def update_distribution(self, observations, hist_encoding):
-        mean = self.actor(observations, hist_encoding)
+        mean, self.actor_latent = self.actor.forward_with_latent(observations, hist_encoding)
+        self.set_distribution(mean)
+
+    def set_distribution(self, mean):
+        """Action distribution around ``mean``, also computed outside of the policy in the rollouts."""
+        # the distribution stays in float32 under autocast
+        mean = mean.float()
         if self.noise_std_type == "scalar":
             std = mean*0. + self.std
         elif self.noise_std_type == "log":
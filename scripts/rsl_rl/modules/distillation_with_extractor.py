@@ -6,6 +6,7 @@ import torch.nn as nn
 import torch.optim as optim
 from .feature_extractors import DepthOnlyFCBackbone58x87, RecurrentDepthBackbone
 from .actor_critic_with_encoder import ActorCriticRMA
+from .mixed_precision import MixedPrecision
 from copy import deepcopy  
 
 class DistillationWithExtractor():
@@ -21,6 +22,7 @@ class DistillationWithExtractor():
         device,
         max_grad_norm=1.0,
         multi_gpu_cfg: dict | None = None,
+        amp_dtype: str | None = None,
         ):
         self.device = device
         self.is_multi_gpu = multi_gpu_cfg is not None
@@ -54,6 +56,9 @@ class DistillationWithExtractor():
         self.depth_encoder_cfg = depth_encoder_cfg
         self.depth_actor = depth_actor
         self.depth_actor_optimizer = optim.Adam([*self.depth_actor.parameters(), *self.depth_encoder.parameters()], lr=depth_encoder_cfg["learning_rate"])
+        # autocast of the depth encoder and actor passes of the runner, whose graphs the update backpropagates
+        self.amp = MixedPrecision(amp_dtype, device)
+        self.scaler = self.amp.make_scaler()
 
     def update_depth_actor(self, actions_buffer, yaws_buffer):
         depth_actor_loss = (actions_buffer).norm(p=2, dim=1).mean()
@@ -61,14 +66,18 @@ class DistillationWithExtractor():
 
         loss = depth_actor_loss + yaw_loss
         self.depth_actor_optimizer.zero_grad()
-        loss.backward()
+        self.scaler.scale(loss).backward()
+        self.scaler.unscale_(self.depth_actor_optimizer)
         nn.utils.clip_grad_norm_(self.depth_actor.parameters(), self.max_grad_norm)
-        self.depth_actor_optimizer.step()
+        self.scaler.step(self.depth_actor_optimizer)
+        self.scaler.update()
         loss_dict = {
             "depth_actor_loss": depth_actor_loss.item(),
             "yaw_loss": yaw_loss.item(),
             "total_loss": loss.item(),
         }
+        if self.amp.use_scaler:
+            loss_dict["loss_scale"] = self.scaler.get_scale()
         return loss_dict
 
     def broadcast_parameters(self):
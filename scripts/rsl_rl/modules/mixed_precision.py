@@ -0,0 +1,34 @@
+
+from __future__ import annotations
+
+import torch
+
+AMP_DTYPES = {"bfloat16": torch.bfloat16, "float16": torch.float16}
+
+
+class MixedPrecision:
+    """Autocast of the forward passes of the learner updates.
+
+    ``"bfloat16"`` runs on CPU and CUDA without loss scaling, ``"float16"`` runs on CUDA only and
+    needs the gradient scalers of :meth:`make_scaler`. With ``None`` the autocast is disabled and the
+    scalers pass the losses and the optimizer steps through unchanged, so the updates can use them
+    unconditionally.
+    """
+
+    def __init__(self, dtype: str | None, device: str):
+        if dtype is not None and dtype not in AMP_DTYPES:
+            raise ValueError(f"Unknown AMP dtype: {dtype}. Should be None, 'bfloat16' or 'float16'")
+        self.device_type = "cuda" if "cuda" in str(device) else "cpu"
+        if dtype == "float16" and self.device_type != "cuda":
+            raise ValueError("The 'float16' AMP dtype needs a CUDA device, use 'bfloat16' on CPU")
+        self.enabled = dtype is not None
+        self.dtype = AMP_DTYPES.get(dtype, torch.float32)
+        self.use_scaler = dtype == "float16"
+
+    def autocast(self) -> torch.autocast:
+        """Context that runs the enclosed forward passes in the AMP dtype."""
+        return torch.autocast(self.device_type, dtype=self.dtype, enabled=self.enabled)
+
+    def make_scaler(self) -> torch.amp.GradScaler:
+        """Gradient scaler for one optimizer, only active for ``"float16"``."""
+        return torch.amp.GradScaler(self.device_type, enabled=self.use_scaler)
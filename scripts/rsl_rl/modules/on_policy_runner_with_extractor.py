@@ -96,7 +96,8 @@ class OnPolicyRunnerWithExtractor(OnPolicyRunner):
                                                     policy_cfg = self.policy_cfg, 
                                                     max_grad_norm = self.alg_cfg['max_grad_norm'],
                                                     device=self.device, 
-                                                    multi_gpu_cfg=self.multi_gpu_cfg
+                                                    multi_gpu_cfg=self.multi_gpu_cfg,
+                                                    amp_dtype=self.alg_cfg.get("amp_dtype"),
                                                     )
         else:
             self.dagger_update_freq = self.alg_cfg.pop("dagger_update_freq")
@@ -358,7 +359,9 @@ class OnPolicyRunnerWithExtractor(OnPolicyRunner):
                 if self.env.unwrapped.common_step_counter %5 == 0:
                     obs_prop_depth = obs[:, :self.depth_encoder_cfg['num_prop']].clone()
                     obs_prop_depth[:, 6:8] = 0
-                    depth_latent_and_yaw = self.alg.depth_encoder(additional_obs["depth_camera"].clone(), obs_prop_depth)  # clone is crucial to avoid in-place operation
+                    with self.alg.amp.autocast():
+                        depth_latent_and_yaw = self.alg.depth_encoder(additional_obs["depth_camera"].clone(), obs_prop_depth)  # clone is crucial to avoid in-place operation
+                    depth_latent_and_yaw = depth_latent_and_yaw.float()
                     depth_latent = depth_latent_and_yaw[:, :-2]
                     yaw = 1.5*depth_latent_and_yaw[:, -2:]
                     yaws_buffer.append(obs[:,6:8].detach() - yaw)
@@ -366,7 +369,9 @@ class OnPolicyRunnerWithExtractor(OnPolicyRunner):
                     actions_teacher = self.alg.policy.act_inference(obs, hist_encoding=True, scandots_latent=None)
                     delta_yaw_ok_buffer.append(torch.nonzero(additional_obs["delta_yaw_ok"]).size(0) / additional_obs["delta_yaw_ok"].numel())
                 obs[additional_obs["delta_yaw_ok"], 6:8] = yaw.detach()[additional_obs["delta_yaw_ok"]]
-                actions_student = self.alg.depth_actor(obs, hist_encoding=True, scandots_latent=depth_latent)
+                with self.alg.amp.autocast():
+                    actions_student = self.alg.depth_actor(obs, hist_encoding=True, scandots_latent=depth_latent)
+                actions_student = actions_student.float()
                 actions_buffer.append(actions_teacher.detach() - actions_student)
                 
                 if it < num_pretrain_iter:
@@ -442,6 +447,7 @@ class OnPolicyRunnerWithExtractor(OnPolicyRunner):
 
         ep_string = ""
         if locs["ep_infos"]:
+            ep_keys, ep_values = [], []
             for key in locs["ep_infos"][0]:
                 infotensor = torch.tensor([], device=self.device)
                 for ep_info in locs["ep_infos"]:
@@ -453,7 +459,16 @@ class OnPolicyRunnerWithExtractor(OnPolicyRunner):
                     if len(ep_info[key].shape) == 0:
                         ep_info[key] = ep_info[key].unsqueeze(0)
                     infotensor = torch.cat((infotensor, ep_info[key].to(self.device)))
-                value = torch.mean(infotensor)
+                ep_keys.append(key)
+                ep_values.append(torch.mean(infotensor.float()))
+            # the episode infos are kept on the device, copy all means to the host at once
+            is_cuda = torch.device(self.device).type == "cuda"
+            host_values = torch.empty(len(ep_values), pin_memory=is_cuda)
+            if len(ep_values) > 0:
+                host_values.copy_(torch.stack(ep_values), non_blocking=True)
+                if is_cuda:
+                    torch.cuda.current_stream(self.device).synchronize()
+            for key, value in zip(ep_keys, host_values.tolist()):
                 # log to logger and terminal
                 if "/" in key:
                     self.writer.add_scalar(key, value, locs["it"])
@@ -6,6 +6,8 @@ import torch.nn as nn
 import torch.optim as optim
 
 from .actor_critic_with_encoder import ActorCriticRMA
+from .mixed_precision import MixedPrecision
+from .rollout_policy import RolloutPolicy
 from rsl_rl.algorithms import PPO
 
 class PPOWithExtractor(PPO):
@@ -37,6 +39,10 @@ class PPOWithExtractor(PPO):
         # Distributed training parameters
         priv_reg_coef_schedual = [0, 0, 0],
         multi_gpu_cfg: dict | None = None,
+        # Mixed precision parameters
+        amp_dtype: str | None = None,
+        # Rollout parameters
+        rollout_inference: str = "eager",
     ):
         super().__init__(
             policy, 
@@ -70,24 +76,39 @@ class PPOWithExtractor(PPO):
         self.num_scan = estimator_paras["num_scan"]
         self.estimator_optimizer = optim.Adam(self.estimator.parameters(), lr=estimator_paras["learning_rate"])
         self.train_with_estimated_states = estimator_paras["train_with_estimated_states"]
+        # "minibatch": one estimator step per PPO minibatch, "fused": one step on the whole rollout
+        # per epoch, "side_stream": the minibatch steps on a side CUDA stream ("fused" on CPU)
+        self.estimator_update_mode = estimator_paras.get("update_mode", "minibatch")
+        if self.estimator_update_mode not in ("minibatch", "fused", "side_stream"):
+            raise ValueError(
+                f"Unknown estimator update mode: {self.estimator_update_mode}."
+                " Should be 'minibatch', 'fused' or 'side_stream'"
+            )
+        if self.estimator_update_mode == "side_stream" and "cuda" not in str(self.device):
+            self.estimator_update_mode = "fused"
+        self.estimator_stream = None
+        if self.estimator_update_mode == "side_stream":
+            self.estimator_stream = torch.cuda.Stream(device=self.device)
         self.hist_encoder_optimizer = optim.Adam(self.policy.actor.history_encoder.parameters(), lr=learning_rate)
+        # autocast of the forward passes of the updates, the rollouts stay in float32
+        self.amp = MixedPrecision(amp_dtype, self.device)
+        # the policy scaler serves the PPO and the DAgger steps, which run one after the other
+        self.scaler = self.amp.make_scaler()
+        self.estimator_scaler = self.amp.make_scaler()
         self.priv_reg_coef_schedual = priv_reg_coef_schedual
         self.counter = 0
+        # "eager", "compile" or "cuda_graph" inference of the rollouts
+        self.rollout_policy = RolloutPolicy(self, rollout_inference)
 
 
     def act(self, obs, critic_obs, hist_encoding=False):
         if self.policy.is_recurrent:
             self.transition.hidden_states = self.policy.get_hidden_states()
         # compute the actions and values
-        if self.train_with_estimated_states:
-            obs_est = obs.clone()
-            priv_states_estimated = self.estimator(obs_est[:, :self.num_prop])
-            obs_est[:, self.num_prop+self.num_scan:self.num_prop+self.num_scan+self.priv_states_dim] = priv_states_estimated
-            self.transition.actions = self.policy.act(obs_est, hist_encoding).detach()
-        else:
-            self.transition.actions = self.policy.act(obs, hist_encoding).detach()
-
-        self.transition.values = self.policy.evaluate(critic_obs).detach()
+        actions_mean, values = self.rollout_policy(obs, critic_obs, hist_encoding)
+        self.policy.set_distribution(actions_mean)
+        self.transition.actions = self.policy.distribution.sample().detach()
+        self.transition.values = values.detach()
         self.transition.actions_log_prob = self.policy.get_actions_log_prob(self.transition.actions).detach()
         self.transition.action_mean = self.policy.action_mean.detach()
         self.transition.action_sigma = self.policy.action_std.detach()
@@ -99,22 +120,32 @@ class PPOWithExtractor(PPO):
     
 
     def update(self):  # noqa: C901
-        mean_value_loss = 0
-        mean_surrogate_loss = 0
-        mean_priv_reg_loss = 0
-        mean_entropy = 0
-        mean_estimator_loss = 0
+        # the losses are summed on the device in double precision and copied to the host once at the end,
+        # so that the minibatches do not synchronize with the host
+        zero = torch.zeros((), dtype=torch.float64, device=self.device)
+        mean_value_loss = zero.clone()
+        mean_surrogate_loss = zero.clone()
+        mean_priv_reg_loss = zero.clone()
+        mean_entropy = zero.clone()
+        mean_estimator_loss = zero.clone()
+        # -- estimator steps that are not interleaved with the PPO minibatches
+        if self.estimator_update_mode == "fused":
+            mean_estimator_loss = self._update_estimator_fused()
         # -- RND loss
         if self.rnd:
-            mean_rnd_loss = 0
+            mean_rnd_loss = zero.clone()
         else:
             mean_rnd_loss = None
         # -- Symmetry loss
         if self.symmetry:
-            mean_symmetry_loss = 0
+            mean_symmetry_loss = zero.clone()
         else:
             mean_symmetry_loss = None
 
+        # -- adaptive learning rate
+        if self.desired_kl is not None and self.schedule == "adaptive":
+            learning_rate = self._device_learning_rate()
+
         # generator for mini batches
         if self.policy.is_recurrent:
             generator = self.storage.recurrent_mini_batch_generator(self.num_mini_batches, self.num_learning_epochs)
@@ -171,29 +202,36 @@ class PPOWithExtractor(PPO):
 
             # Recompute actions log prob and entropy for current batch of transitions
             # Note: we need to do this because we updated the policy with the new parameters
-            # -- actor
-            self.policy.act(obs_batch, masks=masks_batch, hidden_states=hid_states_batch[0])
-            actions_log_prob_batch = self.policy.get_actions_log_prob(actions_batch)
-            # -- critic
-            value_batch = self.policy.evaluate(critic_obs_batch, masks=masks_batch, hidden_states=hid_states_batch[1])
+            # the distribution of the policy and the losses stay in float32 under autocast
+            with self.amp.autocast():
+                # -- actor
+                self.policy.act(obs_batch, masks=masks_batch, hidden_states=hid_states_batch[0])
+                actions_log_prob_batch = self.policy.get_actions_log_prob(actions_batch)
+                # -- critic
+                value_batch = self.policy.evaluate(
+                    critic_obs_batch, masks=masks_batch, hidden_states=hid_states_batch[1]
+                ).float()
+                with torch.inference_mode():
+                    hist_latent_batch = self.policy.actor.infer_hist_latent(obs_batch).float()
             mu_batch = self.policy.action_mean[:original_batch_size]
             sigma_batch = self.policy.action_std[:original_batch_size]
             entropy_batch = self.policy.entropy[:original_batch_size]
 
-            priv_latent_batch = self.policy.actor.infer_priv_latent(obs_batch)
-            with torch.inference_mode():
-                hist_latent_batch = self.policy.actor.infer_hist_latent(obs_batch)
+            # the actor already encoded the priv latent of the batch in ``act``
+            priv_latent_batch = self.policy.actor_latent.float()
             priv_reg_loss = (priv_latent_batch - hist_latent_batch.detach()).norm(p=2, dim=1).mean()
             priv_reg_stage = min(max((self.counter - self.priv_reg_coef_schedual[2]), 0) / self.priv_reg_coef_schedual[3], 1)
             priv_reg_coef = priv_reg_stage * (self.priv_reg_coef_schedual[1] - self.priv_reg_coef_schedual[0]) + self.priv_reg_coef_schedual[0]
 
             # Estimator
-            priv_states_predicted = self.estimator(obs_batch[:, :self.num_prop])  # obs in batch is with true priv_states
-            estimator_loss = (priv_states_predicted - obs_batch[:, self.num_prop+self.num_scan:self.num_prop+self.num_scan+self.priv_states_dim]).pow(2).mean()
-            self.estimator_optimizer.zero_grad()
-            estimator_loss.backward()
-            nn.utils.clip_grad_norm_(self.estimator.parameters(), self.max_grad_norm)
-            self.estimator_optimizer.step()
+            if self.estimator_update_mode == "minibatch":
+                estimator_loss = self._update_estimator(obs_batch)
+            elif self.estimator_update_mode == "side_stream":
+                # the PPO loss does not depend on the estimator, only the side stream waits for the batch
+                self.estimator_stream.wait_stream(torch.cuda.current_stream(self.device))
+                with torch.cuda.stream(self.estimator_stream):
+                    mean_estimator_loss += self._update_estimator(obs_batch)
+                obs_batch.record_stream(self.estimator_stream)
 
             # KL
             if self.desired_kl is not None and self.schedule == "adaptive":
@@ -216,21 +254,23 @@ class PPOWithExtractor(PPO):
                     # Perform this adaptation only on the main process
                     # TODO: Is this needed? If KL-divergence is the "same" across all GPUs,
                     #       then the learning rate should be the same across all GPUs.
+                    # the learning rate stays on the device, the param groups of the optimizer hold it
                     if self.gpu_global_rank == 0:
-                        if kl_mean > self.desired_kl * 2.0:
-                            self.learning_rate = max(1e-5, self.learning_rate / 1.5)
-                        elif kl_mean < self.desired_kl / 2.0 and kl_mean > 0.0:
-                            self.learning_rate = min(1e-2, self.learning_rate * 1.5)
+                        learning_rate.copy_(
+                            torch.where(
+                                kl_mean > self.desired_kl * 2.0,
+                                (learning_rate / 1.5).clamp(min=1e-5),
+                                torch.where(
+                                    (kl_mean < self.desired_kl / 2.0) & (kl_mean > 0.0),
+                                    (learning_rate * 1.5).clamp(max=1e-2),
+                                    learning_rate,
+                                ),
+                            )
+                        )
 
                     # Update the learning rate for all GPUs
                     if self.is_multi_gpu:
-                        lr_tensor = torch.tensor(self.learning_rate, device=self.device)
-                        torch.distributed.broadcast(lr_tensor, src=0)
-                        self.learning_rate = lr_tensor.item()
-
-                    # Update the learning rate for all parameter groups
-                    for param_group in self.optimizer.param_groups:
-                        param_group["lr"] = self.learning_rate
+                        torch.distributed.broadcast(learning_rate, src=0)
 
             # Surrogate loss
             ratio = torch.exp(actions_log_prob_batch - torch.squeeze(old_actions_log_prob_batch))
@@ -302,7 +342,7 @@ class PPOWithExtractor(PPO):
 
 
             self.optimizer.zero_grad()
-            loss.backward()
+            self.scaler.scale(loss).backward()
 
             if self.rnd:
                 self.rnd_optimizer.zero_grad()  # type: ignore
@@ -311,31 +351,38 @@ class PPOWithExtractor(PPO):
             if self.is_multi_gpu:
                 self.reduce_parameters()
 
+            self.scaler.unscale_(self.optimizer)
             nn.utils.clip_grad_norm_(self.policy.parameters(), self.max_grad_norm)
-            self.optimizer.step()
+            self.scaler.step(self.optimizer)
+            self.scaler.update()
 
             if self.rnd_optimizer:
                 self.rnd_optimizer.step()
 
-            mean_value_loss += value_loss.item()
-            mean_surrogate_loss += surrogate_loss.item()
-            mean_entropy += entropy_batch.mean().item()
-            mean_priv_reg_loss += priv_reg_loss.mean().item()
-            mean_estimator_loss += estimator_loss.item()
+            mean_value_loss += value_loss.detach()
+            mean_surrogate_loss += surrogate_loss.detach()
+            mean_entropy += entropy_batch.mean().detach()
+            mean_priv_reg_loss += priv_reg_loss.mean().detach()
+            if self.estimator_update_mode == "minibatch":
+                mean_estimator_loss += estimator_loss
 
             # -- RND loss
             if mean_rnd_loss is not None:
-                mean_rnd_loss += rnd_loss.item()
+                mean_rnd_loss += rnd_loss.detach()
             # -- Symmetry loss
             if mean_symmetry_loss is not None:
-                mean_symmetry_loss += symmetry_loss.item()
+                mean_symmetry_loss += symmetry_loss.detach()
 
         num_updates = self.num_learning_epochs * self.num_mini_batches
+        if self.estimator_update_mode == "side_stream":
+            # the next rollout reads the estimator
+            torch.cuda.current_stream(self.device).wait_stream(self.estimator_stream)
         mean_value_loss /= num_updates
         mean_surrogate_loss /= num_updates
         mean_priv_reg_loss /= num_updates
         mean_entropy /= num_updates
-        mean_estimator_loss /= num_updates
+        if self.estimator_update_mode != "fused":
+            mean_estimator_loss /= num_updates
         if mean_rnd_loss is not None:
             mean_rnd_loss /= num_updates
         # -- For Symmetry
@@ -356,13 +403,63 @@ class PPOWithExtractor(PPO):
             loss_dict["rnd"] = mean_rnd_loss
         if self.symmetry:
             loss_dict["symmetry"] = mean_symmetry_loss
+        # -- single transfer of all the losses to the host
+        loss_names = [name for name, loss in loss_dict.items() if isinstance(loss, torch.Tensor)]
+        loss_dict.update(zip(loss_names, torch.stack([loss_dict[name] for name in loss_names]).tolist()))
+        if self.desired_kl is not None and self.schedule == "adaptive":
+            self.learning_rate = learning_rate.item()
+            for param_group in self.optimizer.param_groups:
+                param_group["lr"] = self.learning_rate
+        if self.amp.use_scaler:
+            loss_dict["loss_scale"] = self.scaler.get_scale()
+            loss_dict["estimator_loss_scale"] = self.estimator_scaler.get_scale()
         return loss_dict
 
     def update_counter(self):
         self.counter += 1
 
+    def _device_learning_rate(self) -> torch.Tensor:
+        """Learning rate on the device for the adaptive schedule, set in the param groups of the optimizer.
+
+        The minibatches adapt it without a host sync. On CUDA, Adam reads a tensor learning rate only
+        when capturable, which keeps its step counters on the device as well.
+        """
+        learning_rate = torch.tensor(self.learning_rate, device=self.device)
+        capturable = "cuda" in str(self.device)
+        for param_group in self.optimizer.param_groups:
+            param_group["lr"] = learning_rate
+            if capturable and not param_group["capturable"]:
+                # e.g. the optimizer of the base class or one loaded from a checkpoint
+                param_group["capturable"] = True
+                for param in param_group["params"]:
+                    state = self.optimizer.state.get(param)
+                    if state:
+                        state["step"] = state["step"].to(device=param.device, dtype=torch.float32)
+        return learning_rate
+
+    def _update_estimator(self, obs_batch: torch.Tensor) -> torch.Tensor:
+        """Take one estimator step on ``obs_batch`` and return its loss before the step."""
+        with self.amp.autocast():
+            priv_states_predicted = self.estimator(obs_batch[:, :self.num_prop]).float()  # obs in batch is with true priv_states
+        estimator_loss = (priv_states_predicted - obs_batch[:, self.num_prop+self.num_scan:self.num_prop+self.num_scan+self.priv_states_dim]).pow(2).mean()
+        self.estimator_optimizer.zero_grad()
+        self.estimator_scaler.scale(estimator_loss).backward()
+        self.estimator_scaler.unscale_(self.estimator_optimizer)
+        nn.utils.clip_grad_norm_(self.estimator.parameters(), self.max_grad_norm)
+        self.estimator_scaler.step(self.estimator_optimizer)
+        self.estimator_scaler.update()
+        return estimator_loss.detach()
+
+    def _update_estimator_fused(self) -> torch.Tensor:
+        """Take one estimator step per epoch on all transitions of the rollout, return the mean loss."""
+        obs = self.storage.observations.flatten(0, 1)
+        estimator_loss_sum = torch.zeros((), dtype=torch.float64, device=self.device)
+        for _ in range(self.num_learning_epochs):
+            estimator_loss_sum += self._update_estimator(obs)
+        return estimator_loss_sum / self.num_learning_epochs
+
     def update_dagger(self):
-        mean_hist_latent_loss = 0
+        mean_hist_latent_loss = torch.zeros((), dtype=torch.float64, device=self.device)
         if self.policy.is_recurrent:
             generator = self.storage.recurrent_mini_batch_generator(self.num_mini_batches, self.num_learning_epochs)
         else:
@@ -381,24 +478,21 @@ class PPOWithExtractor(PPO):
             masks_batch,
             rnd_state_batch,
         ) in generator:
-            with torch.inference_mode():
-                self.policy.act(obs_batch, 
-                                hist_encoding=True, 
-                                masks=masks_batch, 
-                                hidden_states=hid_states_batch[0])
-
             # Adaptation module update
-            with torch.inference_mode():
-                priv_latent_batch = self.policy.actor.infer_priv_latent(obs_batch)
-            hist_latent_batch = self.policy.actor.infer_hist_latent(obs_batch)
+            with self.amp.autocast():
+                with torch.inference_mode():
+                    priv_latent_batch = self.policy.actor.infer_priv_latent(obs_batch).float()
+                hist_latent_batch = self.policy.actor.infer_hist_latent(obs_batch).float()
             hist_latent_loss = (priv_latent_batch.detach() - hist_latent_batch).norm(p=2, dim=1).mean()
             self.hist_encoder_optimizer.zero_grad()
-            hist_latent_loss.backward()
+            self.scaler.scale(hist_latent_loss).backward()
+            self.scaler.unscale_(self.hist_encoder_optimizer)
             nn.utils.clip_grad_norm_(self.policy.actor.history_encoder.parameters(), self.max_grad_norm)
-            self.hist_encoder_optimizer.step()
-            mean_hist_latent_loss += hist_latent_loss.item()
+            self.scaler.step(self.hist_encoder_optimizer)
+            self.scaler.update()
+            mean_hist_latent_loss += hist_latent_loss.detach()
         num_updates = self.num_learning_epochs * self.num_mini_batches
-        mean_hist_latent_loss /= num_updates
+        mean_hist_latent_loss = mean_hist_latent_loss.item() / num_updates
         self.storage.clear()
         self.update_counter()
         return mean_hist_latent_loss
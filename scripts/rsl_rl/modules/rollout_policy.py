@@ -0,0 +1,99 @@
+
+from __future__ import annotations
+
+import warnings
+from typing import TYPE_CHECKING
+
+import torch
+
+if TYPE_CHECKING:
+    from .ppo_with_extractor import PPOWithExtractor
+
+ROLLOUT_INFERENCE_MODES = ("eager", "compile", "cuda_graph")
+
+
+class RolloutPolicy:
+    """Inference path of :meth:`PPOWithExtractor.act`: the estimator, the actor mean and the critic.
+
+    The rollouts call it with the same batch of ``num_envs`` observations every step, so the path can
+    be compiled (``"compile"``) or captured once per ``hist_encoding`` in a CUDA graph that is replayed
+    on static input buffers (``"cuda_graph"``). The first call of a variant warms it up. If compiling,
+    capturing or a later call fails, e.g. a recompilation after a guard changed, the rollouts fall
+    back to the eager path with a warning. Other batch shapes, e.g. of an evaluation, always run
+    eagerly. The path runs without gradients and the sampling of the actions stays eager.
+    """
+
+    def __init__(self, alg: PPOWithExtractor, mode: str = "eager", num_warmup_steps: int = 3):
+        if mode not in ROLLOUT_INFERENCE_MODES:
+            raise ValueError(f"Unknown rollout inference mode: {mode}. Should be 'eager', 'compile' or 'cuda_graph'")
+        if mode == "cuda_graph" and "cuda" not in str(alg.device):
+            warnings.warn("CUDA graphs need a CUDA device, the rollouts run eagerly.")
+            mode = "eager"
+        self.alg = alg
+        self.mode = mode
+        self.num_warmup_steps = num_warmup_steps
+        self.batch_shapes: tuple[torch.Size, torch.Size] | None = None
+        self._compiled_forward = torch.compile(self.forward, dynamic=False) if mode == "compile" else None
+        # compiled or captured variants per ``hist_encoding``
+        self._variants: dict[bool, object] = {}
+
+    @torch.no_grad()
+    def __call__(self, obs: torch.Tensor, critic_obs: torch.Tensor, hist_encoding: bool):
+        """Actions mean and values of the observations."""
+        if self.mode == "eager":
+            return self.forward(obs, critic_obs, hist_encoding)
+        if self.batch_shapes is None:
+            self.batch_shapes = (obs.shape, critic_obs.shape)
+        if (obs.shape, critic_obs.shape) != self.batch_shapes:
+            return self.forward(obs, critic_obs, hist_encoding)
+        try:
+            if hist_encoding not in self._variants:
+                return self._warmup(obs, critic_obs, hist_encoding)
+            if self.mode == "compile":
+                return self._compiled_forward(obs, critic_obs, hist_encoding)
+            return self._replay(obs, critic_obs, hist_encoding)
+        except Exception as e:
+            warnings.warn(f"The {self.mode} rollout inference failed, the rollouts run eagerly: {e}")
+            self.mode = "eager"
+            self._variants.clear()
+            return self.forward(obs, critic_obs, hist_encoding)
+
+    def forward(self, obs: torch.Tensor, critic_obs: torch.Tensor, hist_encoding: bool):
+        """Eager path, ``act`` before the sampling."""
+        alg = self.alg
+        if alg.train_with_estimated_states:
+            obs = obs.clone()
+            priv_states_estimated = alg.estimator(obs[:, :alg.num_prop])
+            obs[:, alg.num_prop+alg.num_scan:alg.num_prop+alg.num_scan+alg.priv_states_dim] = priv_states_estimated
+        return alg.policy.actor(obs, hist_encoding), alg.policy.evaluate(critic_obs)
+
+    def _warmup(self, obs: torch.Tensor, critic_obs: torch.Tensor, hist_encoding: bool):
+        if self.mode == "compile":
+            for _ in range(self.num_warmup_steps):
+                outputs = self._compiled_forward(obs, critic_obs, hist_encoding)
+            self._variants[hist_encoding] = self._compiled_forward
+            return outputs
+        self._variants[hist_encoding] = self._capture(obs, critic_obs, hist_encoding)
+        return self._replay(obs, critic_obs, hist_encoding)
+
+    def _capture(self, obs: torch.Tensor, critic_obs: torch.Tensor, hist_encoding: bool):
+        static_obs, static_critic_obs = obs.clone(), critic_obs.clone()
+        # warm up on a side stream, as the capture requires
+        stream = torch.cuda.Stream(self.alg.device)
+        stream.wait_stream(torch.cuda.current_stream(self.alg.device))
+        with torch.cuda.stream(stream):
+            for _ in range(self.num_warmup_steps):
+                self.forward(static_obs, static_critic_obs, hist_encoding)
+        torch.cuda.current_stream(self.alg.device).wait_stream(stream)
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            static_outputs = self.forward(static_obs, static_critic_obs, hist_encoding)
+        return graph, static_obs, static_critic_obs, static_outputs
+
+    def _replay(self, obs: torch.Tensor, critic_obs: torch.Tensor, hist_encoding: bool):
+        graph, static_obs, static_critic_obs, static_outputs = self._variants[hist_encoding]
+        static_obs.copy_(obs)
+        static_critic_obs.copy_(critic_obs)
+        graph.replay()
+        # the next replay overwrites the static outputs
+        return tuple(output.clone() for output in static_outputs)